@@ -31,8 +31,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
             now = timezone.now()
             payment = (
-                AdminFeePayment.objects.filter(user=user, uses_remaining__gt=0)
-                .exclude(valid_until__lt=now)
+                AdminFeePayment.objects.filter(user=user, is_active=True)
+                .exclude(valid_until__lte=now)
                 .select_related("university")
                 .order_by("-created_at")
                 .first()
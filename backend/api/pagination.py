@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class NotificationCursorPagination(CursorPagination):
+    """Newest-first cursor pages; stable under concurrent inserts."""
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    ordering = ("-created_at", "-id")
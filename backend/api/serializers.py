@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from properties.models import University, Property, Review, Service, City
+from payments import entitlements
+from payments.ecocash import match_confirmation
 from payments.models import PaymentConfirmation, AdminFeePayment
+from core.models import NotificationPreference
 
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -41,6 +44,7 @@ class PropertySerializer(serializers.ModelSerializer):
     university_name = serializers.CharField(source="university.name", read_only=True)
     gender_display = serializers.CharField(source="get_gender_display", read_only=True)
     sharing_display = serializers.CharField(source="get_sharing_display", read_only=True)
+    contact_unlocked = serializers.SerializerMethodField()
 
     class Meta:
         model = Property
@@ -65,13 +69,24 @@ class PropertySerializer(serializers.ModelSerializer):
             "thumbnail",
             "average_rating",
             "distance_km",
+            "contact_unlocked",
         )
 
+    def get_contact_unlocked(self, obj):
+        # One cache read per response; the context is shared by list items.
+        request = self.context.get("request")
+        if request is None:
+            return False
+        if "entitlements" not in self.context:
+            self.context["entitlements"] = entitlements.for_user(request.user)
+        return self.context["entitlements"].is_unlocked(obj.pk)
+
     def get_average_rating(self, obj):
-        qs = obj.reviews.all()
-        if not qs.exists():
+        # Evaluated once, so list views' prefetched reviews cost no query.
+        ratings = [r.rating for r in obj.reviews.all()]
+        if not ratings:
             return None
-        return round(sum(r.rating for r in qs) / qs.count(), 2)
+        return round(sum(ratings) / len(ratings), 2)
 
     def get_thumbnail(self, obj):
         img = obj.images.first()
@@ -107,6 +122,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     thumbnail = serializers.SerializerMethodField()
     city_name = serializers.CharField(source="city.name", read_only=True)
     university_name = serializers.CharField(source="university.name", read_only=True)
+    amenity_list = serializers.SlugRelatedField(source="amenity_tags", slug_field="name", many=True, read_only=True)
 
     class Meta:
         model = Property
@@ -126,6 +142,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
             "sharing",
             "overnight",
             "amenities",
+            "amenity_list",
             "bedrooms",
             "square_meters",
             "nightly_price",
@@ -164,10 +181,10 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
         return out
 
     def get_average_rating(self, obj):
-        qs = obj.reviews.all()
-        if not qs.exists():
+        ratings = [r.rating for r in obj.reviews.all()]
+        if not ratings:
             return None
-        return round(sum(r.rating for r in qs) / qs.count(), 2)
+        return round(sum(ratings) / len(ratings), 2)
 
     def get_distance_to_campus_km(self, obj):
         uni = obj.university
@@ -199,8 +216,8 @@ class PropertyContactSerializer(serializers.ModelSerializer):
 class PaymentConfirmationSerializer(serializers.ModelSerializer):
     class Meta:
         model = PaymentConfirmation
-        fields = ("id", "payment", "confirmation_text", "status", "submitted_at")
-        read_only_fields = ("status", "submitted_at")
+        fields = ("id", "payment", "confirmation_text", "status", "submitted_at", "transaction_id", "match_status")
+        read_only_fields = ("status", "submitted_at", "transaction_id", "match_status")
 
 
 class CreatePaymentConfirmationSerializer(serializers.Serializer):
@@ -216,9 +233,6 @@ class CreatePaymentConfirmationSerializer(serializers.Serializer):
         return uni
 
     def create(self, validated_data):
-        from core.models import Notification
-        from django.contrib.auth import get_user_model
-        
         user = self.context["request"].user
         university = validated_data["university"]
         num = validated_data["for_number_of_students"]
@@ -229,20 +243,20 @@ class CreatePaymentConfirmationSerializer(serializers.Serializer):
             amount=amount,
             for_number_of_students=num,
         )
-        confirmation = PaymentConfirmation.objects.create(payment=payment, confirmation_text=validated_data["confirmation_text"])
-        
-        # Notify all admin users
-        User = get_user_model()
-        admins = User.objects.filter(is_staff=True)
-        for admin in admins:
-            Notification.objects.create(
-                recipient=admin,
-                title="New Payment Confirmation",
-                message=f"{user.email} submitted a payment confirmation for {university.name}. Amount: ${amount}. Please review and approve."
-            )
-        
+        # Admins are notified by payments.signals.notify_admin_on_confirmation
+        confirmation = match_confirmation(
+            PaymentConfirmation(payment=payment, confirmation_text=validated_data["confirmation_text"])
+        )
+
         return confirmation
 
     def to_representation(self, instance):
         # instance is a PaymentConfirmation
         return PaymentConfirmationSerializer(instance).data
+
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationPreference
+        fields = ("digest", "last_digest_at")
+        read_only_fields = ("last_digest_at",)
@@ -1,15 +1,33 @@
-from django.test import TestCase
+import threading
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
 from rest_framework.test import APIClient
 from django.urls import reverse
 from accounts.models import User
 from properties.models import University, Property
-from payments.models import AdminFeePayment, PaymentConfirmation
+from payments import ecocash, entitlements
+from payments.models import AdminFeePayment, ContactView, PaymentConfirmation
+from payments.review import review_confirmations
+from payments.unlock import unlock_contact
 from core.models import Notification
 
+# Stands in for the merchant statement ECOCASH_VERIFIER checks against.
+STATEMENT = {"MP240512.1432.A12345"}
+
+
+def verify_on_statement(parsed, payment):
+    return parsed.transaction_id in STATEMENT
+
 
 class PaymentAndContactTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.admin = User.objects.create_user(email="admin@example.com", password="pass", role="admin")
         self.user = User.objects.create_user(email="user@example.com", password="pass", role="general")
         self.uni = University.objects.create(name="Test Uni", admin_fee_per_head=10)
@@ -60,9 +78,51 @@ class PaymentAndContactTests(TestCase):
         self.assertGreater(payment.uses_remaining, 0)
         self.assertIsNotNone(payment.valid_until)
 
-        # user notified
+        # user notified, once
+        self.assertEqual(Notification.objects.filter(recipient=self.user).count(), 1)
         self.assertTrue(Notification.objects.filter(recipient=self.user, title__icontains="Payment confirmed").exists())
 
+    def test_bulk_review_is_one_transaction_of_fixed_size(self):
+        confs = []
+        for i in range(5):
+            student = User.objects.create_user(email=f"s{i}@example.com", password="pass")
+            payment = AdminFeePayment.objects.create(user=student, university=self.uni, amount=10, allowed_accommodations=2)
+            confs.append(PaymentConfirmation.objects.create(payment=payment, confirmation_text="paid"))
+        Notification.objects.all().delete()
+
+        self.client.force_authenticate(user=self.admin)
+        url = reverse("review-payment-confirmations")
+        ids = [c.id for c in confs[:4]]
+        # savepoint, select, status update, payment update, notification insert, release
+        with self.assertNumQueries(6):
+            changed = review_confirmations(ids[:2], "approve")
+        self.assertEqual(changed, ids[:2])
+        resp = self.client.post(url, {"action": "approve", "ids": ids}, format="json")
+        self.assertEqual(resp.data, {"status": "approved", "ids": ids[2:]})
+
+        approved = AdminFeePayment.objects.filter(confirmations__in=ids)
+        self.assertEqual(set(approved.values_list("uses_remaining", flat=True)), {2})
+        self.assertFalse(approved.filter(valid_until__isnull=True).exists())
+        self.assertEqual(Notification.objects.filter(title="Payment confirmed").count(), 4)
+        self.assertEqual(PaymentConfirmation.objects.get(pk=confs[4].pk).status, "pending")
+
+        resp = self.client.post(url, {"action": "decline", "ids": [confs[4].id]}, format="json")
+        self.assertEqual(resp.data["ids"], [confs[4].id])
+        self.assertEqual(Notification.objects.filter(title="Payment declined").count(), 1)
+        self.assertEqual(self.client.post(url, {"action": "delete", "ids": ids}, format="json").status_code, 400)
+
+    def test_django_admin_status_change_goes_through_review(self):
+        payment = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=10)
+        conf = PaymentConfirmation.objects.create(payment=payment, confirmation_text="paid")
+        staff = User.objects.create_superuser(email="root@example.com", password="pass")
+        self.client.force_login(staff)
+        url = reverse("admin:payments_paymentconfirmation_change", args=[conf.id])
+        resp = self.client.post(url, {"payment": payment.id, "confirmation_text": "paid", "status": "approved"})
+        self.assertEqual(resp.status_code, 302)
+        payment.refresh_from_db()
+        self.assertEqual(payment.uses_remaining, payment.allowed_accommodations)
+        self.assertEqual(Notification.objects.filter(recipient=self.user, title="Payment confirmed").count(), 1)
+
     def test_contact_landlord_no_payment_returns_instructions(self):
         self.client.force_authenticate(user=self.user)
         url = reverse("api-property-contact", kwargs={"pk": self.prop.id})
@@ -85,6 +145,190 @@ class PaymentAndContactTests(TestCase):
         payment.refresh_from_db()
         self.assertEqual(payment.uses_remaining, initial_uses - 1)
 
+        # Viewing the same property again is free, on the API and the web page.
+        resp = self.client.post(url, {}, format="json")
+        self.assertEqual(resp.data["uses_remaining"], initial_uses - 1)
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse("property-contact", kwargs={"pk": self.prop.id}))
+        self.assertTrue(resp.context["already_viewed"])
+        payment.refresh_from_db()
+        self.assertEqual(payment.uses_remaining, initial_uses - 1)
+
+    def test_entitlements_are_cached_and_invalidated(self):
+        other = Property.objects.create(
+            title="Other", owner=self.admin, university=self.uni, property_type="long_term", is_approved=True
+        )
+        self.client.force_login(self.user)
+        detail = reverse("web-property-detail", kwargs={"pk": other.id})
+
+        self.assertFalse(self.client.get(detail).context["has_paid"])
+        with self.assertNumQueries(0):
+            self.assertFalse(entitlements.for_user(self.user).has_paid(self.uni.id))
+
+        payment = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.activate(days_valid=30)
+        self.assertTrue(self.client.get(detail).context["has_paid"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("property-contact", kwargs={"pk": self.prop.id}))
+        owned = entitlements.for_user(self.user)
+        self.assertTrue(owned.is_unlocked(self.prop.id))
+        self.assertEqual(owned.uses_remaining(self.uni.id), 2)
+
+        # List pages read the same cached entry: session, user, then the listing's own three.
+        with self.assertNumQueries(5):
+            resp = self.client.get(reverse("properties-list"))
+        unlocked = {p["id"]: p["contact_unlocked"] for p in resp.json()["results"]}
+        self.assertEqual(unlocked, {self.prop.id: True, other.id: False})
+
+        # Other workers only see the invalidation through a shared cache;
+        # with the per-process one, entries are kept short instead.
+        self.assertEqual(entitlements.compute(self.user.id)[1], entitlements.ENTITLEMENT_LOCAL_TIMEOUT)
+        with self.settings(CACHE_SHARED=True):
+            self.assertEqual(entitlements.compute(self.user.id)[1], entitlements.ENTITLEMENT_TIMEOUT)
+            # Expiry needs no invalidation: the entry never outlives valid_until.
+            AdminFeePayment.objects.filter(pk=payment.pk).update(valid_until=timezone.now() + timezone.timedelta(seconds=90))
+            self.assertLessEqual(entitlements.compute(self.user.id)[1], 90)
+
+    def test_ecocash_sms_formats_are_parsed(self):
+        parsed = ecocash.parse(
+            "Transfer Confirmation. Transfer of USD 20.00 to 0776487550 T. TAYERO successful. "
+            "Approval Code: MP240512.1432.A12345. New wallet balance: USD 3.50. 12/05/24 14:32"
+        )
+        self.assertEqual(parsed.amount, Decimal("20.00"))
+        self.assertEqual(parsed.transaction_id, "MP240512.1432.A12345")
+        self.assertEqual(parsed.recipient, "0776487550")
+        self.assertEqual((parsed.paid_at.year, parsed.paid_at.month, parsed.paid_at.day, parsed.paid_at.hour), (2024, 5, 12, 14))
+
+        parsed = ecocash.parse(
+            "Confirmed. You have sent USD1,020.50 to TAYERO T (+263 77 648 7550) on 12/05/2024 at 14:32. "
+            "Txn ID PP240512.1432.H12345. Balance: USD3.50"
+        )
+        self.assertEqual((parsed.amount, parsed.transaction_id, parsed.recipient), (Decimal("1020.50"), "PP240512.1432.H12345", "0776487550"))
+        self.assertIsNone(ecocash.parse("I paid, please check").amount)
+
+    def test_ecocash_parser_rejects_label_words_and_incomplete_claims(self):
+        self.assertEqual(ecocash.parse("I paid $20 reference number 12345678").transaction_id, "12345678")
+        self.assertEqual(ecocash.parse("paid $20, ref no. AB12345").transaction_id, "AB12345")
+        self.assertIsNone(ecocash.parse("paid $20, see reference number above").transaction_id)
+        self.assertIsNone(ecocash.parse("paid $20 transaction id pending").transaction_id)
+
+        # Typed claims missing the recipient, date or a real EcoCash id never reach auto.
+        payment = AdminFeePayment(user=self.user, university=self.uni, amount=20, created_at=timezone.now())
+        bucket, note = ecocash.classify(ecocash.parse("paid USD 20 txn id ABCDEF1"), payment)
+        self.assertEqual(bucket, "mismatch")
+        for problem in ("not an EcoCash id", "no recipient number", "no payment date"):
+            self.assertIn(problem, note)
+
+    @override_settings(ECOCASH_NUMBER="0776487550", ECOCASH_AUTO_APPROVE=True, ECOCASH_VERIFIER="api.tests.verify_on_statement")
+    def test_confirmations_are_bucketed_and_matching_ones_auto_approved(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("payment-confirmation")
+        today = timezone.localtime().strftime("%d/%m/%Y %H:%M")
+
+        def submit(text, students=2):
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.client.post(url, {"university": self.uni.id, "for_number_of_students": students, "confirmation_text": text}, format="json")
+            self.assertEqual(resp.status_code, 201)
+            return PaymentConfirmation.objects.get(pk=resp.data["id"])
+
+        good = submit(f"Transfer of USD 20.00 to 0776487550 successful. Approval Code: MP240512.1432.A12345. {today}")
+        self.assertEqual((good.match_status, good.status), ("auto", "approved"))
+        self.assertTrue(AdminFeePayment.objects.get(pk=good.payment_id).is_active)
+
+        reused = submit(f"Transfer of USD 20.00 to 0776487550 successful. Approval Code: MP240512.1432.A12345. {today}")
+        self.assertEqual((reused.match_status, reused.status), ("duplicate", "pending"))
+        self.assertIsNone(reused.transaction_id)
+        self.assertIn(f"#{good.pk}", reused.match_note)
+
+        short = submit("Transfer of USD 10.00 to 0771234567 successful. Txn ID PP240512.1432.H99999")
+        self.assertEqual((short.match_status, short.status), ("mismatch", "pending"))
+        self.assertIn("amount 10.00 != expected 20.00", short.match_note)
+        self.assertIn("not 0776487550", short.match_note)
+
+        self.assertEqual(submit("paid").match_status, "unparsed")
+
+        # Consistent, but not on the statement: left for an admin.
+        unverified = submit(f"Transfer of USD 20.00 to 0776487550 successful. Approval Code: MP240512.1500.B54321. {today}")
+        self.assertEqual((unverified.match_status, unverified.status), ("auto", "pending"))
+        with self.settings(ECOCASH_VERIFIER=""):
+            STATEMENT.add("MP240512.1510.C11111")
+            self.addCleanup(STATEMENT.discard, "MP240512.1510.C11111")
+            no_verifier = submit(f"Transfer of USD 20.00 to 0776487550 successful. Approval Code: MP240512.1510.C11111. {today}")
+        self.assertEqual((no_verifier.match_status, no_verifier.status), ("auto", "pending"))
+
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("dashboard-payment-confirmations"), {"bucket": "mismatch"})
+        self.assertEqual([c.pk for c in resp.context["page_obj"]], [short.pk])
+
+    @override_settings(ECOCASH_NUMBER="0776487550", ECOCASH_AUTO_APPROVE=True, ECOCASH_VERIFIER="api.tests.verify_on_statement")
+    def test_canceled_confirmation_releases_its_transaction_id(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("payment-confirmation")
+        sms = (
+            "Transfer of USD 20.00 to 0776487550 successful. Approval Code: MP240512.1432.A12345. "
+            + timezone.localtime().strftime("%d/%m/%Y %H:%M")
+        )
+
+        def submit():
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.client.post(url, {"university": self.uni.id, "for_number_of_students": 2, "confirmation_text": sms}, format="json")
+            self.assertEqual(resp.status_code, 201)
+            return PaymentConfirmation.objects.get(pk=resp.data["id"])
+
+        with self.settings(ECOCASH_VERIFIER=""):
+            first = submit()
+        self.assertEqual((first.match_status, first.status), ("auto", "pending"))
+        # What sweep_payments does to a confirmation nobody reviewed in time.
+        PaymentConfirmation.objects.filter(pk=first.pk).update(status="canceled")
+
+        again = submit()
+        self.assertEqual((again.match_status, again.status, again.transaction_id), ("auto", "approved", "MP240512.1432.A12345"))
+        # The canceled one can't be approved into a second claim on the id.
+        self.assertEqual(review_confirmations([first.pk], "approve"), [])
+
+    def test_sweep_payments_expires_and_cancels_stale_confirmations(self):
+        live = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=10)
+        live.activate()
+        expired = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=10)
+        expired.activate()
+        spent = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=10)
+        spent.activate()
+        AdminFeePayment.objects.filter(pk=expired.pk).update(valid_until=timezone.now() - timezone.timedelta(hours=1))
+        AdminFeePayment.objects.filter(pk=spent.pk).update(uses_remaining=0)  # drifted: still flagged
+        self.assertEqual(AdminFeePayment.objects.filter(is_active=True).count(), 3)
+
+        old = PaymentConfirmation.objects.create(payment=expired, confirmation_text="old")
+        fresh = PaymentConfirmation.objects.create(payment=live, confirmation_text="fresh")
+        PaymentConfirmation.objects.filter(pk=old.pk).update(submitted_at=timezone.now() - timezone.timedelta(days=20))
+
+        out = StringIO()
+        call_command("sweep_payments", "--dry-run", stdout=out)
+        self.assertIn("Would update 1 expired", out.getvalue())
+        self.assertEqual(AdminFeePayment.objects.filter(is_active=True).count(), 3)
+
+        call_command("sweep_payments", stdout=StringIO())
+        self.assertEqual(list(AdminFeePayment.objects.filter(is_active=True)), [live])
+        expired.refresh_from_db()
+        self.assertEqual(expired.uses_remaining, 0)
+        self.assertEqual(PaymentConfirmation.objects.get(pk=old.pk).status, "canceled")
+        self.assertEqual(PaymentConfirmation.objects.get(pk=fresh.pk).status, "pending")
+        self.assertTrue(Notification.objects.filter(recipient=self.user, title="Payment confirmation expired").exists())
+
+        # A second run finds nothing to do.
+        out = StringIO()
+        call_command("sweep_payments", stdout=out)
+        self.assertNotRegex(out.getvalue(), r"Updated [1-9]")
+
+    def test_unlock_skips_expired_payments(self):
+        payment = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=10)
+        payment.activate(days_valid=30)
+        AdminFeePayment.objects.filter(pk=payment.pk).update(valid_until=timezone.now() - timezone.timedelta(days=1))
+        with self.assertNumQueries(4):  # savepoint, insert, lookup, release
+            self.assertIsNone(unlock_contact(self.user, self.prop))
+        self.assertFalse(ContactView.objects.exists())
+
     def test_admin_decline_payment_confirmation(self):
         payment = AdminFeePayment.objects.create(user=self.user, university=self.uni, amount=20, for_number_of_students=2)
         conf = PaymentConfirmation.objects.create(payment=payment, confirmation_text="confirm")
@@ -117,3 +361,48 @@ class PaymentAndContactTests(TestCase):
         self.assertEqual(resp2.status_code, 200)
         conf2.refresh_from_db()
         self.assertEqual(conf2.status, "declined")
+
+
+class ContactUnlockConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        owner = User.objects.create_user(email="owner@example.com", password="pass", role="landlord")
+        self.user = User.objects.create_user(email="user@example.com", password="pass")
+        uni = University.objects.create(name="Race Uni", admin_fee_per_head=10)
+        self.props = [
+            Property.objects.create(title=f"House {i}", owner=owner, university=uni, is_approved=True)
+            for i in range(6)
+        ]
+        self.payment = AdminFeePayment.objects.create(user=self.user, university=uni, amount=30, allowed_accommodations=3)
+        self.payment.activate()
+
+    def _race(self, props):
+        results = []
+        barrier = threading.Barrier(len(props))
+
+        def tap(prop):
+            barrier.wait()
+            try:
+                results.append(unlock_contact(self.user, prop))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=tap, args=(prop,)) for prop in props]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_unlocks_never_overspend(self):
+        results = self._race(self.props)
+        self.assertEqual(sum(1 for r in results if r and r.charged), 3)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.uses_remaining, 0)
+        self.assertFalse(self.payment.is_active)
+        self.assertEqual(ContactView.objects.filter(payment=self.payment).count(), 3)
+
+    def test_concurrent_taps_on_one_property_charge_once(self):
+        results = self._race([self.props[0]] * 6)
+        self.assertEqual([r.charged for r in results].count(True), 1)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.uses_remaining, 2)
@@ -0,0 +1,199 @@
+from itertools import combinations
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from properties.filters import PropertyFilterSpec
+from properties.models import City, Property, PropertyImage, University
+
+# One sample value per filter; every combination of them is compiled below.
+SAMPLE_PARAMS = {
+    "q": {"q": "garden"},
+    "gender": {"gender": "girls"},
+    "sharing": {"sharing": "single"},
+    "overnight": {"overnight": "1"},
+    "type": {"property_types": "students,short_term"},
+    "amenities": {"amenities": "wifi"},
+    "price": {"min_price": "20", "max_price": "60"},
+    "guests": {"guests": "2"},
+}
+
+
+class PropertyFilterSpecTests(TestCase):
+    def setUp(self):
+        self.harare = City.objects.create(name='Harare')
+        self.gweru = City.objects.create(name='Gweru')
+        self.uni = University.objects.create(name='Filter Uni', city=self.harare, admin_fee_per_head=10)
+        self.owner = User.objects.create_user(email='owner@example.com', password='pass', role='landlord')
+        self.client = APIClient()
+
+        rows = [
+            ('Garden cottage', self.harare, 'students', 'girls', 'single', True, 30, 'WiFi, Parking', 2),
+            ('Garden flat', self.gweru, 'students', 'boys', 'two', False, 50, 'WiFi', 4),
+            ('City studio', self.harare, 'short_term', 'girls', 'single', True, 70, 'Parking', 1),
+            ('Garden lodge', self.harare, 'short_term', 'mixed', 'other', True, 45, 'WiFi', 3),
+            ('Town house', self.gweru, 'long_term', 'all', 'single', False, 25, '', None),
+        ]
+        self.props = []
+        for title, city, ptype, gender, sharing, overnight, price, amenities, occupancy in rows:
+            self.props.append(Property.objects.create(
+                title=title, owner=self.owner, university=self.uni, city=city,
+                property_type=ptype, gender=gender, sharing=sharing, overnight=overnight,
+                nightly_price=price, amenities=amenities, max_occupancy=occupancy,
+                is_approved=True,
+            ))
+        self.samples = dict(SAMPLE_PARAMS, city={"city": str(self.harare.pk)})
+
+    def _expected(self, names):
+        """Reference implementation of the sample filters, in Python."""
+        def keep(p):
+            checks = {
+                "q": 'garden' in p.title.lower(),
+                "gender": p.gender == 'girls',
+                "sharing": p.sharing == 'single',
+                "overnight": p.overnight,
+                "type": p.property_type in ('students', 'short_term'),
+                "city": p.city_id == self.harare.pk,
+                "amenities": 'wifi' in p.amenities.lower(),
+                "price": 20 <= p.nightly_price <= 60,
+                "guests": (p.max_occupancy or 0) >= 2,
+            }
+            return all(checks[name] for name in names)
+        return {p.pk for p in self.props if keep(p)}
+
+    def _plan(self, qs):
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return sql, [row[-1] for row in cursor.fetchall()]
+
+    def test_query_plan_per_filter_combination(self):
+        spec = PropertyFilterSpec()
+        for size in range(len(self.samples) + 1):
+            for names in combinations(self.samples, size):
+                params = {}
+                for name in names:
+                    params.update(self.samples[name])
+                with self.subTest(filters=names):
+                    qs = spec.compile(params).queryset
+                    sql, plan = self._plan(qs)
+                    # One statement, city/university joined by primary key.
+                    self.assertNotIn('UNION', sql)
+                    self.assertIn('JOIN "properties_city"', sql)
+                    self.assertIn('JOIN "properties_university"', sql)
+                    self.assertFalse([step for step in plan if step.startswith('SCAN properties_city')])
+                    self.assertFalse([step for step in plan if step.startswith('SCAN properties_university')])
+                    if "q" in names:
+                        self.assertIn('SCAN property_search VIRTUAL TABLE INDEX 0:M5', plan)
+                    if "amenities" in names:
+                        self.assertTrue([step for step in plan if 'amenity_property_lookup' in step], plan)
+                    if {"city", "type"} & set(names):
+                        # Scoped listings seek through an index, never scan the table.
+                        self.assertFalse([step for step in plan if step.startswith('SCAN properties_property')], plan)
+                    self.assertEqual({p.pk for p in qs}, self._expected(names))
+
+    def test_listing_queries_do_not_grow_with_rows(self):
+        for prop in self.props:
+            PropertyImage.objects.create(property=prop, image='property_images/a.jpg')
+            PropertyImage.objects.create(property=prop, image='property_images/b.jpg')
+        qs = PropertyFilterSpec().compile({}).queryset
+        # Properties (+ city/university), images, reviews.
+        with self.assertNumQueries(3):
+            for prop in qs:
+                prop.city.name, prop.university.name
+                self.assertEqual(prop.images.first().image.name, 'property_images/a.jpg')
+                list(prop.reviews.all())
+
+    def test_all_and_any_mean_no_filter(self):
+        spec = PropertyFilterSpec()
+        everything = set(spec.compile({}).queryset.values_list('pk', flat=True))
+        relaxed = spec.compile({'gender': 'all', 'sharing': 'any'}).queryset
+        self.assertEqual(set(relaxed.values_list('pk', flat=True)), everything)
+        self.assertFalse(spec.compile({'gender': 'nobody'}).queryset.exists())
+
+    def test_search_text_understands_distance_and_price(self):
+        near = self.props[0]
+        near.distance_to_campus_km = 1.5
+        near.save()
+        result = PropertyFilterSpec().compile({'q': 'garden 2km'})
+        self.assertEqual(result.search_text, 'garden')
+        self.assertEqual(list(result.queryset), [near])
+
+        result = PropertyFilterSpec().compile({'q': '$40'})
+        self.assertEqual(result.search_text, '')
+        self.assertEqual({p.pk for p in result.queryset}, {self.props[0].pk, self.props[4].pk})
+
+    def test_price_field_follows_listing_types(self):
+        spec = PropertyFilterSpec()
+        self.assertEqual(spec.compile({'property_type': 'long_term'}).price_field, 'price_per_month')
+        self.assertEqual(spec.compile({'property_types': 'long_term,shop'}).price_field, 'price_per_month')
+        self.assertEqual(spec.compile({'property_types': 'long_term,students'}).price_field, 'nightly_price')
+        self.assertEqual(PropertyFilterSpec(price_field='price_per_month').compile({}).price_field, 'price_per_month')
+
+    def test_api_and_web_share_the_spec(self):
+        resp = self.client.get('/api/properties/', {'q': 'garden', 'gender': 'girls', 'amenities': 'wifi'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p['id'] for p in resp.json()['results']], [self.props[0].pk])
+
+        resp = self.client.get(f'/api/universities/{self.uni.pk}/properties/', {'gender': 'all', 'city': self.gweru.pk})
+        self.assertEqual({p['id'] for p in resp.json()['results']}, {self.props[1].pk, self.props[4].pk})
+
+        resp = self.client.get('/shortterm/properties/', {'city': self.harare.pk, 'guests': 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p.pk for p in resp.context['properties']], [self.props[3].pk])
+
+
+class PropertyListingIndexTests(TestCase):
+    def test_listing_queries_use_partial_indexes(self):
+        from properties.management.commands.bench_property_indexes import listing_queries
+
+        for name, qs in listing_queries(1, 1):
+            with self.subTest(query=name):
+                plan = qs.explain()
+                self.assertIn('USING INDEX prop_listed_', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_bench_command_rolls_back(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('bench_property_indexes', rows=300, repeat=1, stdout=out)
+        self.assertIn('With listing indexes', out.getvalue())
+        self.assertFalse(Property.objects.exists())
+        self.assertFalse(City.objects.exists())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE name LIKE 'prop_listed_%'")
+            self.assertEqual(cursor.fetchone()[0], len(Property._meta.indexes))
+
+
+class CityListTests(TestCase):
+    def test_thumbnail_from_newest_listing_in_constant_queries(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        owner = User.objects.create_user(email='citylist@example.com', password='pw', role='landlord')
+        now = timezone.now()
+        for i in range(3):
+            city = City.objects.create(name=f"City {i}")
+            for age in (2, 1):
+                prop = Property.objects.create(
+                    title=f"{city.name} {age}", owner=owner, city=city, property_type='long_term',
+                    is_approved=True, is_available=True,
+                )
+                Property.objects.filter(pk=prop.pk).update(created_at=now - timedelta(days=age))
+                PropertyImage.objects.create(property=prop, image=f"properties/{prop.pk}-b.jpg")
+                PropertyImage.objects.create(property=prop, image=f"properties/{prop.pk}-a.jpg")
+        City.objects.create(name="Empty")
+
+        with self.assertNumQueries(2):
+            resp = APIClient().get('/api/cities/')
+        rows = {row['name']: row for row in resp.json()}
+        newest = Property.objects.get(title="City 0 1")
+        self.assertTrue(rows["City 0"]['sample_thumbnail'].endswith(f"/properties/{newest.pk}-b.jpg"))
+        self.assertEqual(rows["City 0"]['properties_count'], 2)
+        self.assertIsNone(rows["Empty"]['sample_thumbnail'])
@@ -0,0 +1,174 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from core.models import Notification
+from core.pubsub import NotificationBroker, broker
+
+
+class NotificationAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="n@example.com", password="pass")
+        self.other = User.objects.create_user(email="o@example.com", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _make(self, n, user=None):
+        return [
+            Notification.objects.create(recipient=user or self.user, title=f"t{i}", message="m")
+            for i in range(n)
+        ]
+
+    def test_list_is_cursor_paginated(self):
+        self._make(25)
+        resp = self.client.get("/api/notifications/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["results"]), 20)
+        self.assertIsNotNone(resp.data["next"])
+
+        resp2 = self.client.get(resp.data["next"])
+        self.assertEqual(len(resp2.data["results"]), 5)
+        ids = {n["id"] for n in resp.data["results"]} | {n["id"] for n in resp2.data["results"]}
+        self.assertEqual(len(ids), 25)
+
+    def test_unread_count_is_cached_and_invalidated(self):
+        self._make(3)
+        resp = self.client.get("/api/notifications/unread-count/")
+        self.assertEqual(resp.data["unread"], 3)
+
+        with self.assertNumQueries(0):
+            resp = self.client.get("/api/notifications/unread-count/")
+        self.assertEqual(resp.data["unread"], 3)
+
+        self._make(1)
+        resp = self.client.get("/api/notifications/unread-count/")
+        self.assertEqual(resp.data["unread"], 4)
+
+    def test_bulk_mark_read_single_update(self):
+        mine = self._make(3)
+        theirs = self._make(1, user=self.other)
+
+        resp = self.client.post(
+            "/api/notifications/mark-read/", {"ids": [mine[0].id, mine[1].id, theirs[0].id]}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["updated"], 2)
+        self.assertFalse(Notification.objects.get(pk=theirs[0].pk).is_read)
+
+        resp = self.client.post("/api/notifications/mark-read/", {}, format="json")
+        self.assertEqual(resp.data["updated"], 1)
+        self.assertEqual(self.client.get("/api/notifications/unread-count/").data["unread"], 0)
+
+    def test_single_mark_read_still_works(self):
+        n = self._make(1)[0]
+        resp = self.client.post(f"/api/notifications/{n.id}/mark-read/")
+        self.assertEqual(resp.status_code, 200)
+        n.refresh_from_db()
+        self.assertTrue(n.is_read)
+        resp = self.client.post(f"/api/notifications/{n.id + 100}/mark-read/")
+        self.assertEqual(resp.status_code, 404)
+
+
+@override_settings(NOTIFICATION_STREAM_ENABLED=True)
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="s@example.com", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_first_call_returns_cursor_only(self):
+        n = Notification.objects.create(recipient=self.user, title="old", message="m")
+        resp = self.client.get("/api/notifications/stream/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["results"], [])
+        self.assertEqual(resp.data["last_id"], n.id)
+        self.assertEqual(resp.data["unread"], 1)
+
+    def test_returns_pending_rows_without_waiting(self):
+        first = Notification.objects.create(recipient=self.user, title="a", message="m")
+        second = Notification.objects.create(recipient=self.user, title="b", message="m")
+        with mock.patch.object(broker, "wait") as wait:
+            resp = self.client.get(f"/api/notifications/stream/?since={first.id}")
+        wait.assert_not_called()
+        self.assertEqual([r["id"] for r in resp.data["results"]], [second.id])
+        self.assertEqual(resp.data["last_id"], second.id)
+
+    def test_wakes_on_publish(self):
+        def arrive(user_id, seen, timeout):
+            Notification.objects.create(recipient=self.user, title="new", message="m")
+            return True
+
+        with mock.patch.object(broker, "wait", side_effect=arrive):
+            resp = self.client.get("/api/notifications/stream/?since=0&timeout=5")
+        self.assertEqual(len(resp.data["results"]), 1)
+        self.assertEqual(resp.data["results"][0]["title"], "new")
+
+    def test_coalesced_update_reaches_a_waiting_stream(self):
+        from core.notifications import notify
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify([self.user.id], "New accommodation", "v1", group_key="property:1")
+        cursor = self.client.get("/api/notifications/stream/").data["last_id"]
+
+        def update(user_id, seen, timeout):
+            with self.captureOnCommitCallbacks(execute=True):
+                notify([self.user.id], "Accommodation updated", "v2", group_key="property:1")
+            return broker.version(user_id) != seen
+
+        with mock.patch.object(broker, "wait", side_effect=update):
+            resp = self.client.get(f"/api/notifications/stream/?since={cursor}&timeout=5")
+        self.assertEqual(
+            [(r["title"], r["message"]) for r in resp.data["results"]], [("New accommodation", "v2")]
+        )
+        self.assertEqual(Notification.objects.filter(recipient=self.user).count(), 1)
+
+    def test_timeout_returns_empty_and_keeps_cursor(self):
+        resp = self.client.get("/api/notifications/stream/?since=7&timeout=0")
+        self.assertEqual(resp.data["results"], [])
+        self.assertEqual(resp.data["last_id"], 7)
+
+    def test_bad_params(self):
+        resp = self.client.get("/api/notifications/stream/?since=abc")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_notify_publishes_after_commit(self):
+        from core.notifications import notify
+
+        with broker.subscribe(self.user.id) as before:
+            with self.captureOnCommitCallbacks(execute=True):
+                notify([self.user.id], "t", "m")
+                self.assertEqual(broker.version(self.user.id), before)
+            self.assertGreater(broker.version(self.user.id), before)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=False, NOTIFICATION_POLL_INTERVAL=30)
+    def test_disabled_stream_answers_at_once_with_retry_after(self):
+        with mock.patch.object(broker, "wait") as wait:
+            resp = self.client.get("/api/notifications/stream/?since=0&timeout=5")
+        wait.assert_not_called()
+        self.assertEqual((resp.data["results"], resp.data["retry_after"]), ([], 30))
+
+
+class NotificationBrokerTests(TestCase):
+    def test_wait_returns_when_published_from_another_thread(self):
+        b = NotificationBroker()
+        with b.subscribe(1) as seen:
+            threading.Timer(0.05, b.publish, args=([1],)).start()
+            self.assertTrue(b.wait(1, seen, timeout=5))
+        with b.subscribe(2) as seen:
+            self.assertFalse(b.wait(2, seen, timeout=0.01))
+
+    def test_versions_are_kept_only_while_subscribed(self):
+        b = NotificationBroker()
+        b.publish([1, 2, 3])
+        self.assertEqual(b._versions, {})
+        with b.subscribe(1):
+            with b.subscribe(1):
+                b.publish([1, 2])
+            self.assertEqual(b._versions, {1: 1})
+        self.assertEqual((b._versions, dict(b._subscribers)), ({}, {}))
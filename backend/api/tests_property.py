@@ -96,3 +96,115 @@ class PropertyAPITests(TestCase):
         # ensure that 'Near' appears before 'Far'
         titles = [r.get("title") for r in results]
         self.assertTrue(titles.index("Near") < titles.index("Far"))
+
+
+class PropertyAmenityTests(TestCase):
+    def setUp(self):
+        self.landlord = User.objects.create_user(email="amen@example.com", password="pass", role="landlord")
+        self.uni = University.objects.create(name="AmenUni", admin_fee_per_head=10)
+        self.client = APIClient()
+
+    def _make(self, title, amenities):
+        return Property.objects.create(
+            title=title, owner=self.landlord, university=self.uni, property_type="students",
+            is_approved=True, amenities=amenities,
+        )
+
+    def test_free_text_is_parsed_and_normalized(self):
+        from properties.models import Amenity
+
+        p = self._make("Parsed", "WiFi, Parking\nKitchen;wi-fi")
+        self.assertEqual(sorted(p.amenity_tags.values_list("slug", flat=True)), ["kitchen", "parking", "wifi"])
+        self.assertEqual(Amenity.objects.get(slug="wifi").name, "WiFi")
+
+        p.amenities = "Parking"
+        p.save()
+        self.assertEqual(list(p.amenity_tags.values_list("slug", flat=True)), ["parking"])
+
+    def test_amenities_filter_requires_all_and_ignores_substrings(self):
+        both = self._make("Both", "WiFi, Parking")
+        self._make("Wifi only", "WiFi")
+        self._make("Substring", "No parking allowed")
+
+        resp = self.client.get("/api/properties/?amenities=wifi,parking")
+        self.assertEqual([r["id"] for r in resp.data["results"]], [both.id])
+        resp = self.client.get(f"/api/universities/{self.uni.id}/properties/?amenities=Wi-Fi")
+        self.assertEqual(len(resp.data["results"]), 2)
+
+    def test_facet_counts_in_one_query(self):
+        from properties.amenities import amenity_facets
+
+        self._make("A", "WiFi, Parking")
+        self._make("B", "WiFi")
+        with self.assertNumQueries(1):
+            facets = amenity_facets(Property.objects.filter(university=self.uni))
+        self.assertEqual(facets[0], {"slug": "wifi", "name": "WiFi", "count": 2})
+        self.assertEqual(facets[1]["count"], 1)
+
+        # Facets describe the base set, so the amenities filter doesn't narrow them.
+        resp = self.client.get(f"/api/universities/{self.uni.id}/properties/?facets=1&amenities=parking")
+        self.assertEqual(len(resp.data["results"]), 1)
+        self.assertEqual({f["slug"]: f["count"] for f in resp.data["facets"]["amenities"]}, {"wifi": 2, "parking": 1})
+        self.assertNotIn("facets", self.client.get("/api/properties/").data)
+
+    def test_detail_exposes_amenity_list(self):
+        p = self._make("Detail", "Parking, WiFi")
+        resp = self.client.get(f"/api/properties/{p.id}/")
+        self.assertEqual(resp.data["amenity_list"], ["Parking", "WiFi"])
+
+
+class PropertyFacetTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.landlord = User.objects.create_user(email="facet@example.com", password="pass", role="landlord")
+        self.uni = University.objects.create(name="FacetUni", admin_fee_per_head=10)
+        self.client = APIClient()
+        for gender, sharing, price in [("girls", "single", 5), ("girls", "two", 25), ("boys", "single", 150)]:
+            Property.objects.create(
+                title=f"{gender} {sharing}", owner=self.landlord, university=self.uni, property_type="students",
+                is_approved=True, gender=gender, sharing=sharing, nightly_price=price, overnight=price < 100,
+            )
+
+    def test_counts_and_histogram_from_one_aggregate(self):
+        from properties.facets import compute_facets
+
+        qs = Property.objects.filter(university=self.uni)
+        with self.assertNumQueries(2):  # choices + price buckets, amenities
+            facets = compute_facets(qs, "nightly_price")
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(facets["overnight"], 2)
+        gender = {f["value"]: f["count"] for f in facets["gender"]}
+        self.assertEqual((gender["girls"], gender["boys"], gender["mixed"]), (2, 1, 0))
+        with self.assertNumQueries(1):
+            self.assertNotIn("amenities", compute_facets(qs, "nightly_price", amenities=False))
+        buckets = facets["price"]["buckets"]
+        self.assertEqual(buckets[0], {"min": 0, "max": 10, "count": 1})
+        self.assertEqual(buckets[-1], {"min": 100, "max": None, "count": 1})
+        self.assertEqual(sum(b["count"] for b in buckets), 3)
+
+    def test_api_facets_ignore_active_filters_and_are_cached(self):
+        url = f"/api/universities/{self.uni.id}/properties/?facets=1"
+        resp = self.client.get(url + "&gender=girls")
+        self.assertEqual(len(resp.data["results"]), 2)
+        sharing = {f["value"]: f["count"] for f in resp.data["facets"]["sharing"]}
+        self.assertEqual(sharing["single"], 2)
+
+        from unittest import mock
+
+        with mock.patch("properties.facets.compute_facets") as compute:
+            self.client.get(url + "&gender=boys")
+        compute.assert_not_called()
+
+        Property.objects.create(
+            title="new", owner=self.landlord, university=self.uni, property_type="students",
+            is_approved=True, gender="mixed",
+        )
+        resp = self.client.get(url)
+        self.assertEqual(resp.data["facets"]["total"], 4)
+
+    def test_web_filter_buttons_show_counts(self):
+        resp = self.client.get("/students-accommodation/facetuni/?gender=boys")
+        self.assertContains(resp, "Girls Only (2)")
+        self.assertContains(resp, "Single Room (2)")
@@ -0,0 +1,230 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from properties import search_index
+from properties.models import City, Property, PropertyToken, University
+
+
+class PropertySearchIndexTests(TestCase):
+    def setUp(self):
+        self.city = City.objects.create(name='Harare')
+        self.uni = University.objects.create(name='Search Uni', city=self.city, admin_fee_per_head=10)
+        self.owner = User.objects.create_user(email='owner@example.com', password='pass', role='landlord')
+        self.client = APIClient()
+
+    def _make(self, title, **kwargs):
+        return Property.objects.create(
+            title=title, owner=self.owner, university=self.uni, city=self.city,
+            property_type='students', is_approved=True, **kwargs,
+        )
+
+    def test_backend_follows_vendor(self):
+        self.assertIsInstance(search_index.get_backend(), search_index.SQLiteFTSBackend)
+
+    def test_prefix_and_all_terms_must_match(self):
+        wifi = self._make('Garden cottage', amenities='WiFi,Parking')
+        self._make('Garden flat', amenities='Parking')
+        qs = Property.objects.all()
+        self.assertEqual(list(search_index.search(qs, 'wif')), [wifi])
+        self.assertEqual(list(search_index.search(qs, 'garden wifi')), [wifi])
+        self.assertEqual(search_index.search(qs, 'garden').count(), 2)
+
+    def test_index_follows_saves_deletes_and_city_renames(self):
+        prop = self._make('Plain room')
+        qs = Property.objects.all()
+        self.assertFalse(search_index.search(qs, 'solar').exists())
+
+        prop.description = 'Solar backup included'
+        prop.save()
+        self.assertEqual(list(search_index.search(qs, 'solar')), [prop])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.city.save()  # name unchanged: nothing to reindex
+        self.assertEqual(callbacks, [])
+
+        other = self._make('Other room')
+        self.city.name = 'Bulawayo'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.city.save()
+        self.assertEqual(list(search_index.search(qs, 'bulaw').order_by('pk')), [prop, other])
+        self.assertFalse(search_index.search(qs, 'harare').exists())
+        self.assertEqual(search_index.score(qs, ['bulawayo']).get(pk=other.pk).relevance_score, 2)
+
+        pk = prop.pk
+        prop.delete()
+        self.assertFalse(search_index.search(Property.objects.filter(pk=pk), 'solar').exists())
+
+    def test_query_syntax_is_escaped(self):
+        self._make('Quoted "house"')
+        self.assertEqual(search_index.search(Property.objects.all(), '"house" OR NEAR(').count(), 0)
+        self.assertEqual(search_index.search(Property.objects.all(), '"house"').count(), 1)
+
+    def test_api_orders_by_bm25(self):
+        weak = self._make('Room', description='close to the mall')
+        strong = self._make('Mall view apartment', location='Mall road')
+        resp = self.client.get(f'/api/universities/{self.uni.id}/properties/?q=mall')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p['id'] for p in resp.data['results']], [strong.id, weak.id])
+
+    def test_rebuild_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        prop = self._make('Rebuilt house')
+        search_index.get_backend().clear()
+        self.assertFalse(search_index.search(Property.objects.all(), 'rebuilt').exists())
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(list(search_index.search(Property.objects.all(), 'rebuilt')), [prop])
+
+    def test_web_listing_search_and_related(self):
+        both = self._make('Solar cottage', amenities='WiFi')
+        solar_only = self._make('Solar room')
+        self._make('Plain room')
+        resp = self.client.get('/students-accommodation/search-uni/?q=solar,wifi')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(resp.context['properties']), [both])
+        self.assertEqual(list(resp.context['related_properties']), [solar_only])
+
+
+class PropertyTokenIndexTests(TestCase):
+    def setUp(self):
+        self.city = City.objects.create(name='Harare')
+        self.uni = University.objects.create(name='Token Uni', city=self.city, admin_fee_per_head=10)
+        self.owner = User.objects.create_user(email='tok@example.com', password='pass', role='landlord')
+
+    def _make(self, title, **kwargs):
+        return Property.objects.create(
+            title=title, owner=self.owner, university=self.uni, city=self.city,
+            property_type='students', is_approved=True, **kwargs,
+        )
+
+    def test_tokens_carry_field_weights(self):
+        prop = self._make('Garden flat', location='Garden road', amenities='WiFi')
+        weights = dict(PropertyToken.objects.filter(property=prop).values_list('token', 'weight'))
+        self.assertEqual(weights['garden'], 6 + 4)
+        self.assertEqual(weights['wifi'], 3)
+        self.assertEqual(weights['harare'], 2)
+
+        prop.amenities = ''
+        prop.save()
+        self.assertFalse(PropertyToken.objects.filter(property=prop, token='wifi').exists())
+
+    def test_score_and_related_use_token_join(self):
+        title_hit = self._make('Wifi house')
+        amenity_hit = self._make('Room', amenities='WiFi')
+        other = self._make('Parking only', amenities='Parking')
+        qs = Property.objects.all()
+
+        scored = list(search_index.score(qs, ['wifi']).order_by('-relevance_score', 'pk'))
+        self.assertEqual(scored[:2], [title_hit, amenity_hit])
+        self.assertEqual(scored[2].relevance_score, 0)
+
+        with self.assertNumQueries(1):
+            related = list(search_index.related(qs, ['wifi', 'parking']))
+        # "parking" hits title + amenities (9), "wifi" title (6), then amenities (3)
+        self.assertEqual(related, [other, title_hit, amenity_hit])
+
+    def test_score_and_related_prefix_match_like_search(self):
+        wifi = self._make('Wifi house')
+        self._make('Quiet room')
+        qs = Property.objects.all()
+        self.assertEqual(list(search_index.search(qs, 'wif')), [wifi])
+        self.assertEqual(search_index.score(qs, ['wif']).get(pk=wifi.pk).relevance_score, 6)
+        self.assertEqual(list(search_index.related(qs, ['wif'])), [wifi])
+        self.assertEqual(list(search_index.related(qs, ['wifiz'])), [])
+
+    def test_session_terms_rank_web_listing(self):
+        low = self._make('Room', description='near the gym')
+        high = self._make('Gym apartment')
+        session = self.client.session
+        session['search_terms'] = {'gym': 3}
+        session.save()
+        resp = self.client.get('/students-accommodation/token-uni/')
+        self.assertEqual(list(resp.context['properties'])[:2], [high, low])
+
+
+class SearchSuggestTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.city = City.objects.create(name='Chinhoyi')
+        self.uni = University.objects.create(name='Midlands State University', city=self.city, admin_fee_per_head=10)
+        self.other_uni = University.objects.create(name='University of Zimbabwe', admin_fee_per_head=10)
+        owner = User.objects.create_user(email='sugg@example.com', password='pass', role='landlord')
+        self.listing = Property.objects.create(
+            title='Midway cottage', owner=owner, university=self.uni, property_type='students', is_approved=True,
+        )
+        Property.objects.create(title='Midnight draft', owner=owner, property_type='students')
+        self.client = APIClient()
+
+    def _labels(self, **params):
+        resp = self.client.get('/api/search/suggest/', params)
+        self.assertEqual(resp.status_code, 200)
+        return [r['label'] for r in resp.data['results']]
+
+    def test_prefix_matches_rank_whole_label_first(self):
+        self.assertEqual(self._labels(q='mid'), ['Midlands State University', 'Midway cottage'])
+        self.assertEqual(self._labels(q='univ zim'), ['University of Zimbabwe'])
+
+    def test_typos_and_type_filter(self):
+        self.assertEqual(self._labels(q='chinoyi'), ['Chinhoyi'])
+        self.assertEqual(self._labels(q='midlnds stat', types='university'), ['Midlands State University'])
+        self.assertEqual(self._labels(q='mid', types='property'), ['Midway cottage'])
+        self.assertEqual(self._labels(q=''), [])
+
+    def test_warm_index_needs_no_queries_and_rebuilds_on_change(self):
+        self._labels(q='mid')
+        with self.assertNumQueries(0):
+            self._labels(q='mid')
+
+        self.uni.name = 'Great Zimbabwe University'
+        self.uni.save()
+        self.assertEqual(self._labels(q='great'), ['Great Zimbabwe University'])
+        self.assertNotIn('Midlands State University', self._labels(q='midlands'))
+
+        # Edits that don't touch indexed names keep the warm index.
+        self.listing.nightly_price = 40
+        self.listing.save()
+        self.uni.save(update_fields=['admin_fee_per_head'])
+        with self.assertNumQueries(0):
+            self._labels(q='mid')
+        # Hiding a listing takes it out of the suggestions.
+        self.listing.is_available = False
+        self.listing.save()
+        self.assertEqual(self._labels(q='mid', types='property'), [])
+
+    def test_invalidation_during_a_build_still_returns_an_index(self):
+        from unittest import mock
+
+        from properties import suggest
+
+        real_build = suggest.build_index
+
+        def build_then_invalidate():
+            index = real_build()
+            suggest.invalidate()
+            return index
+
+        with mock.patch.object(suggest, 'build_index', side_effect=build_then_invalidate):
+            self.assertEqual([r['label'] for r in suggest.suggest('chinh')], ['Chinhoyi'])
+
+    def test_university_slug_lookup_reads_the_database(self):
+        from django.http import Http404
+        from web.views import _get_university_by_slug_or_404
+
+        self._labels(q='mid')  # warm index
+        # bulk_create skips the signals, like a save handled by another worker.
+        University.objects.bulk_create([University(name="St. Mary's College", admin_fee_per_head=10)])
+        self.assertEqual(_get_university_by_slug_or_404('st-marys-college').name, "St. Mary's College")
+        self.assertEqual(_get_university_by_slug_or_404('university-of-zimbabwe'), self.other_uni)
+        with self.assertRaises(Http404):
+            _get_university_by_slug_or_404('nope')
+
+    def test_whatsapp_university_tool_is_typo_tolerant(self):
+        from whatsapp_bot.ai_router import _tool_list_universities
+
+        self.assertEqual([u['id'] for u in _tool_list_universities('univrsity of zimbabwe')][0], self.other_uni.pk)
+        self.assertEqual(len(_tool_list_universities()), 2)
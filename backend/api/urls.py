@@ -22,6 +22,7 @@ urlpatterns = [
     path("cities/", views.CityListView.as_view(), name="cities-list"),
     path("universities/", views.UniversityListView.as_view(), name="universities-list"),
     path("universities/<int:pk>/", views.UniversityDetailView.as_view(), name="university-detail"),
+    path("search/suggest/", views.SearchSuggestView.as_view(), name="search-suggest"),
     path("universities/<int:pk>/properties/", views.UniversityPropertiesView.as_view(), name="university-properties"),
     path("properties/", views.PropertyListView.as_view(), name="properties-list"),
     path("properties/nearby/", views.NearbyPropertiesView.as_view(), name="properties-nearby"),
@@ -37,13 +38,18 @@ urlpatterns = [
     path("payments/confirmations/<int:pk>/cancel/", views.CancelPaymentConfirmationView.as_view(), name="cancel-payment-confirmation"),
 
     # admin actions
+    path("admin/payment-confirmations/review/", views.ReviewPaymentConfirmationsView.as_view(), name="review-payment-confirmations"),
     path("admin/payment-confirmations/<int:pk>/approve/", views.ApprovePaymentConfirmationView.as_view(), name="approve-payment-confirmation"),
     path("admin/payment-confirmations/<int:pk>/decline/", views.DeclinePaymentConfirmationView.as_view(), name="decline-payment-confirmation"),
     path("admin/properties/<int:pk>/approve/", views.ApprovePropertyView.as_view(), name="approve-property"),
 
     # notifications
     path("notifications/", views.NotificationListView.as_view(), name="notifications-list"),
+    path("notifications/stream/", views.NotificationStreamView.as_view(), name="notifications-stream"),
+    path("notifications/unread-count/", views.NotificationUnreadCountView.as_view(), name="notifications-unread-count"),
+    path("notifications/mark-read/", views.MarkNotificationsReadBulkView.as_view(), name="notifications-mark-read"),
     path("notifications/<int:pk>/mark-read/", views.MarkNotificationReadView.as_view(), name="mark-notification-read"),
+    path("notifications/preferences/", views.NotificationPreferenceView.as_view(), name="notification-preferences"),
     # Feedback endpoint
     path("feedback/", FeedbackCreateView.as_view(), name="feedback-create"),
 ]
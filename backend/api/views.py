@@ -58,7 +58,11 @@ class ChangePasswordView(APIView):
             pass
 
         return Response({'detail': 'Password updated'}, status=status.HTTP_200_OK)
-from properties.models import University, Property, Service, City
+from core import metrics
+from properties import search_index
+from properties.facets import cached_facets
+from properties.filters import PropertyFilterSpec
+from properties.models import University, Property, PropertyImage, Service, City
 from payments.models import PaymentConfirmation, AdminFeePayment
 from .serializers import UniversitySerializer, PropertySerializer, PaymentConfirmationSerializer, ReviewSerializer, PropertyDetailSerializer, ServiceSerializer
 
@@ -74,9 +78,10 @@ class CityListView(APIView):
     """
 
     permission_classes = [permissions.AllowAny]
+    read_replica = True  # backend.db_router
 
     def get(self, request, *args, **kwargs):
-        from django.db.models import Count, Q, Min, Max
+        from django.db.models import Count, Q, Min, Max, OuterRef, Subquery
 
         include_empty = request.query_params.get("include_empty", "1").lower() in ("1", "true", "yes")
         include_breakdown = request.query_params.get("include_breakdown", "0").lower() in ("1", "true", "yes")
@@ -132,23 +137,25 @@ class CityListView(APIView):
         if not include_empty:
             qs = qs.filter(properties_count__gt=0)
 
-        # Provide a representative image per city if possible (best-effort).
-        # This is intentionally small/naive since dev DB sizes are small.
+        # A representative image per city: the first image of its newest
+        # matching listing. One subquery plus one image query, not per city.
+        newest = Property.objects.filter(is_approved=True, is_available=True, city=OuterRef("pk"))
+        if types:
+            newest = newest.filter(property_type__in=types)
+        qs = qs.annotate(sample_property_id=Subquery(newest.order_by("-created_at").values("pk")[:1]))
+        cities = list(qs)
+
+        sample_images = {}
+        sample_ids = {city.sample_property_id for city in cities} - {None}
+        for image in PropertyImage.objects.filter(property_id__in=sample_ids).order_by("pk"):
+            sample_images.setdefault(image.property_id, image)
+
         out = []
-        for city in qs:
+        for city in cities:
             sample_thumbnail = None
-            try:
-                prop_qs = Property.objects.filter(is_approved=True, is_available=True, city=city)
-                if types:
-                    prop_qs = prop_qs.filter(property_type__in=types)
-                prop = prop_qs.prefetch_related("images").order_by("-created_at").first()
-                if prop:
-                    img = prop.images.first()
-                    if img:
-                        url = img.image.url
-                        sample_thumbnail = request.build_absolute_uri(url)
-            except Exception:
-                sample_thumbnail = None
+            image = sample_images.get(city.sample_property_id)
+            if image and image.image:
+                sample_thumbnail = request.build_absolute_uri(image.image.url)
 
             payload = {
                 "id": city.id,
@@ -221,6 +228,7 @@ class UniversityListView(generics.ListAPIView):
     queryset = University.objects.all()
     serializer_class = UniversitySerializer
     permission_classes = [permissions.AllowAny]
+    read_replica = True  # backend.db_router
 
 
 class ServiceListView(generics.ListAPIView):
@@ -236,9 +244,76 @@ class UniversityDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
 
 
-class UniversityPropertiesView(generics.ListAPIView):
+class SearchSuggestView(APIView):
+    """Autocomplete: GET ?q=<text>&types=university,city,property&limit=10.
+
+    Served from the in-memory index in ``properties.suggest`` (prefix + typo
+    tolerant), no database query once the index is warm.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        from properties import suggest
+
+        q = (request.query_params.get("q") or "").strip()
+        if not q:
+            return Response({"results": []})
+        types = request.query_params.get("types")
+        kinds = [t.strip() for t in types.split(",") if t.strip() in suggest.KINDS] if types else None
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), 25))
+        except ValueError:
+            limit = 10
+        return Response({"results": suggest.suggest(q, kinds=kinds, limit=limit)})
+
+
+class PropertyFacetsMixin:
+    """Adds ``facets`` to list responses when the request has ``facets=1``.
+
+    Counts (gender, sharing, type, overnight, price histogram, amenities) are
+    for the base set: scope + ``q``, before the other filters. ``apply_filters``
+    records it in ``self.facet_base_queryset``; see ``properties.facets``.
+    """
+
+    facet_base_queryset = None
+    facet_price_field = "nightly_price"
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        wants = str(request.query_params.get("facets", "")).lower() in ("1", "true", "yes")
+        if (
+            wants
+            and self.facet_base_queryset is not None
+            and response.status_code == 200
+            and isinstance(response.data, dict)
+        ):
+            response.data["facets"] = cached_facets(self.facet_base_queryset, self.facet_price_field)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PropertyFilterMixin(PropertyFacetsMixin):
+    """List filters from ``properties.filters.PropertyFilterSpec``."""
+
+    filter_spec = PropertyFilterSpec()
+    search_text = ""
+
+    def apply_filters(self, qs):
+        result = self.filter_spec.compile(self.request.query_params, qs)
+        self.facet_base_queryset = result.base_queryset
+        self.facet_price_field = result.price_field
+        self.search_text = result.search_text
+        return result.queryset
+
+    def serialize(self, objs):
+        """``{"results": [...]}`` for ``objs``, timed as the ``serialize`` span."""
+        with metrics.span("serialize"):
+            return {"results": self.get_serializer(objs, many=True).data}
+
+
+class UniversityPropertiesView(PropertyFilterMixin, generics.ListAPIView):
     serializer_class = PropertySerializer
     permission_classes = [permissions.AllowAny]
+    read_replica = True  # backend.db_router
 
     def get(self, request, *args, **kwargs):
         uni_id = self.kwargs.get("pk")
@@ -281,8 +356,7 @@ class UniversityPropertiesView(generics.ListAPIView):
                 if page is not None:
                     serializer = self.get_serializer(page, many=True)
                     return self.get_paginated_response(serializer.data)
-                serializer = self.get_serializer(results, many=True)
-                return Response({"results": serializer.data})
+                return Response(self.serialize(results))
             except ValueError:
                 pass
         # no lat/lng: use queryset ordering
@@ -290,107 +364,20 @@ class UniversityPropertiesView(generics.ListAPIView):
             qs = qs.order_by("nightly_price" if order == "price_asc" else "-nightly_price")
         elif order == "newest":
             qs = qs.order_by("-created_at")
+        elif self.search_text:
+            # Best full-text match first.
+            qs = search_index.rank(qs, self.search_text).order_by("-search_rank", "-view_count", "-created_at")
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(qs, many=True)
-        return Response({"results": serializer.data})
+        return Response(self.serialize(qs))
 
-    def apply_filters(self, qs):
-        q = self.request.query_params.get("q")
-        if q:
-            qs = qs.filter(title__icontains=q) | qs.filter(description__icontains=q)
-        gender = self.request.query_params.get("gender")
-        if gender:
-            qs = qs.filter(gender=gender)
-        sharing = self.request.query_params.get("sharing")
-        if sharing:
-            qs = qs.filter(sharing=sharing)
-        overnight = self.request.query_params.get("overnight")
-        if overnight is not None:
-            if overnight.lower() in ("1", "true", "yes"):
-                qs = qs.filter(overnight=True)
-            elif overnight.lower() in ("0", "false", "no"):
-                qs = qs.filter(overnight=False)
-        min_price = self.request.query_params.get("min_price")
-        max_price = self.request.query_params.get("max_price")
-        # Choose price field based on property type (if provided).
-        property_type = self.request.query_params.get("property_type")
-        property_types_param = self.request.query_params.get("property_types")
-        types = []
-        if property_types_param:
-            types = [t.strip() for t in property_types_param.split(",") if t.strip()]
-        elif property_type:
-            types = [property_type]
-        if types:
-            qs = qs.filter(property_type__in=types)
 
-        price_field = "price_per_month" if (types and all(t in ("long_term", "shop") for t in types)) else "nightly_price"
-        try:
-            if min_price:
-                qs = qs.filter(**{f"{price_field}__gte": float(min_price)})
-            if max_price:
-                qs = qs.filter(**{f"{price_field}__lte": float(max_price)})
-        except ValueError:
-            pass
-        return qs
-
-
-class PropertyListView(generics.ListAPIView):
+class PropertyListView(PropertyFilterMixin, generics.ListAPIView):
     serializer_class = PropertySerializer
     permission_classes = [permissions.AllowAny]
-
-    def apply_filters(self, qs):
-        # reuse same filtering logic as university view
-        q = self.request.query_params.get("q")
-        if q:
-            qs = qs.filter(title__icontains=q) | qs.filter(description__icontains=q)
-        gender = self.request.query_params.get("gender")
-        if gender:
-            qs = qs.filter(gender=gender)
-        sharing = self.request.query_params.get("sharing")
-        if sharing:
-            qs = qs.filter(sharing=sharing)
-        overnight = self.request.query_params.get("overnight")
-        if overnight is not None:
-            if overnight.lower() in ("1", "true", "yes"):
-                qs = qs.filter(overnight=True)
-            elif overnight.lower() in ("0", "false", "no"):
-                qs = qs.filter(overnight=False)
-        property_type = self.request.query_params.get("property_type")
-        property_types_param = self.request.query_params.get("property_types")
-        types = []
-        if property_types_param:
-            types = [t.strip() for t in property_types_param.split(",") if t.strip()]
-        elif property_type:
-            types = [property_type]
-        if types:
-            qs = qs.filter(property_type__in=types)
-
-        # City filtering
-        city_id = self.request.query_params.get("city_id") or self.request.query_params.get("city")
-        city_name = self.request.query_params.get("city_name")
-        if city_id:
-            try:
-                qs = qs.filter(city_id=int(city_id))
-            except ValueError:
-                pass
-        elif city_name:
-            qs = qs.filter(city__name__iexact=city_name)
-
-        # Price filtering
-        min_price = self.request.query_params.get("min_price")
-        max_price = self.request.query_params.get("max_price")
-        price_field = "price_per_month" if (types and all(t in ("long_term", "shop") for t in types)) else "nightly_price"
-        try:
-            if min_price:
-                qs = qs.filter(**{f"{price_field}__gte": float(min_price)})
-            if max_price:
-                qs = qs.filter(**{f"{price_field}__lte": float(max_price)})
-        except ValueError:
-            pass
-        return qs
+    read_replica = True  # backend.db_router
 
     def get(self, request, *args, **kwargs):
         qs = Property.objects.filter(is_approved=True, is_available=True)
@@ -429,34 +416,26 @@ class PropertyListView(generics.ListAPIView):
                 if page is not None:
                     serializer = self.get_serializer(page, many=True)
                     return self.get_paginated_response(serializer.data)
-                serializer = self.get_serializer(results, many=True)
-                return Response({"results": serializer.data})
+                return Response(self.serialize(results))
             except ValueError:
                 pass
         # Price ordering: use monthly for long-term/shop, otherwise nightly.
-        property_type = request.query_params.get("property_type")
-        property_types_param = request.query_params.get("property_types")
-        types = []
-        if property_types_param:
-            types = [t.strip() for t in property_types_param.split(",") if t.strip()]
-        elif property_type:
-            types = [property_type]
-
-        price_field = "price_per_month" if (types and all(t in ("long_term", "shop") for t in types)) else "nightly_price"
-
+        price_field = self.facet_price_field
         if order in ("price_asc", "price_desc"):
             qs = qs.order_by(price_field if order == "price_asc" else f"-{price_field}")
         elif order == "newest":
             qs = qs.order_by("-created_at")
+        elif self.search_text:
+            # Best full-text match first.
+            qs = search_index.rank(qs, self.search_text).order_by("-search_rank", "-view_count", "-created_at")
         page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(qs, many=True)
-        return Response({"results": serializer.data})
+        return Response(self.serialize(qs))
 
 class PropertyDetailView(generics.RetrieveAPIView):
-    queryset = Property.objects.filter(is_approved=True, is_available=True)
+    queryset = Property.objects.filter(is_approved=True, is_available=True).prefetch_related("amenity_tags")
     serializer_class = PropertyDetailSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -622,8 +601,8 @@ class NotifyAdminPaymentView(APIView):
     
     def post(self, request, pk):
         """Notify admin to check pending payment"""
-        from django.contrib.auth import get_user_model
-        
+        from core.notifications import notify_admins
+
         try:
             payment = AdminFeePayment.objects.get(pk=pk, user=request.user)
             confirmation = payment.confirmations.filter(status='pending').first()
@@ -632,14 +611,10 @@ class NotifyAdminPaymentView(APIView):
                 return Response({"detail": "No pending payment confirmation found."}, status=400)
             
             # Notify all admin users
-            User = get_user_model()
-            admins = User.objects.filter(is_staff=True)
-            for admin in admins:
-                Notification.objects.create(
-                    recipient=admin,
-                    title="Payment Check Requested",
-                    message=f"{request.user.email} is requesting review of their payment for {payment.university.name}. Amount: ${payment.amount}."
-                )
+            notify_admins(
+                title="Payment Check Requested",
+                message=f"{request.user.email} is requesting review of their payment for {payment.university.name}. Amount: ${payment.amount}.",
+            )
             
             return Response({"detail": "Admin has been notified."})
         except AdminFeePayment.DoesNotExist:
@@ -675,6 +650,8 @@ class CancelPaymentConfirmationView(APIView):
 # Admin actions for payment confirmations
 from .permissions import IsAdminRole
 from payments.models import AdminFeePayment, PaymentConfirmation
+from payments.review import ACTIONS, review_confirmations
+from payments.unlock import unlock_contact
 from core.models import Notification
 from properties.models import Property
 from .serializers import PropertyContactSerializer
@@ -684,39 +661,33 @@ class ApprovePaymentConfirmationView(generics.UpdateAPIView):
     permission_classes = [IsAdminRole]
     queryset = PaymentConfirmation.objects.all()
     serializer_class = PaymentConfirmationSerializer
+    action = "approve"
 
     def update(self, request, *args, **kwargs):
         confirmation = self.get_object()
-        confirmation.status = "approved"
-        confirmation.save()
-        # activate the related AdminFeePayment
-        payment = confirmation.payment
-        payment.activate()
-        # notify the user
-        Notification.objects.create(
-            recipient=payment.user,
-            title="Payment confirmed",
-            message=f"Your payment for {payment.university.name} has been approved. You can now view landlord contacts for up to {payment.allowed_accommodations} accommodations.",
-        )
-        return Response({"status": "approved"})
+        review_confirmations([confirmation.pk], self.action)
+        return Response({"status": ACTIONS[self.action]})
+
+
+class DeclinePaymentConfirmationView(ApprovePaymentConfirmationView):
+    action = "decline"
 
 
-class DeclinePaymentConfirmationView(generics.UpdateAPIView):
+class ReviewPaymentConfirmationsView(APIView):
+    """Approve or decline many confirmations at once: ``{"action", "ids"}``."""
+
     permission_classes = [IsAdminRole]
-    queryset = PaymentConfirmation.objects.all()
-    serializer_class = PaymentConfirmationSerializer
 
-    def update(self, request, *args, **kwargs):
-        confirmation = self.get_object()
-        confirmation.status = "declined"
-        confirmation.save()
-        payment = confirmation.payment
-        Notification.objects.create(
-            recipient=payment.user,
-            title="Payment declined",
-            message=f"Your payment confirmation for {payment.university.name} was declined by admin.",
-        )
-        return Response({"status": "declined"})
+    def post(self, request):
+        action = request.data.get("action")
+        if action not in ACTIONS:
+            return Response({"detail": "action must be 'approve' or 'decline'."}, status=400)
+        try:
+            ids = [int(pk) for pk in request.data.get("ids") or []]
+        except (TypeError, ValueError):
+            return Response({"detail": "ids must be a list of confirmation ids."}, status=400)
+        changed = review_confirmations(ids, action)
+        return Response({"status": ACTIONS[action], "ids": changed})
 
 
 class ApprovePropertyView(generics.UpdateAPIView):
@@ -742,46 +713,22 @@ class ContactLandlordView(generics.GenericAPIView):
     serializer_class = PropertyContactSerializer
 
     def post(self, request, pk):
-        """If user has active AdminFeePayment for this university with uses_remaining>0, return contact details and decrement uses_remaining by 1.
-        Otherwise return payment instructions and calculated total when user provides 'students' in payload."""
+        """If user has active AdminFeePayment for this university with uses_remaining>0, return contact details and decrement uses_remaining by 1
+        (see ``payments.unlock``). Otherwise return payment instructions and calculated total when user provides 'students' in payload."""
         prop = generics.get_object_or_404(Property, pk=pk)
         user = request.user
-        # check for active payments for this university
-        active_payments = AdminFeePayment.objects.filter(user=user, university=prop.university)
-        active = None
-        for p in active_payments:
-            if p.is_active():
-                active = p
-                break
-
-        if active:
-            # decrement uses and return contact
-            if active.uses_remaining <= 0:
-                return Response({"detail": "No remaining uses on your approved payment. Please pay again."}, status=403)
-            # Match web behavior: do not decrement again if the user already viewed this property's contact.
-            try:
-                from payments.models import ContactView
-
-                already_viewed = ContactView.objects.filter(payment=active, property=prop).exists()
-                if not already_viewed:
-                    ContactView.objects.create(payment=active, property=prop)
-                    active.uses_remaining -= 1
-                    active.save(update_fields=["uses_remaining"])
-            except Exception:
-                # Fallback to original behavior if ContactView is unavailable for any reason.
-                active.uses_remaining -= 1
-                active.save(update_fields=["uses_remaining"])
-            data = {
+        # Spends one use unless this property was already unlocked.
+        unlock = unlock_contact(user, prop)
+        if unlock is not None:
+            return Response({
                 "house_number": prop.house_number,
                 "contact_phone": prop.contact_phone,
                 "caretaker_number": prop.caretaker_number,
                 "latitude": prop.latitude,
                 "longitude": prop.longitude,
                 "has_paid": True,
-                "uses_remaining": active.uses_remaining,
-            }
-            # optional: create a small notification to admin about the contact view
-            return Response(data)
+                "uses_remaining": unlock.uses_remaining,
+            })
 
         # No active payment: check if user has a pending/declined/canceled confirmation (web shows status UI).
         try:
@@ -844,30 +791,169 @@ class ContactLandlordView(generics.GenericAPIView):
 
 
 # Notification Views
+from .pagination import NotificationCursorPagination
+
+
+def _notification_payload(n):
+    return {
+        'id': n.id,
+        'title': n.title,
+        'message': n.message,
+        'link': n.link,
+        'is_read': n.is_read,
+        'created_at': n.created_at.isoformat()
+    }
+
+
 class NotificationListView(generics.ListAPIView):
+    """Cursor-paginated notifications for the current user (newest first).
+
+    Response: {"next": <url|null>, "previous": <url|null>, "results": [...]}
+    """
+
     permission_classes = [permissions.IsAuthenticated]
-    
+    pagination_class = NotificationCursorPagination
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user).only(
+            'id', 'title', 'message', 'link', 'is_read', 'created_at'
+        )
+
     def list(self, request, *args, **kwargs):
-        notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')[:20]
-        data = [{
-            'id': n.id,
-            'title': n.title,
-            'message': n.message,
-            'link': n.link,
-            'is_read': n.is_read,
-            'created_at': n.created_at.isoformat()
-        } for n in notifications]
-        return Response(data)
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response([_notification_payload(n) for n in page])
+
+
+class NotificationUnreadCountView(APIView):
+    """Cheap badge endpoint: cached unread count for the current user."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        from core.notifications import unread_count
+
+        return Response({"unread": unread_count(request.user.id)})
+
+
+class NotificationStreamView(APIView):
+    """Long-poll stream of new notifications.
+
+    GET ?since=<last seen id>&timeout=<seconds>. Returns immediately if the
+    user has notifications newer than ``since``; otherwise parks the request
+    until one is published or the timeout passes, then answers with
+    {"results": [... oldest first], "last_id": <cursor>, "unread": <count>,
+    "retry_after": <seconds>}. Clients loop, passing ``last_id`` back as
+    ``since`` after waiting ``retry_after`` seconds. The cursor is the row id:
+    a coalesced update (``core.notifications``) replaces the old row with a
+    new one, so it is delivered like any other notification.
+
+    A parked request holds a sync worker thread, so parking is opt-in
+    (``NOTIFICATION_STREAM_ENABLED``). When it is off the view answers at
+    once and tells clients to come back after ``NOTIFICATION_POLL_INTERVAL``,
+    which makes it a plain poll.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _new_since(self, user, since):
+        qs = Notification.objects.filter(recipient=user).only(
+            'id', 'title', 'message', 'link', 'is_read', 'created_at'
+        )
+        if since is not None:
+            qs = qs.filter(id__gt=since)
+        return list(qs.order_by('id')[:NotificationCursorPagination.max_page_size])
+
+    def get(self, request):
+        from django.conf import settings
+        from django.db import connection
+        from core.notifications import unread_count
+        from core.pubsub import broker
+
+        enabled = getattr(settings, 'NOTIFICATION_STREAM_ENABLED', False)
+        max_timeout = float(getattr(settings, 'NOTIFICATION_STREAM_TIMEOUT', 10)) if enabled else 0
+        retry_after = 0 if enabled else int(getattr(settings, 'NOTIFICATION_POLL_INTERVAL', 30))
+        try:
+            since = request.query_params.get('since')
+            since = int(since) if since not in (None, '') else None
+            timeout = float(request.query_params.get('timeout', max_timeout))
+        except (TypeError, ValueError):
+            return Response({"detail": "since must be an integer and timeout a number."}, status=400)
+        timeout = min(max(timeout, 0), max_timeout)
+
+        user = request.user
+        if since is None:
+            # First call: just hand back the cursor, no backlog replay.
+            last = Notification.objects.filter(recipient=user).order_by('-id').values_list('id', flat=True).first()
+            return Response({
+                "results": [], "last_id": last or 0, "unread": unread_count(user.id), "retry_after": retry_after,
+            })
+
+        # Subscribe before querying so a publish in between still wakes us.
+        with broker.subscribe(user.id) as seen:
+            rows = self._new_since(user, since)
+            if not rows and timeout:
+                # Don't keep a (persistent, CONN_MAX_AGE) connection while parked;
+                # the next query opens a fresh one.
+                if not connection.in_atomic_block:
+                    connection.close()
+                if broker.wait(user.id, seen, timeout):
+                    rows = self._new_since(user, since)
+
+        return Response({
+            "results": [_notification_payload(n) for n in rows],
+            "last_id": rows[-1].id if rows else since,
+            "unread": unread_count(user.id),
+            "retry_after": retry_after,
+        })
 
 
 class MarkNotificationReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, pk):
-        try:
-            notification = Notification.objects.get(id=pk, recipient=request.user)
-            notification.is_read = True
-            notification.save()
-            return Response({"status": "marked as read"})
-        except Notification.DoesNotExist:
+        from core.notifications import mark_read
+
+        if not Notification.objects.filter(id=pk, recipient=request.user).exists():
             return Response({"error": "Notification not found"}, status=404)
+        mark_read(request.user.id, ids=[pk])
+        return Response({"status": "marked as read"})
+
+
+class MarkNotificationsReadBulkView(APIView):
+    """Mark many notifications read in one UPDATE.
+
+    Body (optional): {"ids": [1, 2, 3]}. Without ids, all unread notifications are marked.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        from core.notifications import mark_read
+
+        ids = request.data.get("ids") if hasattr(request.data, "get") else None
+        if ids is not None:
+            if not isinstance(ids, (list, tuple)):
+                return Response({"detail": "'ids' must be a list."}, status=400)
+            try:
+                ids = [int(i) for i in ids]
+            except (TypeError, ValueError):
+                return Response({"detail": "'ids' must contain integers."}, status=400)
+        updated = mark_read(request.user.id, ids=ids)
+        return Response({"status": "marked as read", "updated": updated})
+
+
+class NotificationPreferenceView(generics.RetrieveUpdateAPIView):
+    """Get or change the current user's digest preference (off/daily/weekly)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_serializer_class(self):
+        from .serializers import NotificationPreferenceSerializer
+
+        return NotificationPreferenceSerializer
+
+    def get_object(self):
+        from core.models import NotificationPreference
+
+        pref, _ = NotificationPreference.objects.get_or_create(user=self.request.user)
+        return pref
@@ -0,0 +1,110 @@
+"""Send public browse reads to a read replica.
+
+Views marked with ``@replica_read`` (or ``read_replica = True`` on a class
+view) read from the ``REPLICA_DATABASE`` alias. These are the AllowAny
+browse endpoints: property lists, city summaries, the sitemap and the map.
+Everything else, and every write, uses ``default``.
+
+A replica lags the primary a little. So after a request that may have
+written (any method other than GET/HEAD/OPTIONS, or a GET that changed the
+session, like a search on a university page), ``ReplicaMiddleware`` sets a
+short-lived cookie. For ``REPLICA_PIN_SECONDS`` that browser reads from
+the primary everywhere, and sees its own new listing, payment or unlock
+straight away.
+
+Token (JWT) clients don't keep cookies, and authenticating them would load
+the user from the replica, where a just-registered account may be missing.
+Requests with an ``Authorization`` header therefore always read from the
+primary; only anonymous and session traffic is sent to the replica.
+
+Anything cached from a replica read would outlive the lag, so cached state
+is computed on the primary (``payments.entitlements``, ``properties.facets``)
+or not cached right after a change (``web.sitemaps``).
+
+With no replica configured (``REPLICA_DATABASE`` missing from
+``DATABASES``), nothing changes: all reads go to ``default``.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PIN_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def replica_alias():
+    """The replica alias, or ``None`` when none is configured."""
+    alias = getattr(settings, "REPLICA_DATABASE", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+def reading_from_replica():
+    return _read_alias.get() is not None
+
+
+def replica_read(view):
+    """Mark a function view as safe to serve from the replica."""
+    view.read_replica = True
+    return view
+
+
+def _is_replica_view(view_func):
+    if getattr(view_func, "read_replica", False):
+        return True
+    view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+    return bool(getattr(view_class, "read_replica", False))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary.
+        return db == "default"
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                _read_alias.reset(request._replica_token)
+        session = getattr(request, "session", None)
+        wrote = request.method not in SAFE_METHODS or getattr(session, "modified", False)
+        if wrote and replica_alias():
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = replica_alias()
+        if (
+            alias
+            and request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and "HTTP_AUTHORIZATION" not in request.META
+            and _is_replica_view(view_func)
+        ):
+            request._replica_token = _read_alias.set(alias)
+        return None
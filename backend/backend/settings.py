@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from backend import db_config
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv("DJANGO_SECRET", "dev-secret-key")
@@ -72,11 +74,16 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "backend.wsgi.application"
 
+# DATABASE_URL picks the backend (see backend/db_config.py); SQLite in BASE_DIR by default.
+# Connections are reused for DB_CONN_MAX_AGE seconds (0 = per request) and
+# health-checked before reuse.
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": db_config.parse(
+        os.getenv("DATABASE_URL", "sqlite:///db.sqlite3"),
+        base_dir=BASE_DIR,
+        conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        health_checks=os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1",
+    )
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -146,3 +153,67 @@ ECOCASH_ACCOUNT_HOLDER = os.getenv("ECOCASH_ACCOUNT_HOLDER", "T. Tayero")
 CONTACT_ADDRESS = os.getenv("CONTACT_ADDRESS", "4376 Coldstream Chinhoyi")
 CONTACT_PHONE = os.getenv("CONTACT_PHONE", "+263786196541")
 WHATSAPP_NUMBER = os.getenv("WHATSAPP_NUMBER", "+263785213532")
+
+# University visit tracking is buffered in memory and upserted in bulk.
+# Flush when this many seconds have passed or this many (ip, university) keys are pending.
+VISIT_TRACKING_FLUSH_INTERVAL = float(os.getenv("VISIT_TRACKING_FLUSH_INTERVAL", "30"))
+VISIT_TRACKING_MAX_PENDING = int(os.getenv("VISIT_TRACKING_MAX_PENDING", "500"))
+
+# Unread notifications with the same group key (e.g. repeated edits of one
+# property) collapse into one row within this many seconds.
+NOTIFICATION_COALESCE_WINDOW = int(os.getenv("NOTIFICATION_COALESCE_WINDOW", str(6 * 3600)))
+
+# notifications/stream/ long-polling. Each parked request holds a sync worker
+# thread, so it is off by default and the endpoint answers at once, telling
+# clients to poll again after NOTIFICATION_POLL_INTERVAL seconds. Turn it on
+# only with spare worker threads; NOTIFICATION_STREAM_TIMEOUT caps how long a
+# request is held (keep it well under the proxy/worker timeout).
+NOTIFICATION_STREAM_ENABLED = os.getenv("NOTIFICATION_STREAM_ENABLED", "0") == "1"
+NOTIFICATION_STREAM_TIMEOUT = float(os.getenv("NOTIFICATION_STREAM_TIMEOUT", "10"))
+NOTIFICATION_POLL_INTERVAL = int(os.getenv("NOTIFICATION_POLL_INTERVAL", "30"))
+
+# Approve confirmations whose EcoCash SMS matches the payment (amount,
+# recipient, date, new transaction id) without waiting for an admin. The SMS
+# is pasted by the user, so this also needs ECOCASH_VERIFIER: the dotted path
+# of a callable ``verify(parsed, payment) -> bool`` that looks the
+# transaction up in a trusted EcoCash source (merchant statement or API).
+# Without one nothing is auto-approved.
+ECOCASH_AUTO_APPROVE = os.getenv("ECOCASH_AUTO_APPROVE", "0") == "1"
+ECOCASH_VERIFIER = os.getenv("ECOCASH_VERIFIER", "")
+
+# sweep_payments cancels payment confirmations still pending after this many days.
+PAYMENT_CONFIRMATION_PENDING_DAYS = int(os.getenv("PAYMENT_CONFIRMATION_PENDING_DAYS", "14"))
+
+# Per-request timing/query metrics (core.metrics), served at /internal/metrics.
+# A request that runs one SQL statement this many times is flagged as an N+1.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", "5"))
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "core.metrics.MetricsMiddleware")
+
+# Read replica for the public browse views (backend/db_router.py). Without
+# DATABASE_REPLICA_URL every read stays on "default". After a write request the
+# browser reads from the primary for REPLICA_PIN_SECONDS (read-your-writes).
+REPLICA_DATABASE = "replica"
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+_replica_url = os.getenv("DATABASE_REPLICA_URL", "").strip()
+if _replica_url:
+    DATABASES[REPLICA_DATABASE] = db_config.parse(
+        _replica_url,
+        base_dir=BASE_DIR,
+        conn_max_age=DATABASES["default"]["CONN_MAX_AGE"],
+        health_checks=DATABASES["default"]["CONN_HEALTH_CHECKS"],
+    )
+    # Tests create one database; the replica alias reads it too.
+    DATABASES[REPLICA_DATABASE]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["backend.db_router.ReplicaRouter"]
+MIDDLEWARE.append("backend.db_router.ReplicaMiddleware")
+
+# Shared cache for all workers, e.g. redis://localhost:6379/0 (needs the redis
+# package). Without it each process has its own local-memory cache: a delete
+# on one worker doesn't reach the others, so per-user state cached for long
+# (payments.entitlements) falls back to short timeouts. See CACHE_SHARED.
+CACHE_URL = os.getenv("CACHE_URL", "").strip()
+if CACHE_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}}
+CACHE_SHARED = bool(CACHE_URL)
@@ -2,15 +2,17 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
 
-from web.sitemaps import sitemaps
+from web.sitemaps import sitemap_index, sitemap_section
+from core import views as core_views
 from web import views as web_views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="django-sitemap"),
+    path("sitemap.xml", sitemap_index, name="django-sitemap"),
+    path("sitemap-<section>.xml", sitemap_section, name="django-sitemap-section"),
     path("robots.txt", web_views.robots_txt, name="robots-txt"),
+    path("internal/metrics", core_views.metrics, name="internal-metrics"),
     path("api/", include("api.urls")),
     path("whatsapp/", include("whatsapp_bot.urls")),
     # Public web site at root
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, UserUniversityPreference, ContactMessage
+from .models import Notification, NotificationPreference, UserUniversityPreference, ContactMessage
 from .models_feedback import Feedback
 
 
@@ -17,6 +17,13 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ("recipient__email", "title")
 
 
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ("user", "digest", "last_digest_at")
+    list_filter = ("digest",)
+    search_fields = ("user__email",)
+
+
 @admin.register(UserUniversityPreference)
 class UserUniversityPreferenceAdmin(admin.ModelAdmin):
     list_display = ("ip_address", "user", "university", "visit_count", "last_visited")
@@ -11,8 +11,29 @@ class CoreConfig(AppConfig):
             import payments.signals  # noqa
         except Exception:
             pass
+        from . import signals  # noqa
         # Ensure Feedback model is registered
         try:
             from . import models_feedback  # noqa
         except Exception:
             pass
+        from . import models_analytics  # noqa
+
+        # SQLite PRAGMAs (WAL, busy timeout...) on every new connection
+        from django.db.backends.signals import connection_created
+        from backend.db_config import tune_connection
+
+        connection_created.connect(tune_connection, dispatch_uid="backend.db_config.tune_connection")
+
+        # Flush buffered university visits once responses have been sent
+        from django.core.signals import request_finished
+        from .visits import flush_visits_after_request
+
+        request_finished.connect(flush_visits_after_request, dispatch_uid="core.flush_visits")
+
+        # Deferred notification fan-outs run after the response, too
+        from django.core.signals import request_started
+        from .notifications import run_after_response, start_request
+
+        request_started.connect(start_request, dispatch_uid="core.notifications.start_request")
+        request_finished.connect(run_after_response, dispatch_uid="core.notifications.run_after_response")
@@ -0,0 +1,175 @@
+"""Performance regression benchmarks (``manage.py bench``).
+
+Each *case* is one request through the Django test client. Cases run
+against synthetic datasets of several sizes (``core.synthetic``), so growth
+in time or query count with data size is visible. For every case and size,
+the median wall time of ``repeat`` runs and the query count are recorded:
+
+    {"machine": {...}, "sizes": {"1000": {"property list": {"ms": 41.2, "queries": 3}, ...}}}
+
+``query_growth()`` flags cases whose query count rises with dataset size.
+That is an N+1, so it fails the run and a baseline is never recorded with it.
+
+``compare()`` checks a run against a stored baseline of that shape. A case
+regresses when its query count grows past ``query_tolerance``, or when its
+time grows by more than ``time_tolerance`` (a fraction) *and* by at least
+``min_ms``. The second rule keeps sub-millisecond noise on fast cases from
+failing the run. Query counts are portable, but timings only mean something
+on the machine that recorded them. ``machine`` identifies that machine, and
+times are only compared when it matches.
+"""
+
+import os
+import platform
+import statistics
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils.text import slugify
+
+from core.synthetic import DatasetGenerator
+
+
+def cases(ctx):
+    """``[(name, path)]`` for the benchmarked views; ``ctx`` holds sample ids."""
+    return [
+        ("property list", "/api/properties/"),
+        ("property list nearby", f"/api/properties/?lat={ctx['lat']}&lng={ctx['lng']}&radius_km=5"),
+        ("city list", "/api/cities/"),
+        ("university page search", f"/students-accommodation/{ctx['university_slug']}/?q=room"),
+        ("property detail", f"/property/{ctx['property_id']}/"),
+        ("sitemap", "/sitemap.xml"),
+        ("sitemap properties", "/sitemap-properties.xml"),
+        ("feedback analytics", "/feedback-analytics/"),
+    ]
+
+
+class Dataset:
+    """Grows one synthetic dataset through increasing sizes."""
+
+    def __init__(self, seed=1):
+        self.gen = DatasetGenerator(seed=seed)
+        self.cities = self.gen.cities()
+        self.universities = self.gen.universities(self.cities)
+        self.owner_ids = self.gen.users(5, role="landlord", prefix="landlord")
+        self.size = 0
+
+    def grow_to(self, size):
+        extra = size - self.size
+        if extra <= 0:
+            return
+        students = self.gen.users(max(1, extra // 5))
+        listed = self.gen.properties(extra, self.owner_ids, self.universities, self.cities)
+        property_ids = [pk for pk, _uni in listed]
+        self.gen.images(property_ids, 2)
+        self.gen.reviews(extra // 2, property_ids, students)
+        self.gen.contact_views(extra // 5, self.gen.payments(extra // 10, students, self.universities), listed)
+        self.gen.feedback(max(1, extra // 10))
+        self.gen.finalize()
+        self.size = size
+
+    def context(self):
+        from properties.models import Property
+
+        uni = self.universities[0]
+        detail = (
+            Property.objects.filter(is_approved=True, is_available=True)
+            .exclude(property_type="students").order_by("pk").first()
+        )
+        return {
+            "lat": float(uni.latitude),
+            "lng": float(uni.longitude),
+            "university_slug": slugify(uni.name),
+            "property_id": detail.pk if detail else 0,
+        }
+
+
+def measure(client, path, repeat=3):
+    # Caches and cookies are cleared so every run does the full work of a
+    # first anonymous visit; a session cookie left by an earlier case would
+    # add a lookup that looks like growth with dataset size.
+    cache.clear()
+    client.cookies.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(path)
+    queries = len(ctx.captured_queries)
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        client.cookies.clear()
+        start = time.perf_counter()
+        client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"ms": round(statistics.median(timings), 2), "queries": queries, "status": response.status_code}
+
+
+def machine():
+    """What the timings depend on; a baseline's times only apply where this matches."""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+    }
+
+
+def run(sizes, repeat=3, log=None, seed=1):
+    log = log or (lambda message: None)
+    dataset = Dataset(seed=seed)
+    client = Client()
+    results = {"machine": machine(), "sizes": {}}
+    for size in sorted(sizes):
+        dataset.grow_to(size)
+        log(f"{size} properties")
+        row = results["sizes"][str(size)] = {}
+        for name, path in cases(dataset.context()):
+            row[name] = measure(client, path, repeat)
+            log(f"  {name:<26}{row[name]['ms']:>10.2f} ms{row[name]['queries']:>6} queries")
+    return results
+
+
+def query_growth(results):
+    """Cases doing more queries on the largest dataset than on the smallest."""
+    sizes = sorted(results["sizes"], key=int)
+    if len(sizes) < 2:
+        return []
+    smallest, largest = results["sizes"][sizes[0]], results["sizes"][sizes[-1]]
+    return [
+        f"{name}: {smallest[name]['queries']} queries @ {sizes[0]}, "
+        f"{row['queries']} @ {sizes[-1]}"
+        for name, row in largest.items()
+        if name in smallest and row["queries"] > smallest[name]["queries"]
+    ]
+
+
+def same_machine(results, baseline):
+    return results.get("machine") == baseline.get("machine")
+
+
+def compare(results, baseline, time_tolerance=0.5, query_tolerance=0, min_ms=5.0, check_time=True):
+    """Regressions of ``results`` against ``baseline`` as readable strings.
+
+    Pass ``check_time=False`` when the baseline was recorded on another
+    machine (``same_machine``); only query counts are compared then.
+    """
+    regressions = []
+    for size, row in results["sizes"].items():
+        for name, current in row.items():
+            previous = baseline.get("sizes", {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            if current["queries"] > previous["queries"] + query_tolerance:
+                regressions.append(
+                    f"{name} @ {size}: {current['queries']} queries (baseline {previous['queries']})"
+                )
+            slower = current["ms"] - previous["ms"]
+            if check_time and slower > previous["ms"] * time_tolerance and slower >= min_ms:
+                regressions.append(
+                    f"{name} @ {size}: {current['ms']:.1f} ms (baseline {previous['ms']:.1f} ms, "
+                    f"+{slower / previous['ms']:.0%})"
+                )
+    return regressions
@@ -0,0 +1,209 @@
+"""Counts behind the feedback analytics page, kept as a cached rollup.
+
+The page used to load every Feedback row and tally it in Python, so it grew
+with the number of submissions. Counting now happens in the database:
+
+- one UNION ALL of ``values(field).annotate(Count)`` per chart field plus a
+  GROUP BY over ``FeedbackChallenge`` (``Feedback.challenges`` split into
+  rows when the feedback is saved)
+- one GROUP BY per free-text question for its top ``TOP_ANSWERS`` answers
+- one aggregate for the totals
+
+``rollup()`` caches the result. A new submission is added to the cached
+rollup after commit (``record``) instead of recounting: a free-text answer
+that might enter a full top list triggers a recount of that one question
+only. Edits and deletes drop the rollup (``invalidate``). Two submissions
+recorded at the same moment can't both take the lock; the loser drops the
+rollup so the next read recounts.
+
+All of this happens in the cache of the worker that saved the feedback. With
+a shared cache (``CACHE_URL``) every worker reads the same, up-to-date
+rollup. With the default per-process cache, other workers keep their own
+rollup without the new submission, so it is kept for
+``ROLLUP_LOCAL_TIMEOUT`` only and the page may lag by that much.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import CharField, Count, F, Q, Value
+from django.db.models.functions import Cast, Trim
+
+ROLLUP_KEY = "feedback:rollup"
+LOCK_KEY = "feedback:rollup:lock"
+ROLLUP_TIMEOUT = 3600
+ROLLUP_LOCAL_TIMEOUT = 60
+TOP_ANSWERS = 10
+
+# Page name -> Feedback field for every bar chart.
+CHART_FIELDS = {
+    "easy_to_use": "easy_to_use",
+    "user_friendly": "user_friendly",
+    "quick_response": "quick_response",
+    "easy_search": "easy_search",
+    "satisfaction": "satisfaction",
+    "recommend": "recommend",
+    "age": "age",
+    "gender": "gender",
+    "occupation": "occupation",
+    "city": "city",
+    "internet": "has_internet",
+    "search_freq": "online_search_freq",
+    "current_methods": "current_methods_rating",
+}
+TEXT_FIELDS = ("like_most", "challenges_exp", "improvements")
+
+
+def split_challenges(text):
+    """The distinct, non-empty labels in a comma-separated ``challenges`` value."""
+    labels = []
+    for label in (text or "").split(","):
+        label = label.strip()[:255]
+        if label and label not in labels:
+            labels.append(label)
+    return labels
+
+
+def save_challenges(feedbacks, replace=False):
+    """Write the ``FeedbackChallenge`` rows for ``feedbacks``."""
+    from .models_feedback import FeedbackChallenge
+
+    feedbacks = list(feedbacks)
+    if replace:
+        FeedbackChallenge.objects.filter(feedback__in=feedbacks).delete()
+    FeedbackChallenge.objects.bulk_create(
+        [FeedbackChallenge(feedback=fb, label=label) for fb in feedbacks for label in split_challenges(fb.challenges)],
+        batch_size=1000,
+    )
+
+
+def _is_set(value):
+    # Blank strings and 0 ratings were never counted.
+    return value not in (None, "", 0)
+
+
+def _empty(field):
+    from .models_feedback import Feedback
+
+    return 0 if Feedback._meta.get_field(field).get_internal_type() == "IntegerField" else ""
+
+
+def _grouped_counts():
+    """``{field: {value: count}}`` for the chart fields and ``"challenges"``, in one UNION ALL."""
+    from .models_feedback import Feedback, FeedbackChallenge
+
+    def grouped(qs, name, value):
+        return (
+            qs.annotate(chart=Value(name, output_field=CharField()), value=value)
+            .values_list("chart", "value")
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+
+    branches = [
+        grouped(
+            Feedback.objects.exclude(Q(**{f"{field}__isnull": True}) | Q(**{field: _empty(field)})),
+            field,
+            Cast(field, CharField()),
+        )
+        for field in CHART_FIELDS.values()
+    ]
+    branches.append(grouped(FeedbackChallenge.objects.all(), "challenges", F("label")))
+
+    counts = {field: {} for field in CHART_FIELDS.values()}
+    counts["challenges"] = {}
+    integer_fields = {field for field in CHART_FIELDS.values() if _empty(field) == 0}
+    for name, value, n in branches[0].union(*branches[1:], all=True):
+        counts[name][int(value) if name in integer_fields else value] = n
+    return counts
+
+
+def _answer(value):
+    # Same as SQL TRIM in _top_answers: spaces only, not tabs or newlines,
+    # so incremental updates and recounts bucket answers alike.
+    return (value or "").strip(" ")
+
+
+def _top_answers(field):
+    from .models_feedback import Feedback
+
+    rows = (
+        Feedback.objects.annotate(answer=Trim(field))
+        .exclude(answer="")
+        .values_list("answer")
+        .annotate(n=Count("pk"))
+        .order_by("-n", "answer")[:TOP_ANSWERS]
+    )
+    return dict(rows)
+
+
+def compute():
+    from .models_feedback import Feedback
+
+    totals = Feedback.objects.aggregate(
+        total=Count("pk"), with_ratings=Count("pk", filter=Q(easy_to_use__isnull=False))
+    )
+    charts = _grouped_counts()
+    return {
+        "total": totals["total"],
+        "with_ratings": totals["with_ratings"],
+        "challenges": charts.pop("challenges"),
+        "charts": charts,
+        "answers": {field: _top_answers(field) for field in TEXT_FIELDS},
+    }
+
+
+def _timeout():
+    return ROLLUP_TIMEOUT if getattr(settings, "CACHE_SHARED", False) else ROLLUP_LOCAL_TIMEOUT
+
+
+def rollup():
+    cached = cache.get(ROLLUP_KEY)
+    if cached is None:
+        cached = compute()
+        cache.set(ROLLUP_KEY, cached, _timeout())
+    return cached
+
+
+def _add(data, feedback):
+    data["total"] += 1
+    if feedback.easy_to_use is not None:
+        data["with_ratings"] += 1
+    for field in CHART_FIELDS.values():
+        value = getattr(feedback, field)
+        if _is_set(value):
+            counts = data["charts"][field]
+            counts[value] = counts.get(value, 0) + 1
+    for label in split_challenges(feedback.challenges):
+        data["challenges"][label] = data["challenges"].get(label, 0) + 1
+    for field in TEXT_FIELDS:
+        answer = _answer(getattr(feedback, field))
+        if not answer:
+            continue
+        top = data["answers"][field]
+        if answer in top or len(top) < TOP_ANSWERS:
+            # A list that isn't full holds every distinct answer, so a
+            # missing one is new.
+            top[answer] = top.get(answer, 0) + 1
+            data["answers"][field] = dict(sorted(top.items(), key=lambda item: (-item[1], item[0])))
+        else:
+            data["answers"][field] = _top_answers(field)
+
+
+def record(feedback):
+    """Add the committed, newly created ``feedback`` to the cached rollup."""
+    if not cache.add(LOCK_KEY, 1, 30):
+        cache.delete(ROLLUP_KEY)
+        return
+    try:
+        data = cache.get(ROLLUP_KEY)
+        if data is not None:
+            _add(data, feedback)
+            cache.set(ROLLUP_KEY, data, _timeout())
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def invalidate():
+    """Drop the rollup once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(ROLLUP_KEY))
@@ -0,0 +1,200 @@
+"""Daily KPI rollups: listing views, contact unlocks, visitors and payments.
+
+``run()`` folds source rows into two fact tables (``core.models_analytics``):
+
+- ``ListingDailyStats`` per (date, university, city, property_type): views,
+  unlocks (ContactView) and new listings (Property)
+- ``UniversityDailyStats`` per (date, university): new visitors
+  (UserUniversityPreference) and approved admin-fee payments (count and
+  amount, on the day of approval)
+
+Each run only reads rows it has not seen. A ``RollupWatermark`` per source
+table holds the highest id already counted; the next run takes the id range
+above it, grouped by day in the database. Rows younger than
+``SETTLE_DELAY`` wait for the next run, which leaves time for
+transactions that got a lower id but committed later.
+
+An AdminFeePayment row is created when a confirmation is submitted, before
+anyone has checked it, so payments are counted by ``approved_at`` instead:
+the watermark keeps the last cutoff, and each run takes approvals between
+it and the new one. Pending and declined payments are never revenue.
+
+``Property.view_count`` is a running total with no per-view rows, so views
+are counted as the growth since ``PropertyViewMark`` and land on the day of
+the run. Only properties whose count moved are read.
+
+The watermark rows are locked for the run, so two runs can't count the same
+rows. Admin dashboards read the fact tables only.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+SETTLE_DELAY = timedelta(minutes=5)
+SOURCES = ("property", "contactview", "approval", "visitor")
+
+
+def _id_range(qs, last_id, time_field, cutoff):
+    """Rows of ``qs`` above ``last_id`` up to the newest one older than ``cutoff``."""
+    upper = qs.filter(pk__gt=last_id, **{f"{time_field}__lt": cutoff}).aggregate(upper=Max("pk"))["upper"]
+    if upper is None:
+        return None, last_id
+    return qs.filter(pk__gt=last_id, pk__lte=upper), upper
+
+
+def _new_listings(last_id, cutoff):
+    from properties.models import Property
+
+    rows, last_id = _id_range(Property.objects.all(), last_id, "created_at", cutoff)
+    counts = Counter()
+    if rows is not None:
+        grouped = (
+            rows.values_list(TruncDate("created_at"), "university_id", "city_id", "property_type")
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+        for day, university, city, property_type, n in grouped:
+            counts[(day, university, city, property_type)] += n
+    return counts, last_id
+
+
+def _unlocks(last_id, cutoff):
+    from payments.models import ContactView
+
+    rows, last_id = _id_range(ContactView.objects.all(), last_id, "viewed_at", cutoff)
+    counts = Counter()
+    if rows is not None:
+        grouped = (
+            rows.values_list(
+                TruncDate("viewed_at"), "property__university_id", "property__city_id", "property__property_type"
+            )
+            .annotate(n=Count("pk"))
+            .order_by()
+        )
+        for day, university, city, property_type, n in grouped:
+            counts[(day, university, city, property_type)] += n
+    return counts, last_id
+
+
+def _approvals(since, cutoff):
+    """Payments approved in ``[since, cutoff)``; returns the new watermark time."""
+    from payments.models import AdminFeePayment
+
+    counts, amounts = Counter(), Counter()
+    if since is not None and since >= cutoff:
+        return counts, amounts, since
+    rows = AdminFeePayment.objects.filter(approved_at__lt=cutoff)
+    if since is not None:
+        rows = rows.filter(approved_at__gte=since)
+    grouped = (
+        rows.values_list(TruncDate("approved_at"), "university_id")
+        .annotate(n=Count("pk"), amount=Sum("amount"))
+        .order_by()
+    )
+    for day, university, n, amount in grouped:
+        counts[(day, university)] += n
+        amounts[(day, university)] += amount or 0
+    return counts, amounts, cutoff
+
+
+def _visitors(last_id, cutoff):
+    from core.models import UserUniversityPreference
+
+    rows, last_id = _id_range(UserUniversityPreference.objects.all(), last_id, "created_at", cutoff)
+    counts = Counter()
+    if rows is not None:
+        grouped = rows.values_list(TruncDate("created_at"), "university_id").annotate(n=Count("pk")).order_by()
+        for day, university, n in grouped:
+            counts[(day, university)] += n
+    return counts, last_id
+
+
+def _views(today):
+    """View growth per listing key since the last run; moves the marks forward."""
+    from properties.models import Property
+
+    from .models_analytics import PropertyViewMark
+
+    moved = list(
+        Property.objects.annotate(seen=Coalesce("view_mark__views", 0, output_field=IntegerField()))
+        .filter(view_count__gt=F("seen"))
+        .values_list("pk", "university_id", "city_id", "property_type", "view_count", "seen")
+    )
+    counts = Counter()
+    for _pk, university, city, property_type, views, seen in moved:
+        counts[(today, university, city, property_type)] += views - seen
+    PropertyViewMark.objects.bulk_create(
+        [PropertyViewMark(property_id=pk, views=views) for pk, _u, _c, _t, views, _s in moved],
+        update_conflicts=True,
+        unique_fields=["property"],
+        update_fields=["views"],
+        batch_size=1000,
+    )
+    return counts
+
+
+def _merge(model, key_fields, columns):
+    """Add ``{column: Counter(key -> n)}`` to the fact rows of ``model``; returns rows touched."""
+    deltas = defaultdict(Counter)
+    for column, counts in columns.items():
+        for key, n in counts.items():
+            deltas[key][column] += n
+    if not deltas:
+        return 0
+    existing = {
+        tuple(getattr(row, field) for field in key_fields): row
+        for row in model.objects.filter(date__in={key[0] for key in deltas})
+    }
+    updated, created = [], []
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = model(**dict(zip(key_fields, key)))
+            created.append(row)
+        else:
+            updated.append(row)
+        for column, n in delta.items():
+            setattr(row, column, getattr(row, column) + n)
+    model.objects.bulk_create(created, batch_size=1000)
+    model.objects.bulk_update(updated, list(columns), batch_size=1000)
+    return len(deltas)
+
+
+def run(now=None):
+    """Fold everything new into the rollups; returns ``{what: rows changed}``."""
+    from .models_analytics import ListingDailyStats, RollupWatermark, UniversityDailyStats
+
+    now = now or timezone.now()
+    cutoff = now - SETTLE_DELAY
+    for source in SOURCES:
+        RollupWatermark.objects.get_or_create(source=source)
+
+    with transaction.atomic():
+        marks = {wm.source: wm for wm in RollupWatermark.objects.select_for_update().filter(source__in=SOURCES)}
+        new_listings, marks["property"].last_id = _new_listings(marks["property"].last_id, cutoff)
+        unlocks, marks["contactview"].last_id = _unlocks(marks["contactview"].last_id, cutoff)
+        payments, amounts, marks["approval"].last_time = _approvals(marks["approval"].last_time, cutoff)
+        visitors, marks["visitor"].last_id = _visitors(marks["visitor"].last_id, cutoff)
+        views = _views(timezone.localdate(now))
+
+        result = {
+            "listing rows": _merge(
+                ListingDailyStats,
+                ("date", "university_id", "city_id", "property_type"),
+                {"views": views, "unlocks": unlocks, "new_listings": new_listings},
+            ),
+            "university rows": _merge(
+                UniversityDailyStats,
+                ("date", "university_id"),
+                {"visitors": visitors, "payments": payments, "payment_amount": amounts},
+            ),
+        }
+        for mark in marks.values():
+            mark.updated_at = now
+        RollupWatermark.objects.bulk_update(marks.values(), ["last_id", "last_time", "updated_at"])
+    return result
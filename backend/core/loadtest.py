@@ -0,0 +1,113 @@
+"""Stdlib load driver: replay a mixed request plan against a running server.
+
+    plan = build_plan(scenarios, total=5000, seed=1)
+    report = run(plan, base_url="http://127.0.0.1:8000", concurrency=16)
+    print(format_report(report))
+
+A *scenario* is ``(name, weight, make_path)``; ``make_path(rnd)`` returns a
+path such as ``/api/properties/?q=garden``. ``build_plan`` draws requests by
+weight from a seeded RNG, so the same plan can be replayed before and after
+a change. ``run`` sends them from a thread pool with ``urllib`` and records
+per-request latency; ``summarize`` reduces that to p50/p95/p99 per scenario.
+"""
+
+import itertools
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_plan(scenarios, total, seed=1):
+    rnd = random.Random(seed)
+    weights = [weight for _name, weight, _make in scenarios]
+    plan = []
+    for _ in range(total):
+        name, _weight, make_path = rnd.choices(scenarios, weights)[0]
+        plan.append((name, make_path(rnd)))
+    return plan
+
+
+def _fetch(base_url, path, timeout, headers):
+    request = urllib.request.Request(base_url.rstrip("/") + path, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, (time.perf_counter() - start) * 1000
+
+
+def run(plan, base_url, concurrency=8, timeout=30, duration=None, headers=None):
+    """Send ``plan`` (looping if ``duration`` seconds is given). Returns a report dict."""
+    headers = {"Accept": "application/json", **(headers or {})}
+    samples = {}
+    lock = threading.Lock()
+    position = itertools.count() if duration else iter(range(len(plan)))
+    deadline = time.monotonic() + duration if duration else None
+
+    def worker():
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None or (deadline and time.monotonic() >= deadline):
+                return
+            name, path = plan[i % len(plan)]
+            status, elapsed = _fetch(base_url, path, timeout, headers)
+            with lock:
+                samples.setdefault(name, []).append((status, elapsed))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def summarize(samples, wall_seconds):
+    endpoints = {}
+    total = 0
+    for name, rows in samples.items():
+        latencies = sorted(elapsed for _status, elapsed in rows)
+        errors = sum(1 for status, _elapsed in rows if status is None or status >= 400)
+        total += len(rows)
+        endpoints[name] = {
+            "requests": len(rows),
+            "errors": errors,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        }
+    return {
+        "requests": total,
+        "seconds": wall_seconds,
+        "rps": total / wall_seconds if wall_seconds else 0,
+        "endpoints": endpoints,
+    }
+
+
+def format_report(report):
+    lines = [f"{'endpoint':<26}{'reqs':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+    for name, row in sorted(report["endpoints"].items()):
+        lines.append(
+            f"{name:<26}{row['requests']:>7}{row['errors']:>8}"
+            f"{row['p50']:>9.1f}{row['p95']:>9.1f}{row['p99']:>9.1f}{row['max']:>9.1f}"
+        )
+    lines.append(f"{report['requests']} requests in {report['seconds']:.1f}s ({report['rps']:.1f} req/s)")
+    return "\n".join(lines)
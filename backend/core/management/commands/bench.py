@@ -0,0 +1,85 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import bench
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "baseline.json")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark key views on synthetic datasets of several sizes and compare time and "
+        "query counts with a JSON baseline. Fails if a view's query count grows with the "
+        "dataset size. Times are only compared against a baseline from the same machine. "
+        "Runs in a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="200,1000", help="Comma-separated property counts.")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+        parser.add_argument("--update", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument(
+            "--time-tolerance", type=float, default=0.5,
+            help="Allowed slowdown as a fraction of the baseline time (0.5 = +50%%).",
+        )
+        parser.add_argument("--query-tolerance", type=int, default=0, help="Allowed extra queries per case.")
+        parser.add_argument("--min-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = bench.run(sizes, repeat=options["repeat"], log=self.stdout.write, seed=options["seed"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        failed = [
+            f"{name} @ {size}: HTTP {row['status']}"
+            for size, cases in results["sizes"].items() for name, row in cases.items() if row["status"] != 200
+        ]
+        if failed:
+            raise CommandError("Benchmark requests failed:\n  " + "\n  ".join(failed))
+
+        growing = bench.query_growth(results)
+        if growing:
+            raise CommandError("Query counts grow with dataset size (N+1?):\n  " + "\n  ".join(growing))
+
+        if options["update"]:
+            os.makedirs(os.path.dirname(options["baseline"]), exist_ok=True)
+            with open(options["baseline"], "w") as fh:
+                json.dump(results, fh, indent=2, sort_keys=True)
+                fh.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"✓ Baseline written to {options['baseline']}"))
+            return
+
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write(self.style.WARNING("No baseline yet; run with --update to record one."))
+            return
+        with open(options["baseline"]) as fh:
+            baseline = json.load(fh)
+        check_time = bench.same_machine(results, baseline)
+        if not check_time:
+            self.stdout.write(self.style.WARNING(
+                "Baseline timings were recorded on another machine; comparing query counts only. "
+                "Run with --update here to record local timings."
+            ))
+        regressions = bench.compare(
+            results, baseline, time_tolerance=options["time_tolerance"],
+            query_tolerance=options["query_tolerance"], min_ms=options["min_ms"], check_time=check_time,
+        )
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("✓ No regressions against the baseline"))
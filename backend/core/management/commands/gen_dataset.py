@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.synthetic import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-insert a synthetic production-sized dataset (cities, universities, users, "
+        "properties, images, reviews, payments, contact views) for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--properties", type=int, default=10000)
+        parser.add_argument("--users", type=int, default=5000, help="Student accounts.")
+        parser.add_argument("--landlords", type=int, default=None, help="Default: one per 20 properties.")
+        parser.add_argument("--universities", type=int, default=10)
+        parser.add_argument("--reviews", type=int, default=None, help="Default: one per 2 properties.")
+        parser.add_argument("--images", type=int, default=3, help="Up to N images per property.")
+        parser.add_argument("--payments", type=int, default=None, help="Default: one per 5 users.")
+        parser.add_argument("--contact-views", type=int, default=None, help="Default: two per payment.")
+        parser.add_argument("--feedback", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--skip-search-index", action="store_true",
+            help="Don't rebuild the search index afterwards (run rebuild_search_index later).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        properties = options["properties"]
+        users = options["users"]
+        landlords = options["landlords"] if options["landlords"] is not None else max(1, properties // 20)
+        reviews = options["reviews"] if options["reviews"] is not None else properties // 2
+        payments = options["payments"] if options["payments"] is not None else users // 5
+        contact_views = options["contact_views"] if options["contact_views"] is not None else payments * 2
+
+        gen = DatasetGenerator(seed=options["seed"], batch_size=options["batch_size"], log=self.stdout.write)
+        with transaction.atomic():
+            cities = gen.cities()
+            universities = gen.universities(cities, options["universities"])
+            self.stdout.write(f"{len(cities)} cities, {len(universities)} universities")
+            owner_ids = gen.users(landlords, role="landlord", prefix="landlord")
+            student_ids = gen.users(users) if users else []
+            listed = gen.properties(properties, owner_ids, universities, cities)
+            property_ids = [pk for pk, _uni in listed]
+            gen.images(property_ids, options["images"])
+            if student_ids and property_ids:
+                gen.reviews(reviews, property_ids, student_ids)
+                unlocked = gen.payments(payments, student_ids, universities)
+                gen.contact_views(contact_views, unlocked, listed)
+            gen.feedback(options["feedback"])
+        gen.finalize(search_index=not options["skip_search_index"])
+        self.stdout.write(self.style.SUCCESS(f"✓ Dataset generated in {time.monotonic() - started:.1f}s"))
@@ -0,0 +1,78 @@
+import json
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+
+from core import loadtest
+from properties.models import City, Property, University
+
+SEARCH_TERMS = ["garden", "wifi", "cosy flat", "student room", "solar", "parking", "2km", "150"]
+SUGGEST_PREFIXES = ["un", "midl", "harar", "chinoyi", "univ of zim", "gwe", "bula"]
+
+
+def default_scenarios(sample=200):
+    """Mixed browse/search traffic over ids sampled from this database."""
+    listed = Property.objects.filter(is_approved=True, is_available=True)
+    property_ids = list(listed.order_by("?").values_list("pk", flat=True)[:sample])
+    universities = list(University.objects.values_list("pk", "name", "latitude", "longitude")[:sample])
+    city_ids = list(City.objects.values_list("pk", flat=True)[:sample])
+    if not (property_ids and universities and city_ids):
+        raise CommandError("Database has no listings to replay; run gen_dataset first.")
+
+    def query(path, **params):
+        return f"{path}?{urlencode(params)}" if params else path
+
+    def nearby(rnd):
+        _pk, _name, lat, lng = rnd.choice(universities)
+        return query("/api/properties/", lat=lat or -17.78, lng=lng or 31.05, radius_km=5)
+
+    return [
+        ("properties", 20, lambda rnd: query("/api/properties/", order=rnd.choice(["newest", "price_asc"]))),
+        ("properties?q", 10, lambda rnd: query("/api/properties/", q=rnd.choice(SEARCH_TERMS))),
+        ("properties?lat", 5, nearby),
+        ("properties?city", 5, lambda rnd: query("/api/properties/", city=rnd.choice(city_ids), facets=1)),
+        ("university properties", 15, lambda rnd: query(
+            f"/api/universities/{rnd.choice(universities)[0]}/properties/", gender=rnd.choice(["girls", "boys", "all"]),
+        )),
+        ("property detail", 20, lambda rnd: f"/api/properties/{rnd.choice(property_ids)}/"),
+        ("suggest", 10, lambda rnd: query("/api/search/suggest/", q=rnd.choice(SUGGEST_PREFIXES))),
+        ("cities", 3, lambda rnd: "/api/cities/"),
+        ("universities", 2, lambda rnd: "/api/universities/"),
+        ("web university page", 10, lambda rnd: query(
+            f"/students-accommodation/{slugify(rnd.choice(universities)[1])}/", q=rnd.choice(["", *SEARCH_TERMS]),
+        )),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay mixed API/web traffic against a running server and report p50/p95/p99 "
+        "latency per endpoint (stdlib only; ids are sampled from this database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--requests", type=int, default=2000, help="Size of the request plan.")
+        parser.add_argument("--duration", type=float, default=None, help="Loop the plan for N seconds instead.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--json", dest="json_path", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        plan = loadtest.build_plan(default_scenarios(), options["requests"], seed=options["seed"])
+        self.stdout.write(
+            f"Replaying {len(plan)} requests against {options['base_url']} "
+            f"with {options['concurrency']} workers..."
+        )
+        report = loadtest.run(
+            plan, options["base_url"], concurrency=options["concurrency"],
+            timeout=options["timeout"], duration=options["duration"],
+        )
+        self.stdout.write(loadtest.format_report(report))
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(report, fh, indent=2)
+        if any(row["errors"] for row in report["endpoints"].values()):
+            self.stdout.write(self.style.WARNING("Some requests failed (status >= 400 or no response)."))
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Notification
+from core.notifications import invalidate_unread
+
+
+class Command(BaseCommand):
+    help = "Delete old notifications in batches (read ones after --read-days, unread after --unread-days)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--read-days", type=int, default=30, help="Delete read notifications older than this.")
+        parser.add_argument(
+            "--unread-days",
+            type=int,
+            default=0,
+            help="Also delete unread notifications older than this (0 keeps them).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would be deleted.")
+
+    def _delete_in_batches(self, qs, batch_size):
+        deleted = 0
+        while True:
+            batch = list(qs.values_list("pk", "recipient_id", "is_read")[:batch_size])
+            if not batch:
+                return deleted
+            deleted += Notification.objects.filter(pk__in=[pk for pk, _r, _read in batch]).delete()[0]
+            # Read rows don't affect badge counts; unread ones do.
+            invalidate_unread(recipient for _pk, recipient, is_read in batch if not is_read)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        targets = [
+            ("read", Notification.objects.filter(is_read=True, created_at__lt=now - timedelta(days=options["read_days"]))),
+        ]
+        if options["unread_days"]:
+            targets.append(
+                (
+                    "unread",
+                    Notification.objects.filter(
+                        is_read=False, created_at__lt=now - timedelta(days=options["unread_days"])
+                    ),
+                )
+            )
+
+        for label, qs in targets:
+            if options["dry_run"]:
+                self.stdout.write(f"Would delete {qs.count()} {label} notifications")
+                continue
+            deleted = self._delete_in_batches(qs, options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} {label} notifications"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import kpis
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new listings, contact unlocks, visitors, payments and view counts into the daily KPI "
+        "rollups. Only reads rows added since the last run; safe to run from cron."
+    )
+
+    def handle(self, *args, **options):
+        for label, count in kpis.run().items():
+            self.stdout.write(self.style.SUCCESS(f"Updated {count} {label}"))
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Notification, NotificationPreference
+from core.notifications import invalidate_unread
+
+DIGEST_PERIODS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(days=7),
+}
+
+# Only listing activity is digested; payment and admin messages stay as-is.
+DIGEST_GROUP_PREFIX = "property:"
+
+
+class Command(BaseCommand):
+    help = (
+        "Collapse each opted-in user's unread listing notifications into one digest row. "
+        "Safe to run from cron; users are only processed once per digest period."
+    )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        digests = 0
+        collapsed = 0
+
+        prefs = NotificationPreference.objects.filter(digest__in=DIGEST_PERIODS.keys()).select_related("user")
+        for pref in prefs:
+            period = DIGEST_PERIODS[pref.digest]
+            if pref.last_digest_at and pref.last_digest_at > now - period:
+                continue
+
+            with transaction.atomic():
+                pending = list(
+                    Notification.objects.filter(
+                        recipient_id=pref.user_id,
+                        is_read=False,
+                        group_key__startswith=DIGEST_GROUP_PREFIX,
+                    ).order_by("-created_at")
+                )
+                if len(pending) > 1:
+                    lines = [f"- {n.message}" for n in pending[:5]]
+                    if len(pending) > 5:
+                        lines.append(f"...and {len(pending) - 5} more.")
+                    Notification.objects.create(
+                        recipient_id=pref.user_id,
+                        title=f"{len(pending)} accommodation updates",
+                        message="\n".join(lines),
+                        link="/students-accommodation/universities/",
+                        group_key="digest",
+                    )
+                    Notification.objects.filter(pk__in=[n.pk for n in pending]).delete()
+                    invalidate_unread([pref.user_id])
+                    digests += 1
+                    collapsed += len(pending)
+
+                pref.last_digest_at = now
+                pref.save(update_fields=["last_digest_at"])
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {digests} digests covering {collapsed} notifications"))
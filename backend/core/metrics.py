@@ -0,0 +1,217 @@
+"""Opt-in per-request instrumentation (``METRICS_ENABLED=1``).
+
+``MetricsMiddleware`` times each request and wraps every database connection
+with ``execute_wrapper`` to count queries and their time. Response rendering
+(DRF renderers, template responses) is timed too, and code can time its own
+sections with ``span()``. The listing APIs use ``span("serialize")`` around
+``serializer.data``.
+
+Each response gets a ``Server-Timing`` header. The same numbers are added to
+in-process histograms keyed by URL name, which ``/internal/metrics`` serves in
+Prometheus text format. When one parameterised SQL statement runs
+``METRICS_N_PLUS_ONE_THRESHOLD`` or more times in a request, the request is
+counted as a likely N+1 and a warning is logged with the statement.
+
+Histograms are per process, like ``core.pubsub``, so scrape every worker.
+"""
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestStats:
+    """What one request spent, filled in while it runs."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans = Counter()
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper hook: params are bound separately, so identical
+        # statements share one key however their arguments differ.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def repeated_statements(self, threshold):
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+@contextlib.contextmanager
+def span(name):
+    """Add the time spent in the block to the current request's ``name`` span."""
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.spans[name] += time.perf_counter() - start
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Thread-safe per-view histograms and counters."""
+
+    # name -> (help, buckets); ``None`` buckets make a counter.
+    METRICS = {
+        "http_request_duration_seconds": ("Wall time per request.", DURATION_BUCKETS),
+        "db_queries_per_request": ("Database queries per request.", QUERY_BUCKETS),
+        "db_duration_seconds": ("Time spent in database calls per request.", DURATION_BUCKETS),
+        "serialize_duration_seconds": ("Time spent serializing per request.", DURATION_BUCKETS),
+        "render_duration_seconds": ("Time spent rendering the response per request.", DURATION_BUCKETS),
+        "http_response_size_bytes": ("Response body size.", SIZE_BUCKETS),
+        "n_plus_one_requests_total": ("Requests that repeated one SQL statement past the threshold.", None),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _observe(self, name, view, value):
+        buckets = self.METRICS[name][1]
+        key = (name, view)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = Histogram(buckets) if buckets else [0]
+        if buckets:
+            series.observe(value)
+        else:
+            series[0] += value
+
+    def record(self, view, stats, wall_seconds, size, n_plus_one):
+        with self._lock:
+            self._observe("http_request_duration_seconds", view, wall_seconds)
+            self._observe("db_queries_per_request", view, stats.queries)
+            self._observe("db_duration_seconds", view, stats.db_seconds)
+            self._observe("serialize_duration_seconds", view, stats.spans["serialize"])
+            self._observe("render_duration_seconds", view, stats.spans["render"])
+            if size is not None:
+                self._observe("http_response_size_bytes", view, size)
+            if n_plus_one:
+                self._observe("n_plus_one_requests_total", view, 1)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, prefix="stayrez"):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            lines = []
+            for name, (help_text, buckets) in self.METRICS.items():
+                rows = sorted((view, series) for (metric, view), series in self._series.items() if metric == name)
+                if not rows:
+                    continue
+                full = f"{prefix}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {'histogram' if buckets else 'counter'}")
+                for view, series in rows:
+                    label = f'view="{_escape(view)}"'
+                    if not buckets:
+                        lines.append(f"{full}{{{label}}} {series[0]}")
+                        continue
+                    for bound, count in zip(series.buckets, series.counts):
+                        lines.append(f'{full}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{full}_bucket{{{label},le="+Inf"}} {series.total}')
+                    lines.append(f"{full}_sum{{{label}}} {series.sum:.6f}")
+                    lines.append(f"{full}_count{{{label}}} {series.total}")
+            return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """Records timings for every request; add it first in ``MIDDLEWARE``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            with contextlib.ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        wall = time.perf_counter() - stats.started
+
+        view = _view_name(request)
+        threshold = int(getattr(settings, "METRICS_N_PLUS_ONE_THRESHOLD", 5))
+        repeated = stats.repeated_statements(threshold)
+        for sql, count in repeated:
+            logger.warning("Possible N+1 in %s: %d runs of %s", view, count, sql)
+        size = None if response.streaming else len(response.content)
+        registry.record(view, stats, wall, size, bool(repeated))
+
+        timings = [f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"']
+        for name in ("serialize", "render"):
+            if name in stats.spans:
+                timings.append(f"{name};dur={stats.spans[name] * 1000:.1f}")
+        timings.append(f"total;dur={wall * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(timings)
+        return response
+
+    def process_template_response(self, request, response):
+        # Rendering happens after every process_template_response hook has
+        # run, so time it from here to the post-render callback.
+        stats = _current.get()
+        if stats is not None:
+            start = time.perf_counter()
+
+            def rendered(_response):
+                stats.spans["render"] += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_challenges(apps, schema_editor):
+    Feedback = apps.get_model("core", "Feedback")
+    FeedbackChallenge = apps.get_model("core", "FeedbackChallenge")
+    alias = schema_editor.connection.alias
+    rows = []
+    for pk, challenges in Feedback.objects.using(alias).exclude(challenges="").values_list("pk", "challenges").iterator():
+        labels = {label.strip()[:255] for label in challenges.split(",")} - {""}
+        rows.extend(FeedbackChallenge(feedback_id=pk, label=label) for label in labels)
+    FeedbackChallenge.objects.using(alias).bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_notification_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackChallenge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=255)),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='challenge_items', to='core.feedback')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['label'], name='feedback_challenge_label')],
+                'constraints': [models.UniqueConstraint(fields=('feedback', 'label'), name='feedback_challenge_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_challenges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_feedback_challenges'),
+        ('properties', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyViewMark',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_mark', serialize=False, to='properties.property')),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ListingDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('property_type', models.CharField(max_length=30)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unlocks', models.PositiveIntegerField(default=0)),
+                ('new_listings', models.PositiveIntegerField(default=0)),
+                ('city', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='properties.city')),
+                ('university', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='properties.university')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'university'], name='kpi_listing_date_uni'), models.Index(fields=['date', 'property_type'], name='kpi_listing_date_type')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UniversityDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('visitors', models.PositiveIntegerField(default=0)),
+                ('payments', models.PositiveIntegerField(default=0)),
+                ('payment_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='properties.university')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'university'), name='kpi_university_day')],
+            },
+        ),
+    ]
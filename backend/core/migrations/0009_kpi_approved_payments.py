@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:38
+
+from django.db import migrations, models
+
+
+def recount_payments(apps, schema_editor):
+    # Payments were counted on submission. Zero them and drop the old
+    # watermark; the next rollup_kpis run recounts every approval by day.
+    alias = schema_editor.connection.alias
+    RollupWatermark = apps.get_model("core", "RollupWatermark")
+    UniversityDailyStats = apps.get_model("core", "UniversityDailyStats")
+    RollupWatermark.objects.using(alias).filter(source="adminfeepayment").delete()
+    UniversityDailyStats.objects.using(alias).update(payments=0, payment_amount=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_kpi_rollups'),
+        ('payments', '0007_adminfeepayment_approved_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='last_time',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(recount_payments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:00
+
+from django.db import migrations, models
+
+
+def backfill_group_started_at(apps, schema_editor):
+    # Existing groups are treated as starting at their (last bumped) row.
+    Notification = apps.get_model("core", "Notification")
+    Notification.objects.using(schema_editor.connection.alias).exclude(group_key="").update(
+        group_started_at=models.F("created_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_kpi_approved_payments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='group_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_group_started_at, migrations.RunPython.noop),
+    ]
@@ -9,11 +9,40 @@ class Notification(models.Model):
     link = models.URLField(blank=True, null=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Notifications sharing a key (e.g. "property:42") coalesce while unread
+    group_key = models.CharField(max_length=100, blank=True, default="", db_index=True)
+    # First event of the coalesced group; the window is measured from here
+    group_started_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # unread badge counts and unread-first listings
+            models.Index(fields=["recipient", "is_read", "created_at"], name="notif_recipient_read_created"),
+            # cursor-paginated listing (newest first)
+            models.Index(fields=["recipient", "-created_at", "-id"], name="notif_recipient_created"),
+        ]
 
     def __str__(self):
         return f"Notification to {self.recipient.email} - {self.title}"
 
 
+class NotificationPreference(models.Model):
+    """Per-user opt-in for periodic notification digests."""
+
+    DIGEST_CHOICES = (
+        ("off", "Off"),
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+    )
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notification_preference")
+    digest = models.CharField(max_length=10, choices=DIGEST_CHOICES, default="off")
+    last_digest_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.email} - digest {self.digest}"
+
+
 class UserUniversityPreference(models.Model):
     """Track which universities users are interested in based on their browsing behavior"""
     ip_address = models.GenericIPAddressField()
@@ -0,0 +1,69 @@
+from django.db import models
+
+
+class ListingDailyStats(models.Model):
+    """Per day, university, city and property type: views, contact unlocks and new listings.
+
+    Filled by ``manage.py rollup_kpis`` (see ``core.kpis``); never written by
+    request handlers.
+    """
+
+    date = models.DateField()
+    university = models.ForeignKey("properties.University", on_delete=models.CASCADE, null=True, blank=True)
+    city = models.ForeignKey("properties.City", on_delete=models.CASCADE, null=True, blank=True)
+    property_type = models.CharField(max_length=30)
+    views = models.PositiveIntegerField(default=0)
+    unlocks = models.PositiveIntegerField(default=0)
+    new_listings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["date", "university"], name="kpi_listing_date_uni"),
+            models.Index(fields=["date", "property_type"], name="kpi_listing_date_type"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.university_id}/{self.city_id} {self.property_type}"
+
+
+class UniversityDailyStats(models.Model):
+    """Per day and university: new visitors and approved admin-fee payments (by approval day)."""
+
+    date = models.DateField()
+    university = models.ForeignKey("properties.University", on_delete=models.CASCADE)
+    visitors = models.PositiveIntegerField(default=0)
+    payments = models.PositiveIntegerField(default=0)
+    payment_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "university"], name="kpi_university_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.university_id}"
+
+
+class RollupWatermark(models.Model):
+    """How far each source has been folded into the rollups.
+
+    ``last_id`` for sources counted by insertion, ``last_time`` for events
+    counted by a timestamp set later (payment approvals).
+    """
+
+    source = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    last_time = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.last_id}"
+
+
+class PropertyViewMark(models.Model):
+    """``Property.view_count`` as of the last rollup; the next one counts the difference."""
+
+    property = models.OneToOneField(
+        "properties.Property", on_delete=models.CASCADE, primary_key=True, related_name="view_mark"
+    )
+    views = models.PositiveIntegerField(default=0)
@@ -66,3 +66,19 @@ class Feedback(models.Model):
 
     def __str__(self):
         return f"Feedback from {self.name or 'Anonymous'} at {self.submitted_at}"
+
+
+class FeedbackChallenge(models.Model):
+    """One entry of ``Feedback.challenges``, so challenges can be counted with GROUP BY."""
+
+    feedback = models.ForeignKey(Feedback, on_delete=models.CASCADE, related_name="challenge_items")
+    label = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["feedback", "label"], name="feedback_challenge_unique"),
+        ]
+        indexes = [models.Index(fields=["label"], name="feedback_challenge_label")]
+
+    def __str__(self):
+        return self.label
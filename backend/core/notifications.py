@@ -0,0 +1,228 @@
+"""Bulk notification fan-out.
+
+All code paths that notify more than one user go through here instead of
+looping over ``Notification.objects.create``:
+
+- recipient sets are resolved with a single ``values_list`` query
+- rows are written with ``bulk_create`` in chunks
+- large fan-outs (e.g. property watchers) can be deferred: they run once
+  the surrounding transaction has committed *and* the response has been sent
+  (``request_finished``, like ``core.visits``), so the landlord's request
+  doesn't wait on them. The project has no ``ATOMIC_REQUESTS``, so
+  ``on_commit`` alone would still run inside the request. The fan-out still
+  uses the same worker afterwards; outside a request (shell, commands) it
+  runs at commit
+- notifications carrying a ``group_key`` coalesce: while a recipient still
+  has an unread row with that key whose group started inside the coalescing
+  window, that row is replaced by one with the new message (same title and
+  group start). The replacement gets a fresh id, so it sorts first and the
+  long-poll stream, which follows ids, delivers it. The window is anchored
+  to the group's first event, so a steady stream of updates still opens a
+  new notification once the window has passed
+- every write wakes the recipients' long-poll streams (see ``core.pubsub``)
+  once the transaction commits
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification
+from .pubsub import broker
+
+BULK_CHUNK_SIZE = 500
+UNREAD_COUNT_TIMEOUT = 300
+
+logger = logging.getLogger(__name__)
+_request_state = threading.local()
+
+
+def _after_response(fn):
+    """Run ``fn`` once the current response is sent; right away outside a request."""
+    queue = getattr(_request_state, "queue", None)
+    if queue is None:
+        fn()
+    else:
+        queue.append(fn)
+
+
+def _defer(fn):
+    transaction.on_commit(lambda: _after_response(fn))
+
+
+def start_request(sender, **kwargs):
+    """``request_started`` receiver: collect deferred fan-outs for this request."""
+    _request_state.queue = []
+
+
+def run_after_response(sender, **kwargs):
+    """``request_finished`` receiver: run the fan-outs deferred by this request."""
+    queue, _request_state.queue = getattr(_request_state, "queue", None), None
+    for fn in queue or ():
+        try:
+            fn()
+        except DatabaseError:
+            # The response is gone; nobody to report to but the log.
+            logger.exception("Deferred notification fan-out failed")
+
+
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def unread_count(user_id):
+    """Cached unread badge count for ``user_id``."""
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_unread(user_ids):
+    cache.delete_many([_unread_key(pk) for pk in set(user_ids)])
+
+
+def publish(user_ids):
+    """Wake stream subscribers for ``user_ids`` after the current commit."""
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: broker.publish(user_ids))
+
+
+def mark_read(user_id, ids=None):
+    """Mark the user's notifications read with a single UPDATE.
+
+    ``ids=None`` marks everything unread. Returns the number of rows changed.
+    """
+    qs = Notification.objects.filter(recipient_id=user_id, is_read=False)
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+    updated = qs.update(is_read=True)
+    if updated:
+        invalidate_unread([user_id])
+        publish([user_id])
+    return updated
+
+
+def coalesce_window():
+    return timedelta(seconds=int(getattr(settings, "NOTIFICATION_COALESCE_WINDOW", 6 * 3600)))
+
+
+def admin_recipient_ids():
+    """Ids of everyone allowed to act as admin (same rule as ``IsAdminRole``)."""
+    User = get_user_model()
+    return User.objects.filter(
+        Q(role="admin") | Q(is_staff=True) | Q(is_superuser=True),
+        is_active=True,
+    ).values_list("id", flat=True)
+
+
+def _resolve_ids(recipients):
+    ids = []
+    seen = set()
+    for r in recipients:
+        pk = getattr(r, "pk", r)
+        if pk is None or pk in seen:
+            continue
+        seen.add(pk)
+        ids.append(pk)
+    return ids
+
+
+def send_notifications(notifications, defer=False):
+    """Write prepared (unsaved) ``Notification`` objects in chunks.
+
+    Use this when each recipient gets a different message. Returns the number
+    of rows written, or 0 when deferred (see the module docstring).
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return 0
+
+    def _write():
+        Notification.objects.bulk_create(notifications, batch_size=BULK_CHUNK_SIZE)
+        recipient_ids = {n.recipient_id for n in notifications}
+        invalidate_unread(recipient_ids)
+        publish(recipient_ids)
+
+    if defer:
+        _defer(_write)
+        return 0
+    _write()
+    return len(notifications)
+
+
+def _coalesce(group_key, recipient_ids):
+    """Delete the open unread rows of ``group_key`` for ``recipient_ids``.
+
+    Returns ``{recipient_id: (title, group_started_at)}`` for the rows
+    removed, so their replacements keep the group's title and start.
+    """
+    cutoff = timezone.now() - coalesce_window()
+    replaced = {}
+    for start in range(0, len(recipient_ids), BULK_CHUNK_SIZE):
+        existing = Notification.objects.filter(
+            group_key=group_key,
+            recipient_id__in=recipient_ids[start:start + BULK_CHUNK_SIZE],
+            is_read=False,
+            group_started_at__gte=cutoff,
+        )
+        rows = list(existing.order_by("group_started_at").values_list("pk", "recipient_id", "title", "group_started_at"))
+        if rows:
+            Notification.objects.filter(pk__in=[pk for pk, *_rest in rows]).delete()
+        for _pk, recipient_id, title, started in rows:
+            replaced.setdefault(recipient_id, (title, started))
+    return replaced
+
+
+def notify(recipients, title, message, link=None, exclude=None, defer=False, group_key=""):
+    """Send the same notification to many users.
+
+    ``recipients`` may be a queryset of user ids (evaluated once), users, or
+    ids. With ``defer=True`` both the recipient query and the insert run after
+    the current transaction commits and the response has been sent. A
+    non-empty ``group_key`` enables coalescing with the recipient's earlier
+    unread notification of the same key.
+    """
+
+    def _fan_out():
+        skip = set(_resolve_ids(exclude or []))
+        ids = [pk for pk in _resolve_ids(recipients) if pk not in skip]
+        if not group_key:
+            return send_notifications(
+                Notification(recipient_id=pk, title=title, message=message, link=link) for pk in ids
+            )
+        now = timezone.now()
+        with transaction.atomic():
+            replaced = _coalesce(group_key, ids)
+            rows = []
+            for pk in ids:
+                # Keep the original title (e.g. "New accommodation") and group start.
+                group_title, started = replaced.get(pk, (title, now))
+                rows.append(Notification(
+                    recipient_id=pk, title=group_title, message=message, link=link,
+                    group_key=group_key, group_started_at=started,
+                ))
+            return send_notifications(rows)
+
+    if defer:
+        _defer(_fan_out)
+        return 0
+    return _fan_out()
+
+
+def notify_admins(title, message, link=None, defer=False):
+    return notify(admin_recipient_ids(), title, message, link=link, defer=defer)
+
+
+def property_group_key(property_id):
+    return f"property:{property_id}"
@@ -0,0 +1,66 @@
+"""In-process pub/sub used to wake long-polling notification clients.
+
+Publishers only say "user X has something new"; subscribers then read the
+database with their own since-id cursor, so nothing is lost if a wake-up is
+missed. Each user has a version counter that is bumped on publish, and a
+waiter blocks until its user's version moves past the one it saw before
+querying.
+
+This is per process. Under several workers a client parked on another worker
+simply returns at its timeout and re-polls. That costs one extra request, not
+a missed notification.
+
+Versions are only kept while a request is subscribed (``subscribe``):
+publishes to users nobody is waiting for are dropped, and a user's entry goes
+when their last subscriber leaves, so memory follows the parked requests,
+not every user ever notified.
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class NotificationBroker:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._versions = {}
+        self._subscribers = Counter()
+
+    @contextmanager
+    def subscribe(self, user_id):
+        """Track publishes to ``user_id`` while inside; yields the current version."""
+        with self._cond:
+            self._subscribers[user_id] += 1
+            seen = self._versions.setdefault(user_id, 0)
+        try:
+            yield seen
+        finally:
+            with self._cond:
+                self._subscribers[user_id] -= 1
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+                    del self._versions[user_id]
+
+    def version(self, user_id):
+        with self._cond:
+            return self._versions.get(user_id, 0)
+
+    def publish(self, user_ids):
+        with self._cond:
+            waiting = [pk for pk in set(user_ids) if pk in self._subscribers]
+            for pk in waiting:
+                self._versions[pk] += 1
+            if waiting:
+                self._cond.notify_all()
+
+    def wait(self, user_id, seen_version, timeout):
+        """Block until ``user_id`` has a publish newer than ``seen_version``.
+
+        Returns True if woken by a publish, False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._versions.get(user_id, 0) != seen_version, timeout=timeout)
+
+
+broker = NotificationBroker()
@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import feedback_analytics
+from .models import Notification
+from .models_feedback import Feedback
+from .notifications import invalidate_unread, publish
+
+
+@receiver(post_save, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    """Keep the cached badge count honest for one-off creates and saves,
+    and wake the recipient's stream.
+
+    Bulk paths (bulk_create, queryset update/delete) invalidate explicitly;
+    there is deliberately no post_delete receiver so queryset deletes stay
+    fast deletes.
+    """
+    invalidate_unread([instance.recipient_id])
+    publish([instance.recipient_id])
+
+
+@receiver(post_save, sender=Feedback)
+def update_feedback_rollup(sender, instance, created, raw=False, **kwargs):
+    """Split the challenges into rows and fold a new submission into the cached rollup."""
+    if raw:
+        return
+    feedback_analytics.save_challenges([instance], replace=not created)
+    if created:
+        transaction.on_commit(lambda: feedback_analytics.record(instance))
+    else:
+        feedback_analytics.invalidate()
+
+
+@receiver(post_delete, sender=Feedback)
+def drop_feedback_rollup(sender, **kwargs):
+    feedback_analytics.invalidate()
@@ -0,0 +1,407 @@
+"""Synthetic data for load tests and benchmarks.
+
+``DatasetGenerator`` bulk-inserts a realistic-looking dataset: Zimbabwean
+cities and universities with campus coordinates, landlords and students,
+properties spread around campuses and city centres, images, reviews,
+admin-fee payments with confirmations, and contact views. It is used by
+``manage.py gen_dataset`` (production-scale data for the load driver),
+``generate_feedback_reviews`` and ``bench_property_indexes``.
+
+Rows are written with ``bulk_create`` in batches, so model signals don't
+run: amenity links are written next to each property batch, and
+``finalize()`` rebuilds the search index and drops the suggestion/facet
+caches.
+"""
+
+import math
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+# (name, latitude, longitude)
+CITIES = [
+    ("Harare", -17.8292, 31.0522),
+    ("Bulawayo", -20.1325, 28.6265),
+    ("Gweru", -19.4500, 29.8167),
+    ("Chinhoyi", -17.3667, 30.2000),
+    ("Bindura", -17.3019, 31.3306),
+    ("Masvingo", -20.0744, 30.8328),
+    ("Mutare", -18.9707, 32.6709),
+    ("Kwekwe", -18.9281, 29.8149),
+    ("Marondera", -18.1853, 31.5519),
+    ("Victoria Falls", -17.9243, 25.8572),
+]
+
+# (name, city)
+UNIVERSITIES = [
+    ("University of Zimbabwe", "Harare"),
+    ("Harare Institute of Technology", "Harare"),
+    ("National University of Science and Technology", "Bulawayo"),
+    ("Midlands State University", "Gweru"),
+    ("Chinhoyi University of Technology", "Chinhoyi"),
+    ("Bindura University of Science Education", "Bindura"),
+    ("Great Zimbabwe University", "Masvingo"),
+    ("Africa University", "Mutare"),
+    ("Marondera University of Agricultural Sciences and Technology", "Marondera"),
+    ("Lupane State University", "Bulawayo"),
+]
+
+AREAS = ["Avondale", "Mt Pleasant", "Belvedere", "Hatfield", "Senga", "Mkoba", "Suburbs", "Eastlea", "CBD", "Riverside"]
+ADJECTIVES = ["Cosy", "Spacious", "Modern", "Quiet", "Secure", "Bright", "Affordable", "Furnished", "Garden", "Family"]
+NOUNS = {
+    "students": ["student room", "student house", "hostel room", "boarding house"],
+    "long_term": ["flat", "cottage", "house", "apartment"],
+    "short_term": ["studio", "guest room", "lodge room", "apartment"],
+    "real_estate": ["stand", "townhouse", "villa", "plot"],
+    "resort": ["lodge", "chalet", "resort suite", "safari camp"],
+    "shop": ["shop", "retail space", "kiosk", "office"],
+}
+AMENITIES = ["WiFi", "Parking", "Kitchen", "Laundry", "Solar backup", "Borehole", "Security", "Study desk", "DSTV", "Gym"]
+REVIEW_COMMENTS = [
+    "Close to campus and quiet.", "Landlord was very helpful.", "Water was a problem sometimes.",
+    "Great value for money.", "WiFi could be faster.", "Clean and secure.", "Would stay again.", "",
+]
+
+# Property type mix and price ranges (nightly, monthly).
+TYPE_WEIGHTS = [("students", 60), ("long_term", 15), ("short_term", 10), ("real_estate", 5), ("resort", 5), ("shop", 5)]
+PRICES = {
+    "students": ((5, 25), (60, 250)),
+    "long_term": ((15, 40), (150, 900)),
+    "short_term": ((20, 120), (300, 1500)),
+    "real_estate": ((30, 150), (300, 2500)),
+    "resort": ((60, 400), (1000, 6000)),
+    "shop": ((20, 80), (200, 1500)),
+}
+
+# Feedback survey vocabulary (see core.models_feedback.Feedback).
+FEEDBACK_NAMES = [
+    "Alex", "Sam", "Chris", "Pat", "Jordan", "Taylor", "Morgan", "Casey", "Jamie", "Robin",
+    "Tendai", "Tatenda", "Ruvimbo", "Tafadzwa", "Kudakwashe", "Rumbidzai", "Tawanda", "Nyasha", "Farai", "Chipo",
+    "Simba", "Munyaradzi", "Rutendo", "Shingirai", "Vimbai", "Takudzwa", "Chenai", "Kudzai", "Anesu", "Rudo",
+]
+FEEDBACK_CITIES = ["Harare", "Chinhoyi", "Gweru", "Bindura", "Masvingo"]
+OCCUPATIONS = ["Student", "Tenant", "Landlord", "Real Estate Agent"]
+AGES = ["Below 18", "18–25", "26–35", "36–45", "Above 45"]
+GENDERS = ["Male", "Female", "Prefer not to say"]
+SEARCH_FREQUENCIES = ["Never", "Rarely", "Sometimes", "Often", "Always"]
+METHOD_RATINGS = ["Very Poor", "Poor", "Fair", "Good", "Excellent"]
+LIKES = [
+    "Easy to use", "Good map features", "Accurate info", "Nice design", "Quick search", "Responsive UI",
+    "Helpful filters", "Mobile friendly", "Clear property details", "Trustworthy",
+]
+CHALLENGES = [
+    "Limited options", "Occasional slow loading", "Some listings outdated", "Map could be clearer",
+    "More photos needed", "Minor bugs",
+]
+IMPROVEMENTS = [
+    "Add more properties", "Improve map", "Faster loading", "More filters", "Better mobile support",
+    "Add reviews for landlords",
+]
+RATING_POOL = [3, 4, 4, 4, 4, 5, 5]  # Weighted for an average of ~4
+
+KM_PER_DEGREE = 111.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@contextmanager
+def backdating(*models):
+    """Let ``auto_now_add`` fields take the values we pass (spread over time)."""
+    fields = [f for model in models for f in model._meta.fields if getattr(f, "auto_now_add", False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class DatasetGenerator:
+    def __init__(self, seed=1, batch_size=2000, days=730, log=None):
+        self.rnd = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        self.days = days
+        self.log = log or (lambda message: None)
+        # Unique per run so repeated runs don't collide on emails.
+        self.tag = f"{self.rnd.randrange(16 ** 6):06x}"
+        self._user_counts = {}
+
+    # Helpers --------------------------------------------------------------
+    def _past(self, days=None):
+        return self.now - timedelta(minutes=self.rnd.randrange(max(1, (days or self.days) * 24 * 60)))
+
+    def _near(self, lat, lng, max_km):
+        distance = self.rnd.uniform(0.1, max_km) / KM_PER_DEGREE
+        angle = self.rnd.uniform(0, 2 * math.pi)
+        return lat + distance * math.sin(angle), lng + distance * math.cos(angle) / max(0.2, math.cos(math.radians(lat)))
+
+    def _bulk(self, model, objects, **kwargs):
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            created.extend(model.objects.bulk_create(objects[start:start + self.batch_size], **kwargs))
+        return created
+
+    # Places ---------------------------------------------------------------
+    def cities(self):
+        from properties.models import City
+
+        existing = {c.name: c for c in City.objects.filter(name__in=[name for name, _lat, _lng in CITIES])}
+        missing = [City(name=name) for name, _lat, _lng in CITIES if name not in existing]
+        for city in City.objects.bulk_create(missing):
+            existing[city.name] = city
+        coords = {name: (lat, lng) for name, lat, lng in CITIES}
+        return [(existing[name], coords[name]) for name, _lat, _lng in CITIES]
+
+    def universities(self, cities, count=len(UNIVERSITIES)):
+        """``count`` universities; names beyond the known list become satellite campuses."""
+        from properties.models import University
+
+        by_city = {city.name: (city, coords) for city, coords in cities}
+        universities = []
+        for i in range(count):
+            name, city_name = UNIVERSITIES[i % len(UNIVERSITIES)]
+            if i >= len(UNIVERSITIES):
+                name = f"{name} Campus {i // len(UNIVERSITIES) + 1}"
+            city, (lat, lng) = by_city[city_name]
+            lat, lng = self._near(lat, lng, 8)
+            universities.append(University(
+                name=name, city=city, admin_fee_per_head=self.rnd.choice([5, 10, 15, 20]),
+                latitude=round(lat, 7), longitude=round(lng, 7),
+            ))
+        return self._bulk(University, universities)
+
+    # People ---------------------------------------------------------------
+    def users(self, count, role="general", prefix="student"):
+        # Hashing is slow; every synthetic account shares one password hash.
+        password = make_password("password")
+        user_model = get_user_model()
+        # Numbering continues across calls, so a dataset can be grown in steps.
+        first = self._user_counts.get(prefix, 0)
+        self._user_counts[prefix] = first + count
+        users = [
+            user_model(
+                email=f"{prefix}{i}.{self.tag}@example.test", password=password, role=role,
+                full_name=f"{self.rnd.choice(FEEDBACK_NAMES)} {prefix.title()} {i}",
+            )
+            for i in range(first, first + count)
+        ]
+        self.log(f"  {count} {prefix} accounts")
+        return [u.pk for u in self._bulk(user_model, users)]
+
+    # Listings -------------------------------------------------------------
+    def properties(self, count, owner_ids, universities, cities):
+        """Insert ``count`` properties; returns ``[(pk, university_id), ...]``."""
+        from properties.amenities import amenity_slug
+        from properties.models import Amenity, Property, PropertyAmenity
+
+        Amenity.objects.bulk_create(
+            [Amenity(name=name, slug=amenity_slug(name)) for name in AMENITIES], ignore_conflicts=True,
+        )
+        amenity_ids = dict(Amenity.objects.filter(slug__in=[amenity_slug(n) for n in AMENITIES]).values_list("slug", "pk"))
+        types = [t for t, _w in TYPE_WEIGHTS]
+        weights = [w for _t, w in TYPE_WEIGHTS]
+        uni_coords = [(u, float(u.latitude), float(u.longitude)) for u in universities]
+
+        created = []
+        with backdating(Property):
+            for start in range(0, count, self.batch_size):
+                batch, links = [], []
+                for i in range(start, min(count, start + self.batch_size)):
+                    ptype = self.rnd.choices(types, weights)[0]
+                    if ptype == "students" and uni_coords:
+                        uni, ulat, ulng = self.rnd.choice(uni_coords)
+                        city = uni.city
+                        lat, lng = self._near(ulat, ulng, 6)
+                        distance = round(haversine_km(ulat, ulng, lat, lng), 2)
+                    else:
+                        uni, distance = None, None
+                        city, (clat, clng) = self.rnd.choice(cities)
+                        lat, lng = self._near(clat, clng, 12)
+                    (nmin, nmax), (mmin, mmax) = PRICES[ptype]
+                    amenities = self.rnd.sample(AMENITIES, self.rnd.randint(0, 5))
+                    area = self.rnd.choice(AREAS)
+                    batch.append(Property(
+                        title=f"{self.rnd.choice(ADJECTIVES)} {self.rnd.choice(NOUNS[ptype])} in {area}",
+                        description=f"{self.rnd.choice(ADJECTIVES)} place in {area}, {city.name}. "
+                                    f"{self.rnd.choice(REVIEW_COMMENTS)}",
+                        owner_id=self.rnd.choice(owner_ids),
+                        university=uni,
+                        city=city,
+                        property_type=ptype,
+                        is_approved=self.rnd.random() < 0.85,
+                        is_available=self.rnd.random() < 0.9,
+                        created_at=self._past(),
+                        location=f"{self.rnd.randint(1, 300)} {area} Road",
+                        latitude=round(lat, 7),
+                        longitude=round(lng, 7),
+                        contact_phone=f"+26377{self.rnd.randrange(10 ** 7):07d}",
+                        gender=self.rnd.choice(["all", "boys", "girls", "mixed"]),
+                        overnight=self.rnd.random() < 0.2,
+                        sharing=self.rnd.choice(["single", "two", "other"]),
+                        nightly_price=self.rnd.randint(nmin, nmax),
+                        price_per_month=self.rnd.randint(mmin, mmax),
+                        view_count=int(self.rnd.paretovariate(1.5) * 10),
+                        amenities=", ".join(amenities),
+                        max_occupancy=self.rnd.randint(1, 8),
+                        distance_to_campus_km=distance,
+                    ))
+                    links.append(amenities)
+                amenity_links = []
+                for prop, names in zip(Property.objects.bulk_create(batch), links):
+                    created.append((prop.pk, prop.university_id))
+                    amenity_links.extend(
+                        PropertyAmenity(property_id=prop.pk, amenity_id=amenity_ids[amenity_slug(name)])
+                        for name in names
+                    )
+                PropertyAmenity.objects.bulk_create(amenity_links)
+                self.log(f"  {len(created)}/{count} properties")
+        return created
+
+    def images(self, property_ids, per_property=3):
+        from properties.models import PropertyImage
+
+        images = [
+            PropertyImage(property_id=pk, image=f"properties/synthetic-{self.rnd.randint(1, 50)}.jpg")
+            for pk in property_ids for _ in range(self.rnd.randint(0, per_property))
+        ]
+        self.log(f"  {len(images)} images")
+        return len(self._bulk(PropertyImage, images))
+
+    def reviews(self, count, property_ids, user_ids):
+        from properties.models import Review
+
+        pairs = set()
+        limit = len(property_ids) * len(user_ids)
+        while len(pairs) < min(count, limit):
+            pairs.add((self.rnd.choice(property_ids), self.rnd.choice(user_ids)))
+        with backdating(Review):
+            reviews = [
+                Review(
+                    property_id=prop, user_id=user, rating=self.rnd.choice(RATING_POOL + [1, 2]),
+                    comment=self.rnd.choice(REVIEW_COMMENTS), created_at=self._past(),
+                )
+                for prop, user in pairs
+            ]
+            self.log(f"  {len(reviews)} reviews")
+            return len(self._bulk(Review, reviews))
+
+    def payments(self, count, user_ids, universities):
+        """Admin-fee payments, each with one confirmation. Returns ``[(pk, university_id)]``."""
+        from payments.models import AdminFeePayment, PaymentConfirmation
+
+        statuses = ["approved"] * 6 + ["pending"] * 2 + ["declined", "canceled"]
+        with backdating(AdminFeePayment, PaymentConfirmation):
+            payments, states = [], []
+            for _ in range(count):
+                uni = self.rnd.choice(universities)
+                students = self.rnd.choice([1, 1, 1, 2, 3])
+                created_at = self._past(365)
+                status = self.rnd.choice(statuses)
+                approved = status == "approved"
+                payments.append(AdminFeePayment(
+                    user_id=self.rnd.choice(user_ids), university=uni,
+                    amount=uni.admin_fee_per_head * students, for_number_of_students=students,
+                    uses_remaining=self.rnd.randint(0, 3) if approved else 0,
+                    valid_until=created_at + timedelta(days=90) if approved else None,
+                    approved_at=created_at if approved else None,
+                    created_at=created_at,
+                ))
+                payments[-1].is_active = payments[-1].compute_is_active()
+                states.append(status)
+            payments = self._bulk(AdminFeePayment, payments)
+            self._bulk(PaymentConfirmation, [
+                PaymentConfirmation(
+                    payment=p, status=status, submitted_at=p.created_at + timedelta(minutes=self.rnd.randint(1, 600)),
+                    confirmation_text=f"EcoCash ref MP{self.rnd.randrange(10 ** 10):010d}",
+                )
+                for p, status in zip(payments, states)
+            ])
+        self.log(f"  {len(payments)} payments")
+        return [(p.pk, p.university_id, p.created_at) for p in payments if p.valid_until]
+
+    def contact_views(self, count, payments, properties):
+        """Contact unlocks: up to three properties of the payment's university each."""
+        from payments.models import ContactView
+
+        by_university = {}
+        for pk, university_id in properties:
+            if university_id:
+                by_university.setdefault(university_id, []).append(pk)
+        views, seen = [], set()
+        with backdating(ContactView):
+            for payment_id, university_id, created_at in payments:
+                candidates = by_university.get(university_id)
+                if not candidates:
+                    continue
+                for prop in self.rnd.sample(candidates, min(len(candidates), self.rnd.randint(1, 3))):
+                    if len(views) >= count:
+                        break
+                    if (payment_id, prop) not in seen:
+                        seen.add((payment_id, prop))
+                        views.append(ContactView(
+                            payment_id=payment_id, property_id=prop,
+                            viewed_at=created_at + timedelta(hours=self.rnd.randint(1, 24 * 60)),
+                        ))
+            self.log(f"  {len(views)} contact views")
+            return len(self._bulk(ContactView, views))
+
+    def feedback(self, count):
+        from core import feedback_analytics
+        from core.models_feedback import Feedback
+
+        rows = []
+        with backdating(Feedback):
+            for _ in range(count):
+                rating = self.rnd.choice(RATING_POOL)
+                occupation = self.rnd.choice(OCCUPATIONS)
+                rows.append(Feedback(
+                    name=self.rnd.choice(FEEDBACK_NAMES),
+                    age=self.rnd.choice(AGES),
+                    gender=self.rnd.choice(GENDERS),
+                    occupation=occupation,
+                    city=self.rnd.choice(FEEDBACK_CITIES),
+                    has_internet=self.rnd.choice(["Yes", "Yes", "Yes", "No"]),
+                    online_search_freq=self.rnd.choice(SEARCH_FREQUENCIES),
+                    current_methods_rating=self.rnd.choice(METHOD_RATINGS),
+                    challenges=",".join(self.rnd.sample(CHALLENGES, self.rnd.randint(0, 3))),
+                    easy_to_use=rating,
+                    user_friendly=self.rnd.choice(RATING_POOL),
+                    quick_response=self.rnd.choice(RATING_POOL),
+                    easy_search=self.rnd.choice(RATING_POOL),
+                    like_most=self.rnd.choice(LIKES),
+                    challenges_exp=self.rnd.choice(CHALLENGES),
+                    improvements=self.rnd.choice(IMPROVEMENTS),
+                    user_type=occupation,
+                    ux_review=rating,
+                    satisfaction=rating,
+                    recommend=self.rnd.choice(RATING_POOL),
+                    submitted_at=self._past(365),
+                ))
+            created = self._bulk(Feedback, rows)
+        # bulk_create skips the post_save receiver that does these.
+        feedback_analytics.save_challenges(created)
+        feedback_analytics.invalidate()
+        return len(created)
+
+    def finalize(self, search_index=True):
+        """What the skipped ``post_save`` signals would have done."""
+        from properties import facets, suggest
+        from properties import search_index as index
+
+        if search_index:
+            self.log("  rebuilding search index")
+            index.rebuild(batch_size=self.batch_size)
+        suggest.invalidate()
+        facets.invalidate()
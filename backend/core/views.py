@@ -0,0 +1,16 @@
+from django.http import HttpResponse, HttpResponseForbidden
+
+from core.metrics import registry
+
+
+def _is_admin(user):
+    return user.is_authenticated and (
+        getattr(user, "role", None) == "admin" or user.is_staff or user.is_superuser
+    )
+
+
+def metrics(request):
+    """Prometheus scrape endpoint for ``core.metrics`` (admins only)."""
+    if not _is_admin(request.user):
+        return HttpResponseForbidden("Admins only.")
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,173 @@
+"""Write-behind buffering for UserUniversityPreference visit tracking.
+
+Listing pages used to run a get_or_create + save on every request just to bump
+``visit_count``. Visits are now recorded in memory and upserted in bulk once
+the buffer is due, after the response has been handed back to the client
+(see ``flush_visits_after_request`` which is wired to ``request_finished``).
+
+Counts live in process memory until flushed, so a crash can lose at most one
+flush interval worth of visits. That is acceptable for a personalization
+signal.
+
+The upsert adds to ``visit_count`` in SQL (``ON CONFLICT DO UPDATE SET
+visit_count = visit_count + EXCLUDED.visit_count``), so flushes from several
+workers never overwrite each other's increments. Rows that could never be
+written are dropped rather than retried: invalid IPs are rejected by
+``record``, and visits to deleted universities are filtered out at flush. A
+batch is put back only after an ``OperationalError`` (lock, lost
+connection), and only up to ``max_pending`` keys, so a bad batch can't wedge
+every later flush or grow the buffer without limit.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_ipv46_address
+from django.db import DatabaseError, OperationalError, connections, router, transaction
+from django.utils import timezone
+
+# Rows per INSERT; 6 parameters each stays under SQLite's 999 limit.
+FLUSH_BATCH_SIZE = 150
+
+
+class VisitBuffer:
+    """Thread-safe accumulator of (ip, university) visit events."""
+
+    def __init__(self, flush_interval=None, max_pending=None):
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return float(getattr(settings, "VISIT_TRACKING_FLUSH_INTERVAL", 30))
+
+    @property
+    def max_pending(self):
+        if self._max_pending is not None:
+            return self._max_pending
+        return int(getattr(settings, "VISIT_TRACKING_MAX_PENDING", 500))
+
+    def record(self, ip_address, university_id, user_id=None):
+        """Queue one visit. Never touches the database."""
+        if not ip_address or not university_id:
+            return
+        try:
+            validate_ipv46_address(ip_address)
+        except ValidationError:
+            return
+        key = (ip_address, int(university_id))
+        with self._lock:
+            count, known_user_id = self._pending.get(key, (0, None))
+            self._pending[key] = (count + 1, user_id or known_user_id)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def is_due(self):
+        with self._lock:
+            if not self._pending:
+                return False
+            if len(self._pending) >= self.max_pending:
+                return True
+            return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        return pending
+
+    def _restore(self, pending):
+        # Put events back so a transient DB error doesn't drop them, but
+        # never past max_pending keys: an outage loses visits, not memory.
+        with self._lock:
+            for key, (count, user_id) in pending.items():
+                if key not in self._pending and len(self._pending) >= self.max_pending:
+                    continue
+                cur_count, cur_user = self._pending.get(key, (0, None))
+                self._pending[key] = (cur_count + count, cur_user or user_id)
+
+    def flush(self):
+        """Upsert all buffered visits. Returns the number of rows written.
+
+        One SELECT of the universities still present, then one
+        ``INSERT ... ON CONFLICT DO UPDATE`` per ``FLUSH_BATCH_SIZE`` keys.
+        """
+        from core.models import UserUniversityPreference
+        from properties.models import University
+
+        pending = self._drain()
+        if not pending:
+            return 0
+
+        live = set(
+            University.objects.filter(pk__in={uni for _ip, uni in pending}).values_list("pk", flat=True)
+        )
+        rows = [
+            (ip, uni_id, user_id, count)
+            for (ip, uni_id), (count, user_id) in pending.items()
+            if uni_id in live
+        ]
+        if not rows:
+            return 0
+
+        using = router.db_for_write(UserUniversityPreference)
+        connection = connections[using]
+        table = connection.ops.quote_name(UserUniversityPreference._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+                    batch = rows[start:start + FLUSH_BATCH_SIZE]
+                    cursor.execute(
+                        f"INSERT INTO {table} "
+                        "(ip_address, university_id, user_id, visit_count, last_visited, created_at) "
+                        f"VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(batch))} "
+                        "ON CONFLICT (ip_address, university_id) DO UPDATE SET "
+                        f"visit_count = {table}.visit_count + EXCLUDED.visit_count, "
+                        f"user_id = COALESCE(EXCLUDED.user_id, {table}.user_id), "
+                        "last_visited = EXCLUDED.last_visited",
+                        [value for row in batch for value in (*row, now, now)],
+                    )
+        except OperationalError:
+            self._restore(pending)
+            raise
+        return len(rows)
+
+
+visit_buffer = VisitBuffer()
+
+
+def record_university_visit(request, university_id):
+    """Buffer a university listing visit for the current request."""
+    ip_address = (
+        request.META.get("HTTP_X_FORWARDED_FOR", request.META.get("REMOTE_ADDR", ""))
+        .split(",")[0]
+        .strip()
+    )
+    user_id = request.user.pk if request.user.is_authenticated else None
+    visit_buffer.record(ip_address, university_id, user_id=user_id)
+
+
+def flush_visits_after_request(sender, **kwargs):
+    """``request_finished`` receiver: flush the buffer once it is due.
+
+    The response has already been sent when this runs, so page renders never
+    wait on the tracking write.
+    """
+    if not visit_buffer.is_due():
+        return
+    try:
+        visit_buffer.flush()
+    except DatabaseError:
+        # Transient errors put the events back for a later request; anything
+        # else (say a user deleted meanwhile) drops this batch.
+        pass
@@ -1,12 +1,40 @@
 from django.contrib import admin
 from .models import AdminFeePayment, PaymentConfirmation, ContactView
+from .review import ACTIONS, review_confirmations
 
 
 @admin.register(PaymentConfirmation)
 class PaymentConfirmationAdmin(admin.ModelAdmin):
-    list_display = ("payment", "status", "submitted_at")
-    list_filter = ("status",)
-    search_fields = ("payment__user__email", "payment__university__name")
+    list_display = ("payment", "status", "match_status", "transaction_id", "submitted_at")
+    list_filter = ("status", "match_status")
+    search_fields = ("payment__user__email", "payment__university__name", "transaction_id")
+    readonly_fields = ("transaction_id", "parsed_amount", "match_status", "match_note")
+    list_select_related = ("payment__user", "payment__university")
+    actions = ("approve_selected", "decline_selected")
+
+    def save_model(self, request, obj, form, change):
+        # Approving/declining here must activate and notify like the dashboard
+        # does: save the other edits under the old status, then review.
+        action = {status: action for action, status in ACTIONS.items()}.get(obj.status)
+        if change and action and "status" in form.changed_data:
+            obj.status = form.initial["status"]
+            super().save_model(request, obj, form, change)
+            review_confirmations([obj.pk], action)
+            obj.status = ACTIONS[action]
+            return
+        super().save_model(request, obj, form, change)
+
+    def _review(self, request, queryset, action):
+        changed = review_confirmations(list(queryset.values_list("pk", flat=True)), action)
+        self.message_user(request, f"{len(changed)} confirmation(s) {ACTIONS[action]}.")
+
+    @admin.action(description="Approve selected confirmations")
+    def approve_selected(self, request, queryset):
+        self._review(request, queryset, "approve")
+
+    @admin.action(description="Decline selected confirmations")
+    def decline_selected(self, request, queryset):
+        self._review(request, queryset, "decline")
 
 
 @admin.register(AdminFeePayment)
@@ -0,0 +1,187 @@
+"""Reading EcoCash SMS confirmations pasted into PaymentConfirmation.
+
+Users paste the SMS they got from EcoCash. The wording varies between
+message types and app versions:
+
+    Transfer Confirmation. Transfer of USD 20.00 to 0776487550 T. TAYERO
+    successful. Approval Code: MP240512.1432.A12345. New wallet balance:
+    USD 3.50. 12/05/24 14:32
+
+    Confirmed. You have sent USD20.00 to TAYERO T (263776487550) on
+    12/05/2024 at 14:32. Txn ID PP240512.1432.H12345. Balance: USD3.50
+
+``parse`` picks out the amount (not the balance), the transaction id, the
+time and the recipient number. ``classify`` compares them with the
+AdminFeePayment and sorts the confirmation into a bucket:
+
+- ``auto``: amount, recipient and date all present and matching, and a
+  well-formed transaction id that is new
+- ``mismatch``: parsed, but the amount, recipient or date is wrong or missing,
+  or the transaction id doesn't look like an EcoCash one
+- ``duplicate``: the transaction id is already claimed by another live
+  confirmation (the partial unique index on ``transaction_id`` decides;
+  declined and canceled confirmations release their id)
+- ``unparsed``: no amount or transaction id found; needs a human
+
+The text is typed by the user, so even ``auto`` only says the claim is
+consistent, not that the money arrived. Approval without an admin needs
+``ECOCASH_AUTO_APPROVE`` *and* an ``ECOCASH_VERIFIER``: a callable that
+checks the transaction against a trusted EcoCash source (merchant statement
+or API). Without a verifier, ``auto`` confirmations wait for review like
+the rest, just sorted first.
+"""
+
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+AMOUNT_RE = re.compile(r"(?:USD|US\$|ZWG|ZWL|RTGS|\$)\s?(\d[\d,]*(?:\.\d{1,2})?)", re.I)
+# The id must contain a digit, so "reference number 123" doesn't yield "NUMBER".
+LABELLED_ID_RE = re.compile(
+    r"\b(?:txn\s*id|trans(?:action)?\s*id|approval\s*code|ref(?:erence)?(?:\s*(?:no|num|number)\b\.?)?|tid)"
+    r"\s*[:.#]?\s*((?=[A-Z0-9.\-]*\d)[A-Z0-9][A-Z0-9.\-]{5,39})",
+    re.I,
+)
+# EcoCash ids look like MP240512.1432.A12345.
+ECOCASH_ID_RE = re.compile(r"[A-Z]{2}\d{6}\.\d{4}\.[A-Z0-9]{5,7}")
+BARE_ID_RE = re.compile(rf"\b({ECOCASH_ID_RE.pattern})\b")
+PHONE_RE = re.compile(r"(?<![\d.])(?:\+?263|0)[ \-]?(7[1-8])[ \-]?(\d{3})[ \-]?(\d{4})(?!\d)")
+DATE_RE = re.compile(
+    r"(\d{1,2})/(\d{1,2})/(\d{4}|\d{2})(?:\s*(?:at\s*)?(\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+)
+
+# How far the SMS time may be from the payment record (SMS before the
+# record is normal: people pay, then fill the form).
+TIME_WINDOW = timedelta(days=3)
+
+
+class ParsedConfirmation:
+    def __init__(self, amount=None, transaction_id=None, paid_at=None, recipient=None):
+        self.amount = amount
+        self.transaction_id = transaction_id
+        self.paid_at = paid_at
+        self.recipient = recipient
+
+
+def normalize_phone(value):
+    """``0776487550`` for any of ``+263 77 648 7550``, ``263776487550``, ``0776487550``."""
+    match = PHONE_RE.search(value or "")
+    return "0" + "".join(match.groups()) if match else None
+
+
+def _amount(text):
+    for match in AMOUNT_RE.finditer(text):
+        # Skip "New wallet balance: USD 3.50" and the like.
+        if "balance" in text[max(0, match.start() - 25):match.start()].lower():
+            continue
+        try:
+            return Decimal(match.group(1).replace(",", ""))
+        except InvalidOperation:
+            continue
+    return None
+
+
+def _transaction_id(text):
+    match = LABELLED_ID_RE.search(text) or BARE_ID_RE.search(text)
+    if not match:
+        return None
+    return match.group(1).rstrip(".-").upper()
+
+
+def _paid_at(text):
+    match = DATE_RE.search(text)
+    if not match:
+        return None
+    day, month, year, hour, minute, second = match.groups()
+    year = int(year) + (2000 if len(year) == 2 else 0)
+    try:
+        naive = datetime(year, int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    except ValueError:
+        return None
+    return timezone.make_aware(naive) if settings.USE_TZ else naive
+
+
+def parse(text):
+    text = text or ""
+    # The recipient is the first number in the message; EcoCash doesn't
+    # include the sender's own number.
+    return ParsedConfirmation(
+        amount=_amount(text),
+        transaction_id=_transaction_id(text),
+        paid_at=_paid_at(text),
+        recipient=normalize_phone(text),
+    )
+
+
+def classify(parsed, payment):
+    """``(bucket, note)`` for ``parsed`` against ``payment``; ignores duplicates."""
+    if parsed.amount is None or not parsed.transaction_id:
+        return "unparsed", ""
+    problems = []
+    if abs(parsed.amount - payment.amount) >= Decimal("0.01"):
+        problems.append(f"amount {parsed.amount:.2f} != expected {payment.amount:.2f}")
+    if not ECOCASH_ID_RE.fullmatch(parsed.transaction_id):
+        problems.append(f"transaction id {parsed.transaction_id} is not an EcoCash id")
+    expected_number = normalize_phone(getattr(settings, "ECOCASH_NUMBER", ""))
+    if not parsed.recipient:
+        problems.append("no recipient number")
+    elif expected_number and parsed.recipient != expected_number:
+        problems.append(f"sent to {parsed.recipient}, not {expected_number}")
+    if not parsed.paid_at:
+        problems.append("no payment date")
+    elif payment.created_at and abs(parsed.paid_at - payment.created_at) > TIME_WINDOW:
+        problems.append(f"paid {parsed.paid_at:%Y-%m-%d}, payment created {payment.created_at:%Y-%m-%d}")
+    if problems:
+        return "mismatch", "; ".join(problems)
+    return "auto", ""
+
+
+def match_confirmation(confirmation):
+    """Parse, classify and save ``confirmation``, claiming its transaction id.
+
+    The unique index on live ``transaction_id``s settles races: when the
+    insert or update collides, the confirmation is saved without the id and
+    marked ``duplicate``.
+    """
+    parsed = parse(confirmation.confirmation_text)
+    bucket, note = classify(parsed, confirmation.payment)
+    confirmation.parsed_amount = parsed.amount
+    confirmation.match_status, confirmation.match_note = bucket, note
+    confirmation.transaction_id = parsed.transaction_id
+    try:
+        with transaction.atomic():
+            confirmation.save()
+    except IntegrityError:
+        if not parsed.transaction_id:
+            raise
+        from .models import RELEASED_STATUSES, PaymentConfirmation
+
+        owner = (
+            PaymentConfirmation.objects.filter(transaction_id=parsed.transaction_id)
+            .exclude(status__in=RELEASED_STATUSES)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        confirmation.transaction_id = None
+        confirmation.match_status = "duplicate"
+        confirmation.match_note = f"transaction {parsed.transaction_id} already used by confirmation #{owner}"
+        confirmation.save()
+
+    if confirmation.match_status == "auto" and getattr(settings, "ECOCASH_AUTO_APPROVE", False):
+        transaction.on_commit(lambda: _approve_if_verified(confirmation.pk, parsed, confirmation.payment))
+    return confirmation
+
+
+def _approve_if_verified(pk, parsed, payment):
+    """Approve when the configured verifier finds the transaction at EcoCash."""
+    path = getattr(settings, "ECOCASH_VERIFIER", "")
+    if not path or not import_string(path)(parsed, payment):
+        return
+    from .review import review_confirmations
+
+    review_confirmations([pk], "approve")
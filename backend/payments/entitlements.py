@@ -0,0 +1,100 @@
+"""Per-user "has paid" state, cached.
+
+An ``Entitlements`` is what a user's live (unexpired) admin-fee payments
+allow: uses left per university, and the properties already unlocked on
+them. It is computed with one query and cached per user, so detail and list
+pages can show unlock state without touching the database.
+
+The cache entry is dropped after commit whenever a payment or ContactView
+of the user changes (see ``payments.signals`` and ``payments.unlock``). It
+also expires no later than the user's earliest ``valid_until``, so a
+payment running out needs no invalidation.
+
+That delete only reaches other workers through a shared cache
+(``CACHE_URL``). With the default per-process cache, a worker that didn't
+handle the approval or unlock keeps its entry, so entries then live for
+``ENTITLEMENT_LOCAL_TIMEOUT`` only: that bounds how long another worker can
+show stale paid or unlocked state.
+
+This is for display only. ``payments.unlock`` still decides unlocks against
+the database.
+
+``compute`` always reads the primary, even inside replica-routed views
+(``backend.db_router``): an entry built from a lagging replica would show a
+just-approved user as unpaid for as long as it is cached.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils import timezone
+
+ENTITLEMENT_TIMEOUT = 3600
+ENTITLEMENT_LOCAL_TIMEOUT = 60
+
+
+def _timeout():
+    return ENTITLEMENT_TIMEOUT if getattr(settings, "CACHE_SHARED", False) else ENTITLEMENT_LOCAL_TIMEOUT
+
+
+def _key(user_id):
+    return f"entitlements:{user_id}"
+
+
+class Entitlements:
+    def __init__(self, uses=None, unlocked=()):
+        # university id -> uses left across the user's live payments
+        self.uses = uses or {}
+        self.unlocked = frozenset(unlocked)
+
+    def has_paid(self, university_id):
+        return self.uses.get(university_id, 0) > 0
+
+    def uses_remaining(self, university_id):
+        return self.uses.get(university_id, 0)
+
+    def is_unlocked(self, property_id):
+        return property_id in self.unlocked
+
+
+def compute(user_id):
+    """``(Entitlements, seconds until the first live payment expires)``."""
+    from .models import AdminFeePayment
+
+    now = timezone.now()
+    rows = (
+        AdminFeePayment.objects.using(router.db_for_write(AdminFeePayment))
+        .filter(user_id=user_id)
+        .exclude(valid_until__lte=now)
+        .values_list("pk", "university_id", "uses_remaining", "valid_until", "contact_views__property_id")
+    )
+    uses, unlocked, seen, expires = {}, set(), set(), None
+    for pk, university_id, remaining, valid_until, property_id in rows:
+        if property_id is not None:
+            unlocked.add(property_id)
+        if pk in seen:
+            continue
+        seen.add(pk)
+        uses[university_id] = uses.get(university_id, 0) + max(remaining, 0)
+        if valid_until is not None and (expires is None or valid_until < expires):
+            expires = valid_until
+    ttl = _timeout()
+    if expires is not None:
+        ttl = max(1, min(ttl, int((expires - now).total_seconds())))
+    return Entitlements(uses, unlocked), ttl
+
+
+def for_user(user):
+    if not user.is_authenticated:
+        return Entitlements()
+    cached = cache.get(_key(user.pk))
+    if cached is not None:
+        return Entitlements(*cached)
+    entitlements, ttl = compute(user.pk)
+    cache.set(_key(user.pk), (entitlements.uses, entitlements.unlocked), ttl)
+    return entitlements
+
+
+def invalidate(user_id):
+    """Drop ``user_id``'s cached entitlements once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(_key(user_id)))
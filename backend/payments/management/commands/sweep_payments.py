@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Notification
+from core.notifications import send_notifications
+from payments import entitlements
+from payments.models import AdminFeePayment, PaymentConfirmation
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire admin-fee payments past valid_until, resync the is_active flag and cancel "
+        "confirmations pending longer than --pending-days. Idempotent; safe to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pending-days",
+            type=int,
+            default=getattr(settings, "PAYMENT_CONFIRMATION_PENDING_DAYS", 14),
+            help="Cancel confirmations still pending after this many days (0 keeps them).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would change.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        with transaction.atomic():
+            counts = {
+                "expired": self._update(
+                    AdminFeePayment.objects.filter(valid_until__lte=now).filter(
+                        Q(is_active=True) | Q(uses_remaining__gt=0)
+                    ),
+                    uses_remaining=0,
+                    is_active=False,
+                ),
+                # Drift: flag out of step with uses_remaining (raw edits, old rows).
+                "deactivated": self._update(
+                    AdminFeePayment.objects.filter(is_active=True, uses_remaining__lte=0), is_active=False
+                ),
+                "reactivated": self._update(
+                    AdminFeePayment.objects.filter(is_active=False, uses_remaining__gt=0).filter(
+                        Q(valid_until__isnull=True) | Q(valid_until__gt=now)
+                    ),
+                    is_active=True,
+                ),
+                "canceled": self._cancel_pending(now, options["pending_days"]),
+            }
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        prefix = "Would update" if options["dry_run"] else "Updated"
+        for label, count in counts.items():
+            self.stdout.write(self.style.SUCCESS(f"{prefix} {count} {label}"))
+
+    def _update(self, qs, **values):
+        rows = list(qs.values_list("pk", "user_id"))
+        if not rows:
+            return 0
+        AdminFeePayment.objects.filter(pk__in=[pk for pk, _user in rows]).update(**values)
+        for user_id in {user for _pk, user in rows}:
+            entitlements.invalidate(user_id)
+        return len(rows)
+
+    def _cancel_pending(self, now, pending_days):
+        if pending_days <= 0:
+            return 0
+        stale = list(
+            PaymentConfirmation.objects.filter(status="pending", submitted_at__lt=now - timedelta(days=pending_days))
+            .values_list("pk", "payment__user_id", "payment__university__name")
+        )
+        if not stale:
+            return 0
+        PaymentConfirmation.objects.filter(pk__in=[pk for pk, _user, _uni in stale]).update(status="canceled")
+        send_notifications(
+            Notification(
+                recipient_id=user_id,
+                title="Payment confirmation expired",
+                message=(
+                    f"Your payment confirmation for {university} was not reviewed within {pending_days} days "
+                    "and has been canceled. Please submit it again if you have paid."
+                ),
+            )
+            for _pk, user_id, university in stale
+        )
+        return len(stale)
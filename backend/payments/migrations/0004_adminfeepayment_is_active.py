@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def backfill_is_active(apps, schema_editor):
+    AdminFeePayment = apps.get_model("payments", "AdminFeePayment")
+    AdminFeePayment.objects.using(schema_editor.connection.alias).filter(uses_remaining__gt=0).filter(
+        Q(valid_until__isnull=True) | Q(valid_until__gt=timezone.now())
+    ).update(is_active=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_paymentconfirmation_canceled'),
+        ('properties', '0014_property_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminfeepayment',
+            name='is_active',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_is_active, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='adminfeepayment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'university'], name='feepay_active_user_uni'),
+        ),
+        migrations.AddIndex(
+            model_name='adminfeepayment',
+            index=models.Index(fields=['is_active', 'valid_until'], name='feepay_active_valid_until'),
+        ),
+    ]
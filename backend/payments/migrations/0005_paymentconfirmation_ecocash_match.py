@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_adminfeepayment_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='match_note',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='match_status',
+            field=models.CharField(choices=[('auto', 'Auto-approvable'), ('mismatch', 'Mismatch'), ('duplicate', 'Duplicate transaction id'), ('unparsed', 'Needs manual review')], default='unparsed', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='parsed_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentconfirmation',
+            name='transaction_id',
+            field=models.CharField(blank=True, max_length=40, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='paymentconfirmation',
+            index=models.Index(fields=['status', 'match_status', 'submitted_at'], name='payconf_queue'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_paymentconfirmation_ecocash_match'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentconfirmation',
+            name='match_status',
+            field=models.CharField(choices=[('auto', 'Matches payment'), ('mismatch', 'Mismatch'), ('duplicate', 'Duplicate transaction id'), ('unparsed', 'Needs manual review')], default='unparsed', max_length=20),
+        ),
+    ]
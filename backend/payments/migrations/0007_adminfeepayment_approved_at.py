@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:38
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_approved_at(apps, schema_editor):
+    # Approval set valid_until to 90 days out; that is the best record of when.
+    AdminFeePayment = apps.get_model("payments", "AdminFeePayment")
+    AdminFeePayment.objects.using(schema_editor.connection.alias).filter(valid_until__isnull=False).update(
+        approved_at=models.F("valid_until") - timedelta(days=90)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_paymentconfirmation_match_label'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminfeepayment',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_approved_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_adminfeepayment_approved_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentconfirmation',
+            name='transaction_id',
+            field=models.CharField(blank=True, max_length=40, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentconfirmation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('declined', 'canceled')), _negated=True), fields=('transaction_id',), name='payconf_live_transaction_id'),
+        ),
+    ]
@@ -2,6 +2,9 @@ from django.db import models
 from django.conf import settings
 from properties.models import Property, University
 
+# How long an approved admin-fee payment stays usable.
+PAYMENT_VALID_DAYS = 90
+
 
 class AdminFeePayment(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -13,26 +16,53 @@ class AdminFeePayment(models.Model):
     # remaining uses left; set when admin approves the payment
     uses_remaining = models.IntegerField(default=0)
     valid_until = models.DateTimeField(null=True, blank=True)
+    # Uses left and not expired. Kept in step by save(), the bulk paths
+    # (payments.review, payments.unlock) and the sweep_payments command, so
+    # queries can filter on it in SQL. Between sweeps an expired payment may
+    # still be flagged, so paths that spend uses also check valid_until.
+    is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # First approval (activate() or payments.review). Rows are created when a
+    # confirmation is submitted, so revenue KPIs count by this, not created_at.
+    approved_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "university"], condition=models.Q(is_active=True), name="feepay_active_user_uni"
+            ),
+            models.Index(fields=["is_active", "valid_until"], name="feepay_active_valid_until"),
+        ]
 
-    def activate(self, days_valid=90):
+    def activate(self, days_valid=PAYMENT_VALID_DAYS):
         from django.utils import timezone
+        now = timezone.now()
         self.uses_remaining = self.allowed_accommodations
-        self.valid_until = timezone.now() + timezone.timedelta(days=days_valid)
+        self.valid_until = now + timezone.timedelta(days=days_valid)
+        self.approved_at = self.approved_at or now
         self.save()
 
-    def is_active(self):
+    def compute_is_active(self, now=None):
         from django.utils import timezone
-        if self.uses_remaining > 0:
-            if self.valid_until and self.valid_until < timezone.now():
-                return False
-            return True
-        return False
+        if self.uses_remaining <= 0:
+            return False
+        return not (self.valid_until and self.valid_until <= (now or timezone.now()))
+
+    def save(self, *args, **kwargs):
+        self.is_active = self.compute_is_active()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "is_active" not in update_fields:
+            kwargs["update_fields"] = {*update_fields, "is_active"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.email} - {self.university.name} - {self.amount} (uses left: {self.uses_remaining})"
 
 
+# Confirmations in these states no longer hold their transaction id.
+RELEASED_STATUSES = ("declined", "canceled")
+
+
 class PaymentConfirmation(models.Model):
     STATUS = (
         ("pending", "Pending"),
@@ -40,10 +70,36 @@ class PaymentConfirmation(models.Model):
         ("declined", "Declined"),
         ("canceled", "Canceled"),
     )
+    MATCH = (
+        ("auto", "Matches payment"),
+        ("mismatch", "Mismatch"),
+        ("duplicate", "Duplicate transaction id"),
+        ("unparsed", "Needs manual review"),
+    )
     payment = models.ForeignKey(AdminFeePayment, on_delete=models.CASCADE, related_name="confirmations")
     confirmation_text = models.TextField()
     submitted_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS, default="pending")
+    # Filled from confirmation_text by payments.ecocash.match_confirmation.
+    # A transaction id can back one live confirmation only; a declined or
+    # canceled one releases it, so the payer can submit the same SMS again.
+    transaction_id = models.CharField(max_length=40, null=True, blank=True)
+    parsed_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    match_status = models.CharField(max_length=20, choices=MATCH, default="unparsed")
+    match_note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            # The review queue: pending confirmations by bucket, oldest first.
+            models.Index(fields=["status", "match_status", "submitted_at"], name="payconf_queue"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["transaction_id"],
+                condition=~models.Q(status__in=RELEASED_STATUSES),
+                name="payconf_live_transaction_id",
+            ),
+        ]
 
     def __str__(self):
         return f"Confirmation for {self.payment} - {self.status}"
@@ -0,0 +1,106 @@
+"""Approving and declining payment confirmations, one or many at a time.
+
+Every admin path goes through ``review_confirmations``: the API approve and
+decline views, the bulk API endpoint, the dashboard page and the Django
+admin. One review is a fixed number of queries however many confirmations
+it covers:
+
+- one SELECT of the confirmations still needing the change (with payment,
+  user and university)
+- one UPDATE of their status
+- on approval, one UPDATE activating their payments
+- one bulk INSERT of the user notifications
+
+The old path did a ``save()`` per confirmation, with a pre_save signal that
+re-read the row, activated the payment with another ``save()`` and sent a
+notification. The view then sent a second one. Status is now written with
+``update()``, so no save signal fires, and each user gets exactly one
+notification.
+"""
+
+from django.db import transaction
+from django.db.models import BooleanField, DateTimeField, ExpressionWrapper, F, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Notification
+from core.notifications import send_notifications
+
+from . import entitlements
+from .models import PAYMENT_VALID_DAYS, RELEASED_STATUSES, AdminFeePayment, PaymentConfirmation
+
+ACTIONS = {"approve": "approved", "decline": "declined"}
+
+
+def _message(action, payment):
+    university = payment.university.name
+    if action == "approve":
+        return (
+            "Payment confirmed",
+            f"Your payment for {university} has been approved. You can now view landlord contacts "
+            f"for up to {payment.allowed_accommodations} accommodations.",
+        )
+    return "Payment declined", f"Your payment confirmation for {university} was declined by admin."
+
+
+def _without_reclaimed_ids(confirmations):
+    """Drop declined/canceled confirmations whose transaction id a live one now holds.
+
+    Approving them would claim the id twice; the live confirmation is the
+    one to approve.
+    """
+    reviving = {c.transaction_id for c in confirmations if c.status in RELEASED_STATUSES and c.transaction_id}
+    if not reviving:
+        return confirmations
+    claimed = set(
+        PaymentConfirmation.objects.filter(transaction_id__in=reviving)
+        .exclude(status__in=RELEASED_STATUSES)
+        .values_list("transaction_id", flat=True)
+    )
+    return [c for c in confirmations if not (c.status in RELEASED_STATUSES and c.transaction_id in claimed)]
+
+
+def review_confirmations(ids, action):
+    """Apply ``action`` ("approve" or "decline") to the confirmations ``ids``.
+
+    Confirmations already in the target status are skipped, so a retried or
+    double-clicked review activates and notifies once. Returns the ids that
+    changed.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown review action: {action!r}")
+    status = ACTIONS[action]
+
+    with transaction.atomic():
+        confirmations = list(
+            PaymentConfirmation.objects.select_for_update()
+            .filter(pk__in=ids)
+            .exclude(status=status)
+            .select_related("payment__university")
+            .order_by("pk")
+        )
+        if action == "approve":
+            confirmations = _without_reclaimed_ids(confirmations)
+        if not confirmations:
+            return []
+        changed = [c.pk for c in confirmations]
+        PaymentConfirmation.objects.filter(pk__in=changed).update(status=status)
+
+        payments = {c.payment_id: c.payment for c in confirmations}
+        if action == "approve":
+            now = timezone.now()
+            AdminFeePayment.objects.filter(pk__in=payments).update(
+                uses_remaining=F("allowed_accommodations"),
+                is_active=ExpressionWrapper(Q(allowed_accommodations__gt=0), output_field=BooleanField()),
+                valid_until=now + timezone.timedelta(days=PAYMENT_VALID_DAYS),
+                approved_at=Coalesce("approved_at", Value(now, output_field=DateTimeField())),
+            )
+            for payment in payments.values():
+                entitlements.invalidate(payment.user_id)
+
+        notifications = []
+        for payment in payments.values():
+            title, message = _message(action, payment)
+            notifications.append(Notification(recipient_id=payment.user_id, title=title, message=message))
+        send_notifications(notifications)
+    return changed
@@ -0,0 +1,130 @@
+"""Spending one admin-fee use to unlock a property's landlord contact.
+
+``unlock_contact`` is the only place that decrements ``uses_remaining``. It
+used to be a read-check-write in Python (load payments, ``is_active()``,
+``ContactView.exists()``, create, ``save()``), which lost or double-spent
+uses under concurrent taps. Now it is two statements in one transaction:
+
+1. ``INSERT INTO contactview ... SELECT`` the oldest live payment with uses
+   left, unless any live payment for the same university already unlocked
+   this property. ``ON CONFLICT DO NOTHING`` covers the unique
+   (payment, property) pair.
+2. If a row went in, a conditional ``UPDATE ... SET uses_remaining =
+   uses_remaining - 1 WHERE uses_remaining > 0 AND <not expired>``. If a
+   concurrent unlock spent the last use first, this matches no row. The
+   savepoint is then rolled back, so the ContactView goes too, and the unlock
+   is tried again.
+
+Repeat views of an already unlocked property cost nothing. Both statements
+are raw SQL, so no model signals fire. A charged unlock therefore drops the
+user's cached ``payments.entitlements`` itself.
+
+SQLite serialises writers and reports "database is locked" once its busy
+timeout runs out, so that error is retried with a short backoff.
+"""
+
+import time
+
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from . import entitlements
+from .models import AdminFeePayment, ContactView
+
+LOCK_RETRIES = 5
+
+
+class ContactUnlock:
+    def __init__(self, payment_id, uses_remaining, charged):
+        self.payment_id = payment_id
+        self.uses_remaining = uses_remaining
+        # False when this property was already unlocked on a live payment.
+        self.charged = charged
+
+
+class _SpentConcurrently(Exception):
+    pass
+
+
+def _live(alias, now_param):
+    # "Not expired": no valid_until, or valid_until in the future.
+    return f"({alias}.valid_until IS NULL OR {alias}.valid_until > {now_param})"
+
+
+def _unlock_once(user_id, university_id, property_id):
+    qn = connection.ops.quote_name
+    payments = qn(AdminFeePayment._meta.db_table)
+    views = qn(ContactView._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {views} (payment_id, property_id, viewed_at)
+            SELECT p.id, %s, %s FROM {payments} p
+            WHERE p.user_id = %s AND p.university_id = %s
+              AND p.is_active AND p.uses_remaining > 0 AND {_live("p", "%s")}
+              AND NOT EXISTS (
+                SELECT 1 FROM {views} v JOIN {payments} q ON q.id = v.payment_id
+                WHERE v.property_id = %s AND q.user_id = %s AND q.university_id = %s
+                  AND {_live("q", "%s")}
+              )
+            ORDER BY p.created_at, p.id
+            LIMIT 1
+            ON CONFLICT (payment_id, property_id) DO NOTHING
+            RETURNING payment_id
+            """,
+            [property_id, now, user_id, university_id, now, property_id, user_id, university_id, now],
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            payment_id = row[0]
+            cursor.execute(
+                f"""
+                UPDATE {payments} SET uses_remaining = uses_remaining - 1, is_active = uses_remaining > 1
+                WHERE id = %s AND uses_remaining > 0 AND {_live(payments, "%s")}
+                RETURNING uses_remaining
+                """,
+                [payment_id, now],
+            )
+            updated = cursor.fetchone()
+            if updated is None:
+                raise _SpentConcurrently
+            entitlements.invalidate(user_id)
+            return ContactUnlock(payment_id, updated[0], charged=True)
+
+        # Nothing inserted: either unlocked before on a live payment, or no
+        # usable payment at all.
+        cursor.execute(
+            f"""
+            SELECT q.id, q.uses_remaining FROM {views} v JOIN {payments} q ON q.id = v.payment_id
+            WHERE v.property_id = %s AND q.user_id = %s AND q.university_id = %s AND {_live("q", "%s")}
+            ORDER BY q.created_at, q.id
+            LIMIT 1
+            """,
+            [property_id, user_id, university_id, now],
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return ContactUnlock(row[0], row[1], charged=False)
+
+
+def unlock_contact(user, prop):
+    """Unlock ``prop``'s contact for ``user``, spending a use if needed.
+
+    Returns a ``ContactUnlock``, or ``None`` when the user has no live payment
+    with uses left for the property's university.
+    """
+    if not user.is_authenticated or not prop.university_id:
+        return None
+    for attempt in range(LOCK_RETRIES):
+        try:
+            return _unlock_once(user.pk, prop.university_id, prop.pk)
+        except _SpentConcurrently:
+            continue
+        except OperationalError as exc:
+            if "locked" not in str(exc) or attempt == LOCK_RETRIES - 1:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+    return None
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import University, City, Property, PropertyImage, Review, Service
-from .models import ShortTermLodge
+from .models import Amenity, ShortTermLodge
 
 
 @admin.register(Service)
@@ -25,6 +25,12 @@ class CityAdmin(admin.ModelAdmin):
     search_fields = ('name',)
 
 
+@admin.register(Amenity)
+class AmenityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+
+
 class PropertyImageInline(admin.TabularInline):
     model = PropertyImage
     extra = 3  # Show 3 empty image upload fields by default
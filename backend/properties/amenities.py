@@ -0,0 +1,90 @@
+"""Structured amenities.
+
+Landlords still type ``Property.amenities`` as free text ("WiFi, Parking,
+Kitchen"). On save it is parsed into ``Amenity`` rows linked through
+``PropertyAmenity``, so filtering and facet counts run on an indexed join
+instead of ``amenities__icontains`` (which also matched substrings, e.g.
+"Parking" inside "No parking").
+"""
+
+import re
+
+from django.db.models import Count
+
+_SPLIT_RE = re.compile(r"[,\n;]+")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def amenity_slug(name):
+    """Match key: case, spaces and punctuation ignored ("Wi-Fi" -> "wifi")."""
+    return _SLUG_RE.sub("", (name or "").lower())[:80]
+
+
+def parse_amenities(text):
+    """``{slug: display name}`` in the order given, first spelling wins."""
+    parsed = {}
+    for part in _SPLIT_RE.split(text or ""):
+        name = " ".join(part.split())[:80]
+        slug = amenity_slug(name)
+        if slug and slug not in parsed:
+            parsed[slug] = name
+    return parsed
+
+
+def sync_property_amenities(prop):
+    """Make the property's amenity links match its ``amenities`` text."""
+    from .models import Amenity as amenity_model, PropertyAmenity as link_model
+
+    parsed = parse_amenities(prop.amenities)
+    existing = dict(amenity_model.objects.filter(slug__in=parsed).values_list("slug", "pk"))
+    missing = [amenity_model(slug=slug, name=name) for slug, name in parsed.items() if slug not in existing]
+    if missing:
+        amenity_model.objects.bulk_create(missing, ignore_conflicts=True)
+        existing = dict(amenity_model.objects.filter(slug__in=parsed).values_list("slug", "pk"))
+
+    wanted = set(existing.values())
+    links = link_model.objects.filter(property_id=prop.pk)
+    current = set(links.values_list("amenity_id", flat=True))
+    if current - wanted:
+        links.filter(amenity_id__in=current - wanted).delete()
+    if wanted - current:
+        link_model.objects.bulk_create(
+            [link_model(property_id=prop.pk, amenity_id=pk) for pk in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def requested_slugs(value):
+    """Parse an ``amenities=wifi,parking`` query parameter."""
+    return sorted({amenity_slug(part) for part in (value or "").split(",")} - {""})
+
+
+def filter_by_amenities(qs, value):
+    """Properties having *all* requested amenities (one grouped subquery)."""
+    from .models import PropertyAmenity
+
+    slugs = requested_slugs(value)
+    if not slugs:
+        return qs
+    having_all = (
+        PropertyAmenity.objects.filter(amenity__slug__in=slugs)
+        .values("property_id")
+        .annotate(matched=Count("amenity_id"))
+        .filter(matched=len(slugs))
+        .values("property_id")
+    )
+    return qs.filter(pk__in=having_all)
+
+
+def amenity_facets(qs):
+    """``[{"slug", "name", "count"}]`` for properties in ``qs``, one grouped query."""
+    from .models import PropertyAmenity
+
+    rows = (
+        PropertyAmenity.objects.using(qs.db)
+        .filter(property_id__in=qs.order_by().values("pk"))
+        .values("amenity__slug", "amenity__name")
+        .annotate(count=Count("property_id"))
+        .order_by("-count", "amenity__name")
+    )
+    return [{"slug": r["amenity__slug"], "name": r["amenity__name"], "count": r["count"]} for r in rows]
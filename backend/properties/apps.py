@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PropertiesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "properties"
+
+    def ready(self):
+        # Search index, amenity, cache and watcher receivers: fail loudly
+        import properties.signals  # noqa: F401
@@ -0,0 +1,112 @@
+"""Facet counts for property listings.
+
+Counts are taken over the *base* result set: the listing scope plus the text
+search, before gender/sharing/overnight/price/type/amenity filters. Every
+filter button can then show how many results it would give ("Girls only
+(12)") without another request, and the counts don't change as the user
+toggles filters. That makes them cacheable per base set.
+
+``compute_facets`` gets all choice counts and the price histogram from one
+``aggregate()`` of conditional counts. Amenity counts are one extra grouped
+query (see ``properties.amenities``), skipped with ``amenities=False`` by
+callers that don't show them (the web listing's filter buttons).
+
+Cached counts are computed on the primary even when the listing itself is
+read from the replica (``backend.db_router``), so replica lag right after an
+invalidation isn't cached for ``FACET_TIMEOUT``.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db import router
+from django.db.models import Count, Q
+
+from .amenities import amenity_facets
+
+FACET_TIMEOUT = 300
+VERSION_KEY = "facets:version"
+
+# Upper bounds of the histogram buckets; the last bucket is open-ended.
+PRICE_BUCKETS = {
+    "price_per_month": (50, 100, 150, 200, 300, 500),
+    "nightly_price": (10, 20, 30, 50, 100),
+}
+
+
+def _choice_fields():
+    from .models import Property
+
+    return {
+        "gender": Property.GENDER,
+        "sharing": Property.SHARING,
+        "property_type": Property.PROPERTY_TYPE,
+    }
+
+
+def _price_ranges(price_field):
+    lower = 0
+    for upper in PRICE_BUCKETS.get(price_field, PRICE_BUCKETS["price_per_month"]):
+        yield lower, upper
+        lower = upper
+    yield lower, None
+
+
+def compute_facets(qs, price_field="price_per_month", amenities=True):
+    aggregates = {"total": Count("pk")}
+    choices = _choice_fields()
+    for field, options in choices.items():
+        for value, _label in options:
+            aggregates[f"{field}__{value}"] = Count("pk", filter=Q(**{field: value}))
+    aggregates["overnight"] = Count("pk", filter=Q(overnight=True))
+    ranges = list(_price_ranges(price_field))
+    for i, (lower, upper) in enumerate(ranges):
+        bucket = Q(**{f"{price_field}__gte": lower})
+        if upper is not None:
+            bucket &= Q(**{f"{price_field}__lt": upper})
+        aggregates[f"price__{i}"] = Count("pk", filter=bucket)
+
+    row = qs.order_by().aggregate(**aggregates)
+
+    facets = {"total": row["total"], "overnight": row["overnight"]}
+    for field, options in choices.items():
+        facets[field] = [
+            {"value": value, "label": label, "count": row[f"{field}__{value}"]} for value, label in options
+        ]
+    facets["price"] = {
+        "field": price_field,
+        "buckets": [
+            {"min": lower, "max": upper, "count": row[f"price__{i}"]} for i, (lower, upper) in enumerate(ranges)
+        ],
+    }
+    if amenities:
+        facets["amenities"] = amenity_facets(qs)
+    return facets
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 0
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def cached_facets(qs, price_field="price_per_month", amenities=True):
+    """``compute_facets`` cached per base queryset (keyed on its SQL)."""
+    sql = str(qs.order_by().query)
+    digest = hashlib.md5(f"{price_field}:{amenities}:{sql}".encode()).hexdigest()
+    key = f"facets:{_version()}:{digest}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(qs.using(router.db_for_write(qs.model)), price_field, amenities=amenities)
+        cache.set(key, facets, FACET_TIMEOUT)
+    return facets
+
+
+def invalidate():
+    """Listings changed; drop every cached facet set."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
@@ -0,0 +1,235 @@
+"""Declarative property list filters.
+
+Every listing (both API list views, the web listing pages and the WhatsApp
+tool) used to parse q/gender/sharing/price/type itself, each slightly
+differently. They now share ``PropertyFilterSpec``: a list of filter objects
+that compile request parameters into one queryset.
+
+    result = PropertyFilterSpec().compile(request.query_params, base_qs)
+    result.queryset        # filtered + select_related/prefetch applied
+    result.base_queryset   # scope + text search only (used for facets)
+    result.price_field     # "nightly_price" or "price_per_month"
+
+Conventions shared by all callers:
+
+- blank, ``all`` and ``any`` mean "no filter" for choice parameters
+- invalid numbers are ignored rather than raising
+- ``q`` goes through the full-text index; "2km" limits distance to campus and
+  a bare number ("$200") is a maximum price
+"""
+
+import re
+
+from django.db.models import Prefetch, Q
+
+from . import search_index
+from .amenities import filter_by_amenities
+
+MONTHLY_TYPES = ("long_term", "shop")
+IGNORED_CHOICES = ("", "all", "any")
+TRUE_VALUES = ("1", "true", "yes")
+FALSE_VALUES = ("0", "false", "no")
+
+_KM_RE = re.compile(r"(\d+(?:\.\d+)?)\s*km\b", re.IGNORECASE)
+_PRICE_RE = re.compile(r"\s*[\$£€]?\s*[\d,]+(?:\.\d+)?\s*")
+
+
+def _get(params, name):
+    value = params.get(name)
+    return value.strip() if isinstance(value, str) else value
+
+
+def _number(value, cast=float):
+    if value in (None, ""):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FilterResult:
+    def __init__(self, queryset, price_field, types):
+        self.queryset = queryset
+        self.base_queryset = queryset
+        self.price_field = price_field
+        self.types = types
+        self.search_text = ""
+
+
+class Filter:
+    """One filter. ``apply`` returns the narrowed queryset."""
+
+    def apply(self, qs, params, result):
+        raise NotImplementedError
+
+
+class SearchFilter(Filter):
+    def __init__(self, param="q"):
+        self.param = param
+
+    def apply(self, qs, params, result):
+        text = _get(params, self.param)
+        if not text:
+            return qs
+        km = _KM_RE.search(text)
+        if km:
+            qs = qs.filter(distance_to_campus_km__lte=float(km.group(1)))
+            text = _KM_RE.sub(" ", text).strip()
+        if text and _PRICE_RE.fullmatch(text):
+            price = _number(re.sub(r"[^0-9.]", "", text))
+            if price is not None:
+                qs = qs.filter(_price_q(result.price_field, "lte", price))
+                text = ""
+        result.search_text = text
+        return search_index.search(qs, text) if text else qs
+
+
+class ChoiceFilter(Filter):
+    def __init__(self, param, field=None, choices=None):
+        self.param = param
+        self.field = field or param
+        self.choices = {value for value, _label in choices} if choices else None
+
+    def apply(self, qs, params, result):
+        value = _get(params, self.param)
+        if value in IGNORED_CHOICES or value is None:
+            return qs
+        if self.choices is not None and value not in self.choices:
+            return qs.none()
+        return qs.filter(**{self.field: value})
+
+
+class BooleanFilter(Filter):
+    def __init__(self, param, field=None):
+        self.param = param
+        self.field = field or param
+
+    def apply(self, qs, params, result):
+        value = str(_get(params, self.param) or "").lower()
+        if value in TRUE_VALUES:
+            return qs.filter(**{self.field: True})
+        if value in FALSE_VALUES:
+            return qs.filter(**{self.field: False})
+        return qs
+
+
+class TypeFilter(Filter):
+    def apply(self, qs, params, result):
+        if result.types:
+            return qs.filter(property_type__in=result.types)
+        return qs
+
+
+class CityFilter(Filter):
+    def apply(self, qs, params, result):
+        city_id = _get(params, "city_id") or _get(params, "city")
+        if city_id:
+            city_id = _number(city_id, int)
+            return qs.filter(city_id=city_id) if city_id is not None else qs
+        city_name = _get(params, "city_name")
+        if city_name:
+            return qs.filter(city__name__iexact=city_name)
+        return qs
+
+
+class AmenitiesFilter(Filter):
+    def apply(self, qs, params, result):
+        value = _get(params, "amenities")
+        return filter_by_amenities(qs, value) if value else qs
+
+
+class RangeFilter(Filter):
+    """``min_param``/``max_param`` on ``field`` (default: the price field)."""
+
+    def __init__(self, min_param, max_param, field=None, cast=float):
+        self.min_param = min_param
+        self.max_param = max_param
+        self.field = field
+        self.cast = cast
+
+    def apply(self, qs, params, result):
+        field = self.field or result.price_field
+        low = _number(_get(params, self.min_param), self.cast) if self.min_param else None
+        high = _number(_get(params, self.max_param), self.cast) if self.max_param else None
+        if low is not None:
+            qs = qs.filter(_price_q(field, "gte", low))
+        if high is not None:
+            qs = qs.filter(_price_q(field, "lte", high))
+        return qs
+
+
+def _price_q(field, lookup, value):
+    # A tuple of fields means "any of them" (e.g. monthly or nightly price).
+    fields = field if isinstance(field, tuple) else (field,)
+    q = Q()
+    for name in fields:
+        q |= Q(**{f"{name}__{lookup}": value})
+    return q
+
+
+def optimize(qs):
+    """Join city/university and prefetch what list serializers/templates read."""
+    from .models import PropertyImage
+
+    return qs.select_related("city", "university").prefetch_related(
+        # Ordered so ``images.first`` is served from the prefetch cache.
+        Prefetch("images", queryset=PropertyImage.objects.order_by("pk")),
+        "reviews",
+    )
+
+
+class PropertyFilterSpec:
+    """Compile list parameters into a single queryset.
+
+    ``base_filters`` define the base set used for facet counts; ``filters``
+    narrow it further. ``price_field`` overrides the type-based default
+    (monthly for long-term/shop listings, nightly otherwise).
+    """
+
+    base_filters = (SearchFilter("q"),)
+
+    def __init__(self, price_field=None):
+        from .models import Property
+
+        self.price_field = price_field
+        self.filters = (
+            ChoiceFilter("gender", choices=Property.GENDER),
+            ChoiceFilter("sharing", choices=Property.SHARING),
+            BooleanFilter("overnight"),
+            TypeFilter(),
+            CityFilter(),
+            AmenitiesFilter(),
+            RangeFilter("min_price", "max_price"),
+            RangeFilter("guests", None, field="max_occupancy", cast=int),
+        )
+
+    @staticmethod
+    def parse_types(params):
+        many = _get(params, "property_types")
+        if many:
+            return [t.strip() for t in many.split(",") if t.strip()]
+        one = _get(params, "property_type")
+        return [one] if one else []
+
+    def resolve_price_field(self, types):
+        if self.price_field:
+            return self.price_field
+        return "price_per_month" if types and all(t in MONTHLY_TYPES for t in types) else "nightly_price"
+
+    def compile(self, params, queryset=None, optimized=True):
+        from .models import Property
+
+        if queryset is None:
+            queryset = Property.objects.filter(is_approved=True, is_available=True)
+        types = self.parse_types(params)
+        result = FilterResult(queryset, self.resolve_price_field(types), types)
+
+        qs = queryset
+        for f in self.base_filters:
+            qs = f.apply(qs, params, result)
+        result.base_queryset = qs
+        for f in self.filters:
+            qs = f.apply(qs, params, result)
+        result.queryset = optimize(qs) if optimized else qs
+        return result
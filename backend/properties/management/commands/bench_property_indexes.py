@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.synthetic import DatasetGenerator
+from properties.models import Property
+
+
+def listing_queries(university_id, city_id):
+    """The hot listing reads (see api.views / web.views), newest page only."""
+    listed = Property.objects.filter(is_approved=True, is_available=True)
+    students = listed.filter(university_id=university_id, property_type="students")
+    return [
+        ("university, newest", students.order_by("-created_at")[:20]),
+        ("university, recommended", students.order_by("-view_count", "-created_at")[:20]),
+        ("city short-term, newest", listed.filter(city_id=city_id, property_type="short_term").order_by("-created_at")[:20]),
+        ("long-term by price", listed.filter(property_type="long_term").order_by("price_per_month")[:20]),
+        ("short-term by price", listed.filter(property_type="short_term").order_by("-nightly_price")[:20]),
+        ("all listings, newest", listed.order_by("-created_at")[:20]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a throwaway dataset and compare listing query plans/timings "
+        "without and with the Property listing indexes. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100000)
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (median is reported).")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            university_id, city_id = self._generate(options["rows"], options["seed"])
+            queries = listing_queries(university_id, city_id)
+
+            indexes = Property._meta.indexes
+            self._set_indexes(indexes, present=False)
+            before = self._run(queries, options["repeat"], "Without listing indexes")
+            self._set_indexes(indexes, present=True)
+            after = self._run(queries, options["repeat"], "With listing indexes")
+
+            self.stdout.write("")
+            self.stdout.write(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+            for name, _qs in queries:
+                speedup = before[name] / after[name] if after[name] else float("inf")
+                self.stdout.write(f"{name:<28}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+            transaction.set_rollback(True)
+
+    def _generate(self, rows, seed):
+        self.stdout.write(f"Generating {rows} properties...")
+        gen = DatasetGenerator(seed=seed, batch_size=5000)
+        cities = gen.cities()
+        universities = gen.universities(cities, 60)
+        owner_ids = gen.users(max(1, rows // 50), role="landlord", prefix="landlord")
+        gen.properties(rows, owner_ids, universities, cities)
+        return universities[0].pk, cities[0][0].pk
+
+    def _set_indexes(self, indexes, present):
+        # Plain CREATE/DROP INDEX statements: the schema editor context can't
+        # be entered inside the SQLite transaction we roll back at the end.
+        editor = connection.schema_editor()
+        table = editor.quote_name(Property._meta.db_table)
+        with connection.cursor() as cursor:
+            for index in indexes:
+                if present:
+                    cursor.execute(str(index.create_sql(Property, editor)))
+                else:
+                    cursor.execute(editor.sql_delete_index % {"table": table, "name": editor.quote_name(index.name)})
+            cursor.execute("ANALYZE")
+
+    def _run(self, queries, repeat, heading):
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        timings = {}
+        for name, qs in queries:
+            self.stdout.write(f"  {name}")
+            for line in qs.explain().splitlines():
+                self.stdout.write(f"    {line}")
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(qs.all())
+                runs.append((time.perf_counter() - start) * 1000)
+            timings[name] = statistics.median(runs)
+            self.stdout.write(f"    median {timings[name]:.2f} ms")
+        return timings
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from properties import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the property full-text search index (after bulk updates or restores)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = search_index.get_backend()
+        count = search_index.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Indexed {count} properties ({type(backend).__name__})'))
@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# A frozen copy of the index as properties.search_index built it when this
+# migration was written, so later changes to that module don't change what
+# this migration does on a fresh database.
+TABLE = "property_search"
+FIELDS = ("title", "location", "amenities", "description", "city")
+PG_WEIGHTS = ("A", "B", "B", "C", "C")
+
+
+def _documents(apps, alias):
+    Property = apps.get_model("properties", "Property")
+    rows = Property.objects.using(alias).values("pk", "title", "location", "amenities", "description", "city__name")
+    for row in rows.order_by("pk").iterator(chunk_size=500):
+        yield [row["pk"]] + [
+            row[key] or "" for key in ("title", "location", "amenities", "description", "city__name")
+        ]
+
+
+def _sqlite_has_fts5(cursor):
+    cursor.execute("PRAGMA compile_options")
+    return any("FTS5" in row[0] for row in cursor.fetchall())
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite" and _sqlite_has_fts5(cursor):
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                f"{', '.join(FIELDS)}, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+            cursor.execute(f"DELETE FROM {TABLE}")
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+                list(_documents(apps, connection.alias)),
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+                "property_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document_gin ON {TABLE} USING GIN (document)")
+            cursor.execute(f"TRUNCATE {TABLE}")
+            vector = " || ".join(f"setweight(to_tsvector('simple', %s), '{w}')" for w in PG_WEIGHTS)
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (property_id, document) VALUES (%s, {vector})",
+                list(_documents(apps, connection.alias)),
+            )
+        # Other vendors search with icontains and need no table.
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_alter_shorttermlodge_url'),
+    ]
+
+    operations = [
+        # Vendor-specific (FTS5 on SQLite, tsvector + GIN on PostgreSQL), so
+        # the table lives outside the model state.
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:48
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the token weighting in properties.search_index when this
+# migration was written; the module may change, this must not.
+TOKEN_FIELD_WEIGHTS = (6, 4, 3, 2, 2)  # title, location, amenities, description, city
+MAX_TOKEN_LENGTH = 64
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _token_weights(document):
+    weights = {}
+    for text, weight in zip(document, TOKEN_FIELD_WEIGHTS):
+        for token in {t.lower() for t in TOKEN_RE.findall(text or "")}:
+            if 2 <= len(token) <= MAX_TOKEN_LENGTH:
+                weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+def populate_tokens(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Property = apps.get_model("properties", "Property")
+    PropertyToken = apps.get_model("properties", "PropertyToken")
+    rows = Property.objects.using(alias).values("pk", "title", "location", "amenities", "description", "city__name")
+    batch = []
+    for row in rows.order_by("pk").iterator(chunk_size=500):
+        document = [row[key] for key in ("title", "location", "amenities", "description", "city__name")]
+        batch.extend(
+            PropertyToken(property_id=row["pk"], token=token, weight=weight)
+            for token, weight in _token_weights(document).items()
+        )
+        if len(batch) >= 1000:
+            PropertyToken.objects.using(alias).bulk_create(batch)
+            batch = []
+    PropertyToken.objects.using(alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_property_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=0)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='properties.property')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'property'], name='property_token_lookup')],
+                'constraints': [models.UniqueConstraint(fields=('property', 'token'), name='uniq_property_token')],
+            },
+        ),
+        migrations.RunPython(populate_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:52
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of properties.amenities parsing when this migration was
+# written; the module may change, this must not.
+SPLIT_RE = re.compile(r"[,\n;]+")
+SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _parse(text):
+    parsed = {}
+    for part in SPLIT_RE.split(text or ""):
+        name = " ".join(part.split())[:80]
+        slug = SLUG_RE.sub("", name.lower())[:80]
+        if slug and slug not in parsed:
+            parsed[slug] = name
+    return parsed
+
+
+def parse_existing_amenities(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Property = apps.get_model("properties", "Property")
+    Amenity = apps.get_model("properties", "Amenity")
+    PropertyAmenity = apps.get_model("properties", "PropertyAmenity")
+
+    names, links = {}, []
+    for pk, text in Property.objects.using(alias).exclude(amenities="").values_list("pk", "amenities").iterator():
+        for slug, name in _parse(text).items():
+            names.setdefault(slug, name)  # first spelling wins
+            links.append((pk, slug))
+    Amenity.objects.using(alias).bulk_create([Amenity(slug=slug, name=name) for slug, name in names.items()])
+    ids = dict(Amenity.objects.using(alias).values_list("slug", "pk"))
+    PropertyAmenity.objects.using(alias).bulk_create(
+        [PropertyAmenity(property_id=pk, amenity_id=ids[slug]) for pk, slug in links], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_property_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=80)),
+                ('slug', models.SlugField(max_length=80, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertyAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='property_amenities', to='properties.amenity')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='property_amenities', to='properties.property')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='amenity_tags',
+            field=models.ManyToManyField(blank=True, related_name='properties', through='properties.PropertyAmenity', to='properties.amenity'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyamenity',
+            index=models.Index(fields=['amenity', 'property'], name='amenity_property_lookup'),
+        ),
+        migrations.AddConstraint(
+            model_name='propertyamenity',
+            constraint=models.UniqueConstraint(fields=('property', 'amenity'), name='uniq_property_amenity'),
+        ),
+        migrations.RunPython(parse_existing_amenities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_amenities'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['university', 'property_type', '-created_at'], name='prop_listed_uni_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['university', 'property_type', '-view_count', '-created_at'], name='prop_listed_uni_type_views'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['city', 'property_type', '-created_at'], name='prop_listed_city_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['property_type', '-created_at'], name='prop_listed_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['property_type', 'nightly_price'], name='prop_listed_type_nightly'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['property_type', 'price_per_month'], name='prop_listed_type_monthly'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_approved', True), ('is_available', True)), fields=['-created_at'], name='prop_listed_created'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_property_updated_at(apps, schema_editor):
+    # Existing listings were last touched no later than they were created as
+    # far as we know; "now" would make every row look freshly modified.
+    Property = apps.get_model("properties", "Property")
+    Property.objects.using(schema_editor.connection.alias).update(updated_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_property_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='university',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_property_updated_at, migrations.RunPython.noop),
+    ]
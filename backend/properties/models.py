@@ -28,6 +28,7 @@ class University(models.Model):
     # campus coordinates for distance calculations
     latitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
     longitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -40,6 +41,22 @@ class City(models.Model):
         return self.name
 
 
+class Amenity(models.Model):
+    """Normalized amenity (e.g. "WiFi"), matched by ``slug`` ("wi-fi" == "wifi")."""
+    name = models.CharField(max_length=80)
+    slug = models.SlugField(max_length=80, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+# Rows visible on public listings; the condition of the partial indexes below.
+LISTED = models.Q(is_approved=True, is_available=True)
+
+
 class Property(models.Model):
     PROPERTY_TYPE = (
         ("students", "Students Accommodation"),
@@ -72,6 +89,7 @@ class Property(models.Model):
     is_approved = models.BooleanField(default=False)
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Location (visible only after admin fee payment)
     location = models.CharField(max_length=255, blank=True, help_text="Street address or area name")
@@ -95,6 +113,8 @@ class Property(models.Model):
     
     # Amenities (comma-separated for simple search)
     amenities = models.TextField(blank=True, help_text="Comma-separated amenities (e.g., WiFi,Parking,Kitchen)")
+    # Parsed from ``amenities`` on save (see properties.amenities); use for filtering/facets.
+    amenity_tags = models.ManyToManyField(Amenity, through="PropertyAmenity", related_name="properties", blank=True)
     
     # Property-type specific fields
     # For students accommodation
@@ -113,10 +133,73 @@ class Property(models.Model):
     # For shops
     shop_category = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        # Public listings always filter approved+available, then scope by
+        # university/city/type and sort by newest, popularity or price.
+        # Partial indexes keep pending/hidden rows out of those indexes.
+        indexes = [
+            models.Index(
+                fields=["university", "property_type", "-created_at"],
+                name="prop_listed_uni_type_created", condition=LISTED,
+            ),
+            models.Index(
+                fields=["university", "property_type", "-view_count", "-created_at"],
+                name="prop_listed_uni_type_views", condition=LISTED,
+            ),
+            models.Index(
+                fields=["city", "property_type", "-created_at"],
+                name="prop_listed_city_type_created", condition=LISTED,
+            ),
+            models.Index(fields=["property_type", "-created_at"], name="prop_listed_type_created", condition=LISTED),
+            models.Index(fields=["property_type", "nightly_price"], name="prop_listed_type_nightly", condition=LISTED),
+            models.Index(fields=["property_type", "price_per_month"], name="prop_listed_type_monthly", condition=LISTED),
+            models.Index(fields=["-created_at"], name="prop_listed_created", condition=LISTED),
+        ]
+
     def __str__(self):
         return self.title
 
 
+class PropertyAmenity(models.Model):
+    property = models.ForeignKey(Property, related_name="property_amenities", on_delete=models.CASCADE)
+    amenity = models.ForeignKey(Amenity, related_name="property_amenities", on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["property", "amenity"], name="uniq_property_amenity"),
+        ]
+        indexes = [
+            models.Index(fields=["amenity", "property"], name="amenity_property_lookup"),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id}: {self.amenity_id}"
+
+
+class PropertyToken(models.Model):
+    """Inverted index of normalized search tokens per property.
+
+    ``weight`` is the sum of the field weights (title 6, location 4,
+    amenities 3, description/city 2) of every field the token appears in.
+    Maintained by ``properties.search_index``; used for relevance scoring and
+    "related" results via indexed joins instead of per-row LIKE scans.
+    """
+    property = models.ForeignKey(Property, related_name="search_tokens", on_delete=models.CASCADE)
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["property", "token"], name="uniq_property_token"),
+        ]
+        indexes = [
+            models.Index(fields=["token", "property"], name="property_token_lookup"),
+        ]
+
+    def __str__(self):
+        return f"{self.token} ({self.weight})"
+
+
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, related_name="images", on_delete=models.CASCADE)
     image = models.ImageField(upload_to="properties/")
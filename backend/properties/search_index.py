@@ -0,0 +1,426 @@
+"""Full-text search index for properties.
+
+Property search used to be a chain of ``icontains`` clauses over title,
+description, location, amenities and city name, i.e. a ``LIKE '%term%'``
+table scan per query. The text now lives in a separate ``property_search``
+index table that is kept in sync by signals (``properties.signals``):
+
+- SQLite: an FTS5 virtual table (rowid = property id), ranked with ``bm25()``
+- PostgreSQL: a ``tsvector`` column with a GIN index, ranked with
+  ``ts_rank_cd()``
+- anything else, or SQLite built without FTS5: the old ``icontains`` chain
+
+The backend is picked from ``connection.vendor``. Every query token is
+prefix-matched ("wif" finds "WiFi") and all tokens must match.
+
+Callers only need ``search()`` (filter) and ``rank()`` (an annotation to
+order by, higher is better). ``rebuild()`` repopulates the table, see the
+``rebuild_search_index`` command.
+
+Alongside the full-text table, every property's normalized tokens are stored
+in ``PropertyToken`` with per-field weights. ``score()`` and ``related()``
+use it for cheap weighted relevance (e.g. remembered session terms) and
+"matches any term" lookups with an indexed join. They prefix-match like the
+full-text search, so "wif" scores and relates listings mentioning "WiFi".
+"""
+
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = "property_search"
+
+# Per-column weights: title, location, amenities, description, city.
+FIELDS = ("title", "location", "amenities", "description", "city")
+BM25_WEIGHTS = (6.0, 4.0, 3.0, 2.0, 2.0)
+PG_WEIGHTS = ("A", "B", "B", "C", "C")
+
+# Field weights for PropertyToken, matching the old CASE/WHEN scoring.
+TOKEN_FIELD_WEIGHTS = (6, 4, 3, 2, 2)
+MAX_TOKEN_LENGTH = 64
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return [t.lower() for t in _TOKEN_RE.findall(text or "")]
+
+
+def _document(row):
+    """Index columns for one property (a dict of values or a model instance)."""
+    if not isinstance(row, dict):
+        row = {
+            "title": row.title,
+            "location": row.location,
+            "amenities": row.amenities,
+            "description": row.description,
+            "city__name": row.city.name if row.city_id else "",
+        }
+    return tuple(
+        row.get(key) or "" for key in ("title", "location", "amenities", "description", "city__name")
+    )
+
+
+def token_weights(document):
+    """``{token: weight}`` for one document tuple (see ``_document``)."""
+    weights = {}
+    for text, weight in zip(document, TOKEN_FIELD_WEIGHTS):
+        for token in set(tokenize(text)):
+            if len(token) < 2 or len(token) > MAX_TOKEN_LENGTH:
+                continue
+            weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+def _write_tokens(token_model, pk, document, using=None):
+    manager = token_model.objects.db_manager(using)
+    manager.filter(property_id=pk).delete()
+    manager.bulk_create(
+        [token_model(property_id=pk, token=t, weight=w) for t, w in token_weights(document).items()]
+    )
+
+
+def _token_model():
+    from .models import PropertyToken
+
+    return PropertyToken
+
+
+class BaseSearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    # Schema ---------------------------------------------------------------
+    def create(self):
+        pass
+
+    def drop(self):
+        pass
+
+    # Maintenance ----------------------------------------------------------
+    def upsert(self, pk, document):
+        pass
+
+    def insert_many(self, rows):
+        """``[(pk, document), ...]`` into a freshly cleared index."""
+        for pk, document in rows:
+            self.upsert(pk, document)
+
+    def delete(self, pks):
+        pass
+
+    def clear(self):
+        pass
+
+    # Querying -------------------------------------------------------------
+    def filter_q(self, tokens):
+        raise NotImplementedError
+
+    def rank_expression(self, tokens):
+        raise NotImplementedError
+
+
+class LikeBackend(BaseSearchBackend):
+    """No index: each token must appear somewhere (the old behaviour)."""
+
+    lookups = ("title", "description", "location", "amenities", "city__name")
+
+    def filter_q(self, tokens):
+        q = Q()
+        for token in tokens:
+            term_q = Q()
+            for field in self.lookups:
+                term_q |= Q(**{f"{field}__icontains": token})
+            q &= term_q
+        return q
+
+    def rank_expression(self, tokens):
+        return Value(0.0, output_field=FloatField())
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    def create(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                f"{', '.join(FIELDS)}, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+
+    def drop(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def upsert(self, pk, document):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [pk])
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+                [pk, *document],
+            )
+
+    def insert_many(self, rows):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, {', '.join(FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+                [[pk, *document] for pk, document in rows],
+            )
+
+    def delete(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(pks))})", pks
+            )
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+
+    @staticmethod
+    def match_expression(tokens):
+        # Quote every token so user input can't inject FTS5 syntax; "*" = prefix.
+        return " ".join('"%s"*' % t.replace('"', '""') for t in tokens)
+
+    def filter_q(self, tokens):
+        return Q(pk__in=RawSQL(f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [self.match_expression(tokens)]))
+
+    def rank_expression(self, tokens):
+        # bm25() is "lower is better"; negate so callers can always order by -rank.
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        return RawSQL(
+            f"SELECT -bm25({TABLE}, {weights}) FROM {TABLE} "
+            f"WHERE {TABLE} MATCH %s AND {TABLE}.rowid = properties_property.id",
+            [self.match_expression(tokens)],
+            output_field=FloatField(),
+        )
+
+
+class PostgresFTSBackend(BaseSearchBackend):
+    def create(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+                "property_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_document_gin ON {TABLE} USING GIN (document)")
+
+    def drop(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def upsert(self, pk, document):
+        vector = " || ".join(
+            f"setweight(to_tsvector('simple', %s), '{w}')" for w in PG_WEIGHTS
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {TABLE} (property_id, document) VALUES (%s, {vector}) "
+                "ON CONFLICT (property_id) DO UPDATE SET document = EXCLUDED.document",
+                [pk, *document],
+            )
+
+    def delete(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE property_id = ANY(%s)", [pks])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {TABLE}")
+
+    @staticmethod
+    def tsquery(tokens):
+        return " & ".join(f"{t}:*" for t in tokens)
+
+    def filter_q(self, tokens):
+        return Q(pk__in=RawSQL(
+            f"SELECT property_id FROM {TABLE} WHERE document @@ to_tsquery('simple', %s)",
+            [self.tsquery(tokens)],
+        ))
+
+    def rank_expression(self, tokens):
+        return RawSQL(
+            f"SELECT ts_rank_cd(document, to_tsquery('simple', %s)) FROM {TABLE} "
+            f"WHERE {TABLE}.property_id = properties_property.id",
+            [self.tsquery(tokens)],
+            output_field=FloatField(),
+        )
+
+
+_fts5_support = {}
+
+
+def _sqlite_has_fts5(connection):
+    if connection.alias not in _fts5_support:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            _fts5_support[connection.alias] = any("FTS5" in row[0] for row in cursor.fetchall())
+    return _fts5_support[connection.alias]
+
+
+def get_backend(connection=None):
+    if connection is None:
+        from .models import Property
+
+        connection = connections[router.db_for_write(Property)]
+    if connection.vendor == "sqlite" and _sqlite_has_fts5(connection):
+        return SQLiteFTSBackend(connection)
+    if connection.vendor == "postgresql":
+        return PostgresFTSBackend(connection)
+    return LikeBackend(connection)
+
+
+# Public API ---------------------------------------------------------------
+
+
+def match_q(text, using=None):
+    """``Q`` matching properties that contain every token in ``text``.
+
+    Combine several with ``|`` for "any of these phrases" searches.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return Q()
+    return get_backend(connections[using] if using else None).filter_q(tokens)
+
+
+def search(qs, text):
+    """Restrict ``qs`` to properties matching every token in ``text``."""
+    if not tokenize(text):
+        return qs
+    return qs.filter(match_q(text, using=qs.db))
+
+
+def rank(qs, text, name="search_rank"):
+    """Annotate ``qs`` with a relevance score (higher is better)."""
+    tokens = tokenize(text)
+    if not tokens:
+        return qs.annotate(**{name: Value(0.0, output_field=FloatField())})
+    return qs.annotate(**{name: get_backend(connections[qs.db]).rank_expression(tokens)})
+
+
+def search_ranked(qs, text, name="search_rank"):
+    """``search`` + ``rank``, ordered best match first then by popularity."""
+    qs = rank(search(qs, text), text, name=name)
+    return qs.order_by(F(name).desc(nulls_last=True), "-view_count", "-created_at")
+
+
+def _prefix_q(tokens, field="token"):
+    """``Q`` for ``field`` starting with any of ``tokens``.
+
+    Written as a range (``"wif" <= token < "wig"``) rather than ``LIKE``, so
+    the (token, property) index serves it on SQLite and PostgreSQL alike.
+    """
+    q = Q()
+    for token in tokens:
+        upper = token[:-1] + chr(ord(token[-1]) + 1)
+        q |= Q(**{f"{field}__gte": token, f"{field}__lt": upper})
+    return q
+
+
+def _terms_tokens(terms):
+    return sorted({t for term in terms for t in tokenize(term)})
+
+
+def score(qs, terms, name="relevance_score"):
+    """Annotate ``qs`` with the summed weight of tokens starting with a term token (0 if none).
+
+    One join against the token index instead of a CASE/LIKE per field and term.
+    """
+    from django.db.models import Sum
+    from django.db.models.functions import Coalesce
+
+    tokens = _terms_tokens(terms)
+    if not tokens:
+        return qs.annotate(**{name: Value(0)})
+    return qs.annotate(**{
+        name: Coalesce(Sum("search_tokens__weight", filter=_prefix_q(tokens, "search_tokens__token")), 0)
+    })
+
+
+def related(qs, terms):
+    """Properties in ``qs`` with a token starting with any term token, best first."""
+    tokens = _terms_tokens(terms)
+    if not tokens:
+        return qs.none()
+    matching = _token_model().objects.filter(_prefix_q(tokens)).values("property_id")
+    return score(qs.filter(pk__in=matching), terms).order_by("-relevance_score", "-view_count", "-created_at")
+
+
+def index_property(prop):
+    document = _document(prop)
+    get_backend().upsert(prop.pk, document)
+    _write_tokens(_token_model(), prop.pk, document)
+
+
+def remove_properties(pks):
+    get_backend().delete(pks)
+
+
+def rebuild(queryset=None, batch_size=500):
+    """Re-create and repopulate the index. Returns the number of rows indexed.
+
+    ``queryset`` defaults to all properties. Migrations 0011 and 0012 keep
+    frozen copies of this logic instead of calling it.
+    """
+    if queryset is None:
+        from .models import Property
+
+        queryset = Property.objects.all()
+    token_model = _token_model()
+    backend = get_backend(connections[queryset.db])
+    # One transaction: readers keep the old index until the new one is
+    # complete, and SQLite doesn't sync to disk after every row.
+    with transaction.atomic(using=queryset.db):
+        backend.create()
+        backend.clear()
+        token_model.objects.using(queryset.db).all().delete()
+        return _index_rows(backend, token_model, queryset, batch_size)
+
+
+def reindex(queryset, batch_size=500):
+    """Refresh the index rows of ``queryset`` only, in batches. Returns the count.
+
+    Used when a change outside the property (a city rename) alters many
+    documents at once: a few statements per batch instead of per row.
+    """
+    token_model = _token_model()
+    backend = get_backend(connections[queryset.db])
+    with transaction.atomic(using=queryset.db):
+        return _index_rows(backend, token_model, queryset, batch_size, replace=True)
+
+
+def _index_rows(backend, token_model, queryset, batch_size, replace=False):
+    count = 0
+    rows = queryset.values("pk", "title", "location", "amenities", "description", "city__name")
+    batch = []
+    for row in rows.order_by("pk").iterator(chunk_size=batch_size):
+        batch.append((row["pk"], _document(row)))
+        if len(batch) >= batch_size:
+            _write_batch(backend, token_model, batch, queryset.db, replace)
+            count += len(batch)
+            batch = []
+    if batch:
+        _write_batch(backend, token_model, batch, queryset.db, replace)
+        count += len(batch)
+    return count
+
+
+def _write_batch(backend, token_model, batch, using, replace=False):
+    if replace:
+        pks = [pk for pk, _document in batch]
+        backend.delete(pks)
+        token_model.objects.using(using).filter(property_id__in=pks).delete()
+    backend.insert_many(batch)
+    token_model.objects.using(using).bulk_create([
+        token_model(property_id=pk, token=token, weight=weight)
+        for pk, document in batch
+        for token, weight in token_weights(document).items()
+    ])
@@ -1,7 +1,44 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from properties.models import Property
-from core.models import Notification, UserUniversityPreference
+from properties import facets, search_index, suggest
+from properties.amenities import sync_property_amenities
+from properties.models import City, Property, University
+from core.models import UserUniversityPreference
+from core.notifications import notify, property_group_key
+
+
+# Fields whose changes receivers below care about: what the autocomplete
+# index is built from (names, plus the listing filter); city names are also
+# part of the full-text documents.
+TRACKED_FIELDS = {
+    University: ("name",),
+    City: ("name",),
+    Property: ("title", "is_approved", "is_available"),
+}
+
+
+@receiver(pre_save, sender=University)
+@receiver(pre_save, sender=City)
+@receiver(pre_save, sender=Property)
+def remember_tracked_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Read the stored values of ``TRACKED_FIELDS`` the save may change."""
+    instance._tracked_before = None
+    fields = [f for f in TRACKED_FIELDS[sender] if update_fields is None or f in update_fields]
+    if raw or instance.pk is None:
+        return
+    if not fields:
+        instance._tracked_before = {}
+        return
+    instance._tracked_before = sender._default_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+def _changed(instance, fields):
+    """Did the last save change any of ``fields``? True when unknown."""
+    before = getattr(instance, "_tracked_before", None)
+    if before is None:
+        return True
+    return any(getattr(instance, f) != before[f] for f in fields if f in before)
 
 
 @receiver(post_save, sender=Property)
@@ -9,35 +46,92 @@ def notify_property_watchers(sender, instance, created, **kwargs):
     """
     Notify users who have visited this university when a property is added or updated
     """
-    if not instance.university:
+    if not instance.university_id:
         return
-    
+
     # Only notify if property is approved
     if not instance.is_approved:
         return
-    
-    # Get all users who have visited this university
-    preferences = UserUniversityPreference.objects.filter(
-        university=instance.university,
-        user__isnull=False
-    ).select_related('user').distinct()
-    
-    # Create notifications
-    for pref in preferences:
-        # Skip the property owner
-        if pref.user == instance.owner:
-            continue
-            
-        if created:
-            title = f"New accommodation at {instance.university.name}"
-            message = f"A new property '{instance.title}' has been added at {instance.university.name}. Check it out!"
-        else:
-            title = f"Accommodation updated at {instance.university.name}"
-            message = f"'{instance.title}' at {instance.university.name} has been updated."
-        
-        Notification.objects.create(
-            recipient=pref.user,
-            title=title,
-            message=message,
-            link=f"/property/{instance.id}/"
+
+    university_name = instance.university.name
+    if created:
+        title = f"New accommodation at {university_name}"
+        message = f"A new property '{instance.title}' has been added at {university_name}. Check it out!"
+    else:
+        title = f"Accommodation updated at {university_name}"
+        message = f"'{instance.title}' at {university_name} has been updated."
+
+    # Users who have visited this university (one query, resolved after commit)
+    watcher_ids = (
+        UserUniversityPreference.objects.filter(
+            university_id=instance.university_id,
+            user__isnull=False,
         )
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+
+    # Skip the property owner; fan out after commit, once the response is sent.
+    # Repeated saves within the coalescing window refresh the same unread row.
+    notify(
+        watcher_ids,
+        title,
+        message,
+        link=f"/property/{instance.id}/",
+        exclude=[instance.owner_id],
+        defer=True,
+        group_key=property_group_key(instance.id),
+    )
+
+
+@receiver(post_save, sender=Property)
+def index_property(sender, instance, raw=False, **kwargs):
+    """Keep the full-text search row in step with the property."""
+    if raw:
+        return
+    search_index.index_property(instance)
+
+
+@receiver(post_save, sender=Property)
+def sync_amenities(sender, instance, raw=False, **kwargs):
+    """Parse the free-text amenities into Amenity links."""
+    if raw:
+        return
+    sync_property_amenities(instance)
+
+
+@receiver(post_delete, sender=Property)
+def unindex_property(sender, instance, **kwargs):
+    search_index.remove_properties([instance.pk])
+
+
+@receiver(post_save, sender=City)
+def reindex_city_properties(sender, instance, created, raw=False, **kwargs):
+    # City name is part of the indexed text; refresh its listings in batches
+    # once the rename has committed.
+    if created or raw or not _changed(instance, ("name",)):
+        return
+    city_id = instance.pk
+    transaction.on_commit(lambda: search_index.reindex(Property.objects.filter(city_id=city_id)))
+
+
+@receiver(post_save, sender=University)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Property)
+def invalidate_suggestions(sender, instance, created, raw=False, **kwargs):
+    """Names changed; rebuild the autocomplete index on next lookup."""
+    if raw or created or _changed(instance, TRACKED_FIELDS[sender]):
+        suggest.invalidate()
+
+
+@receiver(post_delete, sender=University)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Property)
+def invalidate_suggestions_on_delete(sender, **kwargs):
+    suggest.invalidate()
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_facets(sender, **kwargs):
+    facets.invalidate()
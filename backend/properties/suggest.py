@@ -0,0 +1,196 @@
+"""In-memory autocomplete over university, city and listing names.
+
+Freehand names ("univ of zim", "chinoyi") used to go through ``icontains``
+or a slugify-every-row scan. ``SuggestIndex`` loads the names once and
+answers from memory:
+
+- a word trie for prefix matches ("midl" -> "Midlands State University")
+- a trigram index for typos, ranked by trigram similarity
+
+The process-wide index (``get_index()``) is rebuilt lazily: saves that change
+an indexed name (or a listing's visibility) on University, City or Property
+bump a version number in the cache, and the next lookup reloads if its
+version is stale. Other edits (prices, descriptions) leave it alone. With a shared cache backend that
+also covers other workers; with the default local-memory cache each process
+only sees its own changes, so a worker may suggest from stale names. Nothing
+that must be exact (URL slugs, ids) is resolved from the index.
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from django.core.cache import cache
+from django.utils.text import slugify
+
+VERSION_KEY = "suggest:index-version"
+KINDS = ("university", "city", "property")
+# Ties between equally good matches favour the broader entity.
+KIND_PRIORITY = {"university": 0, "city": 1, "property": 2}
+MIN_SIMILARITY = 0.3
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_TERMINAL = "\0"
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def trigrams(text):
+    grams = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SuggestIndex:
+    def __init__(self, entries=()):
+        self.entries = []
+        self._trie = {}
+        self._trigrams = {}
+        self._gram_counts = []
+        self._normalized = []
+        self._prefix_cache = {}
+        for entry in entries:
+            self.add(**entry)
+
+    def add(self, kind, id, label, url=None):
+        idx = len(self.entries)
+        self.entries.append({"type": kind, "id": id, "label": label, "url": url})
+        self._normalized.append(normalize(label))
+        self._prefix_cache.clear()
+        words = self._normalized[idx].split()
+        for word in words:
+            node = self._trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node.setdefault(_TERMINAL, []).append(idx)
+        grams = trigrams(label)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._trigrams.setdefault(gram, []).append(idx)
+
+    def _prefix(self, word):
+        # Short prefixes fan out over most of the trie; remember them.
+        if len(word) <= 2:
+            if word not in self._prefix_cache:
+                self._prefix_cache[word] = frozenset(self._walk(word))
+            return self._prefix_cache[word]
+        return self._walk(word)
+
+    def _walk(self, word):
+        node = self._trie
+        for ch in word:
+            node = node.get(ch)
+            if node is None:
+                return set()
+        found, stack = set(), [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == _TERMINAL:
+                    found.update(child)
+                else:
+                    stack.append(child)
+        return found
+
+    def _fuzzy(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return {}
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._trigrams.get(gram, ()))
+        scores = {}
+        for idx, shared in overlap.items():
+            similarity = shared / (len(grams) + self._gram_counts[idx] - shared)
+            if similarity >= MIN_SIMILARITY:
+                scores[idx] = similarity
+        return scores
+
+    def search(self, query, kinds=None, limit=10):
+        """Best matches for ``query``: prefix hits first, then typo matches."""
+        words = normalize(query).split()
+        if not words:
+            return []
+        kinds = set(kinds or KINDS)
+
+        # Every query word must prefix some word of the label.
+        prefix_hits = None
+        for word in words:
+            hits = self._prefix(word)
+            prefix_hits = hits if prefix_hits is None else prefix_hits & hits
+        fuzzy = self._fuzzy(query)
+
+        phrase = " ".join(words)
+        ranked = []
+        for idx in set(prefix_hits).union(fuzzy):
+            entry = self.entries[idx]
+            if entry["type"] not in kinds:
+                continue
+            if idx in prefix_hits:
+                # Whole-label prefix ("univ" on "University of ...") beats word prefix.
+                score = 2.0 if self._normalized[idx].startswith(phrase) else 1.5
+                score += fuzzy.get(idx, 0)
+            else:
+                score = fuzzy[idx]
+            ranked.append((-score, KIND_PRIORITY[entry["type"]], entry["label"], idx))
+        best = heapq.nsmallest(limit, ranked)
+        return [dict(self.entries[idx], score=round(-neg, 3)) for neg, _k, _l, idx in best]
+
+
+def build_index():
+    from .models import City, Property, University
+
+    index = SuggestIndex()
+    for pk, name in University.objects.order_by("name").values_list("pk", "name"):
+        index.add("university", pk, name, url=f"/students-accommodation/{slugify(name)}/")
+    for pk, name in City.objects.order_by("name").values_list("pk", "name"):
+        index.add("city", pk, name)
+    listings = Property.objects.filter(is_approved=True, is_available=True).values_list("pk", "title")
+    for pk, title in listings.order_by("-created_at"):
+        index.add("property", pk, title, url=f"/property/{pk}/")
+    return index
+
+
+_lock = threading.Lock()
+# (version, index) swapped as one value, so readers never see a half update.
+_state = {"built": (None, None)}
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 0
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def get_index():
+    version = _current_version()
+    built_for, index = _state["built"]
+    if index is None or built_for != version:
+        with _lock:
+            built_for, index = _state["built"]
+            if index is None or built_for != version:
+                index = build_index()
+                _state["built"] = (version, index)
+    return index
+
+
+def invalidate():
+    """Mark the index stale; it is rebuilt on the next lookup."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def suggest(query, kinds=None, limit=10):
+    return get_index().search(query, kinds=kinds, limit=limit)
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from properties.models import Property, Service, University
+from web import sitemaps
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_sitemaps(sender, **kwargs):
+    sitemaps.invalidate()
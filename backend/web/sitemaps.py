@@ -1,9 +1,45 @@
+"""Sitemaps, served as an index plus one (paginated) sitemap per section.
+
+``/sitemap.xml`` is a sitemap index listing ``/sitemap-<section>.xml``
+pages; sections longer than ``SITEMAP_PAGE_SIZE`` URLs are split with
+``?p=2``, ``?p=3``... Each page is a couple of queries: the paginator's
+COUNT and one SELECT with the university joined in (``select_related`` +
+``only()``). University slugs are slugified once per name, not per row. The
+index takes each section's ``lastmod`` from a ``MAX(updated_at)`` instead of
+loading every row.
+
+Rendered XML is cached per URL until a Property, University or Service is
+saved or deleted (``web.signals`` bumps the version key), so crawlers
+re-fetching the sitemap never touch the database. Pages are read from the
+replica (``backend.db_router``). A page read there within
+``REPLICA_PIN_SECONDS`` of a change is served but not cached, since the
+replica may not have the change yet.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
 from django.urls import reverse
 from django.utils.text import slugify
 
+from backend.db_router import reading_from_replica, replica_read
 from properties.models import Property, Service, University
 
+SITEMAP_PAGE_SIZE = 5000
+SITEMAP_TIMEOUT = 24 * 3600
+VERSION_KEY = "sitemap:version"
+CHANGED_AT_KEY = "sitemap:changed_at"
+
+# Response headers kept with the cached body.
+_CACHED_HEADERS = ("Content-Type", "Last-Modified", "X-Robots-Tag")
+
 
 class StaticViewSitemap(Sitemap):
     changefreq = "daily"
@@ -17,7 +53,7 @@ class StaticViewSitemap(Sitemap):
             "students-accommodation-universities",
             "longterm-cities",
             "longterm-properties",
-            "shortterm-cities",
+            "shortterm-lodges",
             "shortterm-properties",
             "realestate-cities",
             "realestate-properties",
@@ -31,22 +67,45 @@ class StaticViewSitemap(Sitemap):
         return reverse(item)
 
 
-class PropertySitemap(Sitemap):
+class _UpdatedAtSitemap(Sitemap):
+    """``lastmod`` from ``updated_at``; the latest one comes from the database."""
+
+    limit = SITEMAP_PAGE_SIZE
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+    def get_latest_lastmod(self):
+        return self.items().aggregate(latest=Max("updated_at"))["latest"]
+
+
+class PropertySitemap(_UpdatedAtSitemap):
     changefreq = "daily"
     priority = 0.9
 
+    def __init__(self):
+        self._university_slugs = {}
+
     def items(self):
-        return Property.objects.filter(is_approved=True, is_available=True).order_by("-created_at")
+        return (
+            Property.objects.filter(is_approved=True, is_available=True)
+            .select_related("university")
+            .only("title", "property_type", "updated_at", "university", "university__name")
+            .order_by("-created_at", "-pk")
+        )
 
-    def lastmod(self, obj):
-        return obj.created_at
+    def _university_slug(self, university):
+        slug = self._university_slugs.get(university.pk)
+        if slug is None:
+            slug = self._university_slugs[university.pk] = slugify(university.name)
+        return slug
 
     def location(self, obj):
-        if getattr(obj, 'property_type', None) == 'students' and getattr(obj, 'university_id', None):
+        if obj.property_type == "students" and obj.university_id:
             return reverse(
                 "students-accommodation-detail",
                 kwargs={
-                    "university_slug": slugify(obj.university.name),
+                    "university_slug": self._university_slug(obj.university),
                     "property_slug": slugify(obj.title),
                 },
             )
@@ -58,18 +117,18 @@ class ServiceSitemap(Sitemap):
     priority = 0.8
 
     def items(self):
-        return Service.objects.filter(is_active=True).order_by("order", "name")
+        return Service.objects.filter(is_active=True).only("slug").order_by("order", "name")
 
     def location(self, obj):
         return reverse("service-entry", args=[obj.slug])
 
 
-class UniversitySitemap(Sitemap):
+class UniversitySitemap(_UpdatedAtSitemap):
     changefreq = "weekly"
     priority = 0.6
 
     def items(self):
-        return University.objects.all().order_by("name")
+        return University.objects.only("name", "updated_at").order_by("name")
 
     def location(self, obj):
         return reverse(
@@ -84,3 +143,58 @@ sitemaps = {
     "universities": UniversitySitemap,
     "properties": PropertySitemap,
 }
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 0
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate():
+    """Listings changed; drop every cached sitemap page."""
+    cache.set(CHANGED_AT_KEY, time.time(), None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def _cached(view):
+    """Serve ``view``'s rendered XML from the cache, keyed on the full URL."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"sitemap:{_version()}:{url}"
+        hit = cache.get(key)
+        if hit is not None:
+            content, headers = hit
+            return HttpResponse(content, headers=headers)
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if hasattr(response, "render"):
+            response.render()
+        if reading_from_replica() and time.time() - cache.get(CHANGED_AT_KEY, 0) < settings.REPLICA_PIN_SECONDS:
+            # The replica may not have the change yet; don't cache what it says.
+            return response
+        headers = {name: response[name] for name in _CACHED_HEADERS if response.has_header(name)}
+        cache.set(key, (response.content, headers), SITEMAP_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+@replica_read
+@_cached
+def sitemap_index(request):
+    return sitemap_views.index(request, sitemaps, sitemap_url_name="django-sitemap-section")
+
+
+@replica_read
+@_cached
+def sitemap_section(request, section):
+    return sitemap_views.sitemap(request, sitemaps, section=section)
@@ -45,3 +45,47 @@ class WebAuthTests(TestCase):
         resp3 = self.client.get(reverse('students-accommodation-universities'))
         self.assertEqual(resp3.status_code, 200)
         self.assertIn(f"/students-accommodation/{uni.name.lower()}/", resp3.content.decode())
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from properties.models import Property, University
+
+        cache.clear()
+        owner = User.objects.create_user(email='owner@example.com', password='pass12345', full_name='O', username='owner')
+        self.unis = [University.objects.create(name=f'Uni {i}') for i in range(3)]
+        for i in range(12):
+            Property.objects.create(
+                title=f'Room {i}', owner=owner, university=self.unis[i % 3],
+                property_type='students', is_approved=True,
+            )
+
+    def test_index_lists_section_pages(self):
+        resp = self.client.get('/sitemap.xml')
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        self.assertIn('/sitemap-properties.xml', body)
+        self.assertIn('/sitemap-universities.xml', body)
+        self.assertIn('<lastmod>', body)
+
+    def test_property_section_is_constant_queries_and_cached(self):
+        # paginator COUNT + one joined SELECT, however many rows
+        with self.assertNumQueries(2):
+            resp = self.client.get('/sitemap-properties.xml')
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        self.assertEqual(body.count('<url>'), 12)
+        self.assertIn('/students-accommodation/uni-1/room-1/', body)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/sitemap-properties.xml')
+        self.assertEqual(cached.content, resp.content)
+        self.assertEqual(cached['Content-Type'], resp['Content-Type'])
+
+    def test_cache_dropped_when_listing_changes(self):
+        self.client.get('/sitemap-universities.xml')
+        self.unis[0].name = 'Renamed Uni'
+        self.unis[0].save()
+        body = self.client.get('/sitemap-universities.xml').content.decode()
+        self.assertIn('/students-accommodation/renamed-uni/', body)
@@ -30,6 +30,7 @@ urlpatterns = [
     path("property/<int:pk>/reviews/delete/", views.property_review_delete, name="web-property-review-delete"),
     path("property/<int:pk>/contact/", views.property_contact, name="property-contact"),
     path("dashboard/payment-confirmations/", views.payment_confirmations, name="dashboard-payment-confirmations"),
+    path("dashboard/kpis/", views.kpi_dashboard, name="dashboard-kpis"),
     path("dashboard/my-properties/", views.my_properties, name="dashboard-my-properties"),
     path("dashboard/properties/add/", views.add_property, name="dashboard-add-property"),
     path("dashboard/properties/<int:pk>/edit/", views.edit_property, name="dashboard-edit-property"),
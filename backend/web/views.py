@@ -1,89 +1,27 @@
-from core.models_feedback import Feedback
-from collections import Counter
+from backend.db_router import replica_read
+from core import feedback_analytics as analytics
 import json
 
 
 # Feedback analytics page
 def feedback_analytics(request):
-    feedbacks = Feedback.objects.all()
-
-    # Rating distributions (1-5 scale)
-    easy_to_use = Counter(fb.easy_to_use for fb in feedbacks if fb.easy_to_use)
-    user_friendly = Counter(fb.user_friendly for fb in feedbacks if fb.user_friendly)
-    quick_response = Counter(fb.quick_response for fb in feedbacks if fb.quick_response)
-    easy_search = Counter(fb.easy_search for fb in feedbacks if fb.easy_search)
-
-    # Legacy ratings (for backward compatibility)
-    satisfaction = Counter(fb.satisfaction for fb in feedbacks if fb.satisfaction)
-    recommend = Counter(fb.recommend for fb in feedbacks if fb.recommend)
-
-    # Demographic data
-    age_dist = Counter(fb.age for fb in feedbacks if fb.age)
-    gender_dist = Counter(fb.gender for fb in feedbacks if fb.gender)
-    occupation_dist = Counter(fb.occupation for fb in feedbacks if fb.occupation)
-    city_dist = Counter(fb.city for fb in feedbacks if fb.city)
-
-    # Usage data
-    internet_dist = Counter(fb.has_internet for fb in feedbacks if fb.has_internet)
-    search_freq_dist = Counter(
-        fb.online_search_freq for fb in feedbacks if fb.online_search_freq
-    )
-    current_methods_dist = Counter(
-        fb.current_methods_rating for fb in feedbacks if fb.current_methods_rating
-    )
-
-    # Challenges (split comma-separated values)
-    challenges_counter = Counter()
-    for fb in feedbacks:
-        if fb.challenges:
-            for challenge in fb.challenges.split(","):
-                challenges_counter[challenge.strip()] += 1
-
-    # Text feedback (top 10)
-    like_most = Counter(
-        fb.like_most.strip()
-        for fb in feedbacks
-        if fb.like_most and fb.like_most.strip()
-    )
-    challenges_exp = Counter(
-        fb.challenges_exp.strip()
-        for fb in feedbacks
-        if fb.challenges_exp and fb.challenges_exp.strip()
-    )
-    improvements = Counter(
-        fb.improvements.strip()
-        for fb in feedbacks
-        if fb.improvements and fb.improvements.strip()
-    )
-
-    # Prepare data for template
+    data = analytics.rollup()
     context = {
-        # Rating charts
-        "easy_to_use_data": json.dumps(dict(sorted(easy_to_use.items()))),
-        "user_friendly_data": json.dumps(dict(sorted(user_friendly.items()))),
-        "quick_response_data": json.dumps(dict(sorted(quick_response.items()))),
-        "easy_search_data": json.dumps(dict(sorted(easy_search.items()))),
-        "satisfaction_data": json.dumps(dict(sorted(satisfaction.items()))),
-        "recommend_data": json.dumps(dict(sorted(recommend.items()))),
-        # Demographic charts
-        "age_data": json.dumps(dict(sorted(age_dist.items()))),
-        "gender_data": json.dumps(dict(sorted(gender_dist.items()))),
-        "occupation_data": json.dumps(dict(sorted(occupation_dist.items()))),
-        "city_data": json.dumps(dict(sorted(city_dist.items()))),
-        # Usage charts
-        "internet_data": json.dumps(dict(sorted(internet_dist.items()))),
-        "search_freq_data": json.dumps(dict(sorted(search_freq_dist.items()))),
-        "current_methods_data": json.dumps(dict(sorted(current_methods_dist.items()))),
-        # Challenges
-        "challenges_data": json.dumps(dict(sorted(challenges_counter.items()))),
-        # Text feedback tables
-        "like_most_data": json.dumps(dict(like_most.most_common(10))),
-        "challenges_exp_data": json.dumps(dict(challenges_exp.most_common(10))),
-        "improvements_data": json.dumps(dict(improvements.most_common(10))),
-        # Summary stats
-        "total_feedbacks": feedbacks.count(),
-        "feedbacks_with_ratings": feedbacks.filter(easy_to_use__isnull=False).count(),
+        f"{name}_data": json.dumps(dict(sorted(data["charts"][field].items())))
+        for name, field in analytics.CHART_FIELDS.items()
     }
+    context.update(
+        {
+            # Lists of (label, count) for the tables
+            "challenges_list": sorted(data["challenges"].items()),
+            "like_most_list": list(data["answers"]["like_most"].items()),
+            "challenges_exp_list": list(data["answers"]["challenges_exp"].items()),
+            "improvements_list": list(data["answers"]["improvements"].items()),
+            # Summary stats
+            "total_feedbacks": data["total"],
+            "feedbacks_with_ratings": data["with_ratings"],
+        }
+    )
     return render(request, "web/feedback_analytics.html", context)
 
 
@@ -91,13 +29,14 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm, PasswordResetForm
 from payments.models import PaymentConfirmation
-from core.models import Notification
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.core.paginator import Paginator
 from django.db import models
 from django.urls import reverse
 from django.http import HttpResponseRedirect
+from properties import search_index
+from properties.filters import PropertyFilterSpec
 from properties.models import Property, PropertyImage, University, City
 from django.http import Http404
 from django.utils.text import slugify
@@ -118,41 +57,93 @@ def admin_required(view_func):
 
 @admin_required
 def payment_confirmations(request):
-    # Handle AJAX approve/decline
-    if (
-        request.method == "POST"
-        and request.headers.get("x-requested-with") == "XMLHttpRequest"
-    ):
-        action = request.POST.get("action")
-        pk = request.POST.get("pk")
-        confirmation = get_object_or_404(PaymentConfirmation, pk=pk)
-        if action == "approve":
-            confirmation.status = "approved"
-            confirmation.save()
-            confirmation.payment.activate()
-            Notification.objects.create(
-                recipient=confirmation.payment.user,
-                title="Payment confirmed",
-                message=f"Your payment for {confirmation.payment.university.name} has been approved.",
-            )
-            return JsonResponse({"status": "approved", "pk": pk})
-        elif action == "decline":
-            confirmation.status = "declined"
-            confirmation.save()
-            Notification.objects.create(
-                recipient=confirmation.payment.user,
-                title="Payment declined",
-                message=f"Your payment for {confirmation.payment.university.name} has been declined.",
-            )
-            return JsonResponse({"status": "declined", "pk": pk})
-        return JsonResponse({"error": "unknown action"}, status=400)
+    from payments.review import ACTIONS, review_confirmations
 
-    # Regular page with pagination
-    qs = PaymentConfirmation.objects.filter(status="pending").order_by("submitted_at")
+    # Approve/decline one (AJAX buttons) or many (checkbox form) at once.
+    if request.method == "POST":
+        action = request.POST.get("action")
+        pks = [pk for pk in request.POST.getlist("pk") if pk.isdigit()]
+        is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
+        if action not in ACTIONS:
+            if is_ajax:
+                return JsonResponse({"error": "unknown action"}, status=400)
+            messages.error(request, "Choose approve or decline.")
+            return redirect(request.get_full_path())
+        if is_ajax and len(pks) == 1:
+            get_object_or_404(PaymentConfirmation, pk=pks[0])
+        changed = review_confirmations(pks, action)
+        if is_ajax:
+            return JsonResponse({"status": ACTIONS[action], "pk": ",".join(pks), "changed": changed})
+        messages.success(request, f"{len(changed)} confirmation{'s' if len(changed) != 1 else ''} {ACTIONS[action]}.")
+        return redirect(request.get_full_path())
+
+    # Regular page with pagination, optionally one match bucket (payments.ecocash)
+    qs = (
+        PaymentConfirmation.objects.filter(status="pending")
+        .select_related("payment__user", "payment__university")
+        .order_by("submitted_at")
+    )
+    buckets = dict(PaymentConfirmation.MATCH)
+    bucket = request.GET.get("bucket")
+    if bucket in buckets:
+        qs = qs.filter(match_status=bucket)
     paginator = Paginator(qs, 10)
     page = request.GET.get("page", 1)
     page_obj = paginator.get_page(page)
-    return render(request, "web/payment_confirmations.html", {"page_obj": page_obj})
+    return render(
+        request,
+        "web/payment_confirmations.html",
+        {"page_obj": page_obj, "buckets": buckets, "bucket": bucket if bucket in buckets else ""},
+    )
+
+
+@admin_required
+def kpi_dashboard(request):
+    """Platform KPIs from the daily rollups (``core.kpis``); never reads the source tables."""
+    from datetime import timedelta
+
+    from django.db.models import Max, Sum
+    from django.utils import timezone
+
+    from core.models_analytics import ListingDailyStats, RollupWatermark, UniversityDailyStats
+
+    days = request.GET.get("days", "30")
+    days = min(max(int(days), 1), 365) if days.isdigit() else 30
+    since = timezone.localdate() - timedelta(days=days - 1)
+    listing = ListingDailyStats.objects.filter(date__gte=since)
+    universities = UniversityDailyStats.objects.filter(date__gte=since)
+    listing_sums = {"views": Sum("views"), "unlocks": Sum("unlocks"), "new_listings": Sum("new_listings")}
+    university_sums = {"visitors": Sum("visitors"), "payments": Sum("payments"), "payment_amount": Sum("payment_amount")}
+    empty = {"views": 0, "unlocks": 0, "new_listings": 0, "visitors": 0, "payments": 0, "payment_amount": 0}
+
+    daily = {}
+    for row in listing.values("date").annotate(**listing_sums).order_by():
+        daily.setdefault(row["date"], dict(empty)).update(row)
+    for row in universities.values("date").annotate(**university_sums).order_by():
+        daily.setdefault(row["date"], dict(empty)).update(row)
+
+    by_university = {}
+    per_university = listing.filter(university__isnull=False).values("university_id", "university__name")
+    for row in per_university.annotate(**listing_sums).order_by():
+        by_university.setdefault(row["university_id"], dict(empty)).update(row)
+    for row in universities.values("university_id", "university__name").annotate(**university_sums).order_by():
+        by_university.setdefault(row["university_id"], dict(empty)).update(row)
+    for row in by_university.values():
+        # Unlocks per payment (each payment allows a few) and visitors who paid.
+        row["unlocks_per_payment"] = row["unlocks"] / row["payments"] if row["payments"] else None
+        row["payment_rate"] = 100 * row["payments"] / row["visitors"] if row["visitors"] else None
+
+    return render(
+        request,
+        "web/kpi_dashboard.html",
+        {
+            "days": days,
+            "daily": [daily[day] for day in sorted(daily, reverse=True)],
+            "by_university": sorted(by_university.values(), key=lambda row: (-row["unlocks"], row["university__name"])),
+            "by_type": listing.values("property_type").annotate(**listing_sums).order_by("-views"),
+            "last_run": RollupWatermark.objects.aggregate(last=Max("updated_at"))["last"],
+        },
+    )
 
 
 # Public site views
@@ -601,14 +592,15 @@ def _get_university_by_slug_or_404(university_slug: str) -> University:
         if qs.count() == 1:
             return qs.first()
 
-    # Fallback: compare slugified names.
-    for uni in University.objects.all():
-        if slugify(uni.name) == university_slug:
-            return uni
+    # Fallback: compare slugified names, reading only pk and name.
+    for pk, name in University.objects.values_list("pk", "name"):
+        if slugify(name) == university_slug:
+            return University.objects.get(pk=pk)
 
     raise Http404("University not found")
 
 
+@replica_read
 def university_properties_by_slug(request, university_slug):
     uni = _get_university_by_slug_or_404(university_slug)
     return university_properties(request, pk=uni.pk, service_slug=None)
@@ -642,6 +634,7 @@ def redirect_students_university_properties(request, pk):
     )
 
 
+@replica_read
 def university_properties(request, pk, service_slug=None):
     from properties.models import Property, University
 
@@ -656,75 +649,25 @@ def university_properties(request, pk, service_slug=None):
 
     # Determine which price field applies based on whether the user is browsing overnight listings.
     price_field = "nightly_price" if overnight == "1" else "price_per_month"
-
-    # Enhanced search:
-    # - Matches text across title/description/location/city/amenities
-    # - If q is a number (e.g. "200"), treat as max price
-    # - If q contains "X km" (e.g. "2km"), treat as max distance_to_campus_km
-    if q:
-        import re
-        from django.db.models import Q
-
-        q_raw = str(q).strip()
-        q_work = q_raw
-
-        campus_km_val = None
-        km_match = re.search(r"(\d+(?:\.\d+)?)\s*km\b", q_work, flags=re.IGNORECASE)
-        if km_match:
-            try:
-                campus_km_val = float(km_match.group(1))
-            except ValueError:
-                campus_km_val = None
-            q_work = re.sub(
-                r"(\d+(?:\.\d+)?)\s*km\b", " ", q_work, flags=re.IGNORECASE
-            ).strip()
-
-        price_val = None
-        if re.fullmatch(r"\s*[\$£€]?\s*[\d,]+(?:\.\d+)?\s*", q_work):
-            try:
-                price_val = float(re.sub(r"[^0-9.]", "", q_work))
-                q_work = ""
-            except ValueError:
-                price_val = None
-
-        if campus_km_val is not None:
-            qs = qs.filter(distance_to_campus_km__lte=campus_km_val)
-        if price_val is not None:
-            qs = qs.filter(**{f"{price_field}__lte": price_val})
-
-        q_text = q_work.strip()
-        if q_text:
-            # Support simple comma-separated multi-term search (each term must match somewhere).
-            terms = [t.strip() for t in q_text.split(",") if t.strip()]
-            if not terms:
-                terms = [q_text]
-
-            search_q = Q()
-            for term in terms:
-                term_q = (
-                    Q(title__icontains=term)
-                    | Q(description__icontains=term)
-                    | Q(location__icontains=term)
-                    | Q(amenities__icontains=term)
-                    | Q(city__name__icontains=term)
-                )
-                search_q &= term_q
-            qs = qs.filter(search_q)
-    if gender and gender != "all":
-        qs = qs.filter(gender=gender)
-    if sharing and sharing != "any":
-        qs = qs.filter(sharing=sharing)
-    if overnight == "1":
-        qs = qs.filter(overnight=True)
+    spec = PropertyFilterSpec(price_field=price_field)
+    # q matches title/description/location/city/amenities; "200" is a max
+    # price and "2km" a max distance to campus (see properties.filters).
+    result = spec.compile(request.GET, qs)
+    search_text = result.search_text
     min_price = request.GET.get("min_price")
     max_price = request.GET.get("max_price")
-    try:
-        if min_price:
-            qs = qs.filter(**{f"{price_field}__gte": float(min_price)})
-        if max_price:
-            qs = qs.filter(**{f"{price_field}__lte": float(max_price)})
-    except ValueError:
-        pass
+
+    # Counts for the filter buttons come from the unfiltered (base) set. The
+    # buttons show choice counts only, so the amenity GROUP BY is skipped.
+    from properties.facets import cached_facets
+
+    facet_counts = cached_facets(result.base_queryset, price_field, amenities=False)
+    filter_counts = {"all": facet_counts["total"], "overnight": facet_counts["overnight"]}
+    for key in ("gender", "sharing"):
+        for option in facet_counts[key]:
+            filter_counts[option["value"]] = option["count"]
+
+    qs = result.queryset
 
     # ordering and optional distance calculation
     order = request.GET.get("order")
@@ -778,38 +721,6 @@ def university_properties(request, pk, service_slug=None):
         # Smart ordering:
         # - If user searched: order by match strength, then popularity
         # - If user didn't search: use their prior search history (session) + popularity
-        from django.db.models import Case, IntegerField, Value, When, F
-
-        def _build_relevance_score(terms):
-            score_expr = Value(0, output_field=IntegerField())
-            for term in terms:
-                score_expr = score_expr + Case(
-                    When(title__icontains=term, then=Value(6)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-                score_expr = score_expr + Case(
-                    When(location__icontains=term, then=Value(4)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-                score_expr = score_expr + Case(
-                    When(amenities__icontains=term, then=Value(3)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-                score_expr = score_expr + Case(
-                    When(description__icontains=term, then=Value(2)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-                score_expr = score_expr + Case(
-                    When(city__name__icontains=term, then=Value(2)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-            return score_expr
-
         q_text = (q or "").strip()
         search_terms = []
         if q_text:
@@ -840,44 +751,29 @@ def university_properties(request, pk, service_slug=None):
             qs = qs.order_by("-view_count", "-created_at")
         else:
             # Default: recommended ordering
-            if search_terms:
-                qs = qs.annotate(relevance_score=_build_relevance_score(search_terms))
-                qs = qs.order_by("-relevance_score", "-view_count", "-created_at")
+            if search_text:
+                qs = search_index.rank(qs, search_text).order_by("-search_rank", "-view_count", "-created_at")
+            elif search_terms:
+                # Weighted token matches from the inverted index (one join).
+                qs = search_index.score(qs, search_terms).order_by("-relevance_score", "-view_count", "-created_at")
             else:
                 qs = qs.order_by("-view_count", "-created_at")
 
         # Related accommodations:
         # - If a user searched, show additional items that match *any* term
-        #   (main results require all terms), ordered by popularity.
+        #   (main results require all terms), best token match first.
         if q_text:
-            from django.db.models import Q
-
-            or_q = Q()
-            for term in search_terms:
-                or_q |= (
-                    Q(title__icontains=term)
-                    | Q(description__icontains=term)
-                    | Q(location__icontains=term)
-                    | Q(amenities__icontains=term)
-                    | Q(city__name__icontains=term)
-                )
-            base_qs = Property.objects.filter(
+            params = request.GET.copy()
+            params.pop("q", None)
+            base_qs = spec.compile(params, Property.objects.filter(
                 is_approved=True,
                 is_available=True,
                 university_id=pk,
                 property_type="students",
-            )
-            if gender and gender != "all":
-                base_qs = base_qs.filter(gender=gender)
-            if sharing and sharing != "any":
-                base_qs = base_qs.filter(sharing=sharing)
-            if overnight == "1":
-                base_qs = base_qs.filter(overnight=True)
+            )).queryset
 
             related_properties = list(
-                base_qs.filter(or_q)
-                .exclude(pk__in=qs.values("pk"))
-                .order_by("-view_count", "-created_at")[:6]
+                search_index.related(base_qs, search_terms).exclude(pk__in=qs.values("pk"))[:6]
             )
         else:
             related_properties = list(qs.order_by("-view_count", "-created_at")[:6])
@@ -886,25 +782,10 @@ def university_properties(request, pk, service_slug=None):
 
     uni = University.objects.get(pk=pk)
 
-    # Track university visit for notifications
-    from core.models import UserUniversityPreference
+    # Track university visit for notifications (buffered, written in bulk later)
+    from core.visits import record_university_visit
 
-    ip_address = (
-        request.META.get("HTTP_X_FORWARDED_FOR", request.META.get("REMOTE_ADDR", ""))
-        .split(",")[0]
-        .strip()
-    )
-    if ip_address:
-        pref, created = UserUniversityPreference.objects.get_or_create(
-            ip_address=ip_address,
-            university=uni,
-            defaults={"user": request.user if request.user.is_authenticated else None},
-        )
-        if not created:
-            pref.visit_count += 1
-            if request.user.is_authenticated:
-                pref.user = request.user
-            pref.save()
+    record_university_visit(request, uni.pk)
 
     return render(
         request,
@@ -912,6 +793,7 @@ def university_properties(request, pk, service_slug=None):
         {
             "properties": properties,
             "related_properties": related_properties,
+            "filter_counts": filter_counts,
             "university": uni,
             "uni": uni,  # Kept for backward compatibility
             "service_slug": service_slug,
@@ -947,7 +829,7 @@ def _haversine(lat1, lon1, lat2, lon2):
 
 def property_detail(request, pk):
     from properties.models import Property
-    from payments.models import AdminFeePayment
+    from payments import entitlements
     from django.db.models import Avg
 
     # Track popularity for ordering on accommodation lists.
@@ -979,12 +861,10 @@ def property_detail(request, pk):
             permanent=True,
         )
 
-    # Check if user has paid admin fee for this university
-    has_paid = False
-    if request.user.is_authenticated and prop.university:
-        has_paid = AdminFeePayment.objects.filter(
-            user=request.user, university=prop.university, uses_remaining__gt=0
-        ).exists()
+    # Check if user has paid admin fee for this university (cached per user)
+    owned = entitlements.for_user(request.user)
+    contact_unlocked = owned.is_unlocked(prop.pk)
+    has_paid = contact_unlocked or (bool(prop.university_id) and owned.has_paid(prop.university_id))
 
     # reviews
     all_reviews = prop.reviews.all().order_by("-created_at")
@@ -1029,6 +909,7 @@ def property_detail(request, pk):
             "average_rating": average_rating,
             "distance_km": distance_km,
             "has_paid": has_paid,
+            "contact_unlocked": contact_unlocked,
             "user_review": user_review,
         },
     )
@@ -1098,8 +979,8 @@ def property_review_delete(request, pk):
 @login_required
 def property_contact(request, pk):
     from properties.models import Property
-    from payments.models import AdminFeePayment, PaymentConfirmation, ContactView
-    from core.models import Notification
+    from payments.models import AdminFeePayment
+    from payments.unlock import unlock_contact
     from django.contrib import messages
     from django.conf import settings
 
@@ -1109,33 +990,22 @@ def property_contact(request, pk):
     has_paid = False
     payment_status = None
     payment_confirmation = None
-    active_payment = None
+    unlock = None
     already_viewed = False
 
     if request.user.is_authenticated and prop.university:
-        # Check for approved payment with remaining uses
-        active_payment = AdminFeePayment.objects.filter(
-            user=request.user, university=prop.university, uses_remaining__gt=0
-        ).first()
-
-        if active_payment:
-            # Check if user already viewed this property
-            already_viewed = ContactView.objects.filter(
-                payment=active_payment, property=prop
-            ).exists()
-
-            if not already_viewed:
-                # First time viewing this property - decrement uses
-                ContactView.objects.create(payment=active_payment, property=prop)
-                active_payment.uses_remaining -= 1
-                active_payment.save()
+        # Spends one use unless this property was already unlocked.
+        unlock = unlock_contact(request.user, prop)
 
+        if unlock:
+            already_viewed = not unlock.charged
+            if unlock.charged:
                 # Notify user about remaining views
-                if active_payment.uses_remaining > 0:
-                    plural_suffix = "s" if active_payment.uses_remaining != 1 else ""
+                if unlock.uses_remaining > 0:
+                    plural_suffix = "s" if unlock.uses_remaining != 1 else ""
                     messages.success(
                         request,
-                        f"Contact details unlocked! You have {active_payment.uses_remaining} accommodation{plural_suffix} left to view.",
+                        f"Contact details unlocked! You have {unlock.uses_remaining} accommodation{plural_suffix} left to view.",
                     )
                 else:
                     messages.warning(
@@ -1166,7 +1036,7 @@ def property_contact(request, pk):
             "has_paid": has_paid,
             "payment_status": payment_status,
             "payment_confirmation": payment_confirmation,
-            "uses_remaining": active_payment.uses_remaining if active_payment else 0,
+            "uses_remaining": unlock.uses_remaining if unlock else 0,
             "already_viewed": already_viewed,
             "ecocash_number": getattr(settings, "ECOCASH_NUMBER", ""),
             "ecocash_account_holder": getattr(settings, "ECOCASH_ACCOUNT_HOLDER", ""),
@@ -1174,6 +1044,7 @@ def property_contact(request, pk):
     )
 
 
+@replica_read
 def realestate_cities(request, service_slug=None):
     """List cities with real estate properties (resorts, lodges, shops)"""
     from django.db.models import Count, Q
@@ -1241,30 +1112,42 @@ def realestate_cities(request, service_slug=None):
     )
 
 
+def _city_listing(request, queryset, params=None, price_field=None):
+    """``(city, properties)`` for the city-scoped service listings.
+
+    ``?city=`` must exist (404 otherwise); every other parameter goes through
+    the shared filter spec. Newest first.
+    """
+    city = None
+    city_id = request.GET.get("city")
+    if city_id:
+        city = get_object_or_404(City, pk=city_id)
+    spec = PropertyFilterSpec(price_field=price_field)
+    qs = spec.compile(request.GET if params is None else params, queryset).queryset
+    return city, qs.order_by("-created_at")
+
+
+@replica_read
 def realestate_properties(request, service_slug=None):
     """List real estate properties with filters"""
-    city_id = request.GET.get("city")
     property_subtype = request.GET.get("subtype")
 
     if property_subtype == "lodge":
         property_subtype = "real_estate"
 
-    qs = Property.objects.filter(
-        is_approved=True,
-        is_available=True,
-        property_type__in=["real_estate", "resort", "shop"],
-    )
-
-    city = None
-    if city_id:
-        city = get_object_or_404(City, pk=city_id)
-        qs = qs.filter(city=city)
-
+    params = request.GET.copy()
     if property_subtype:
-        qs = qs.filter(property_type=property_subtype)
+        params["property_type"] = property_subtype
 
-    # Order by newest first
-    qs = qs.order_by("-created_at")
+    city, qs = _city_listing(
+        request,
+        Property.objects.filter(
+            is_approved=True,
+            is_available=True,
+            property_type__in=["real_estate", "resort", "shop"],
+        ),
+        params,
+    )
 
     return render(
         request,
@@ -1278,6 +1161,7 @@ def realestate_properties(request, service_slug=None):
     )
 
 
+@replica_read
 def resort_cities(request, service_slug=None):
     """List cities with resort properties"""
     from django.db.models import Count, Q
@@ -1324,21 +1208,14 @@ def resort_cities(request, service_slug=None):
     )
 
 
+@replica_read
 def resort_properties(request, service_slug=None):
     """List resort properties with filters"""
-    city_id = request.GET.get("city")
-
-    qs = Property.objects.filter(
-        is_approved=True, is_available=True, property_type="resort"
+    city, qs = _city_listing(
+        request,
+        Property.objects.filter(is_approved=True, is_available=True, property_type="resort"),
     )
 
-    city = None
-    if city_id:
-        city = get_object_or_404(City, pk=city_id)
-        qs = qs.filter(city=city)
-
-    qs = qs.order_by("-created_at")
-
     return render(
         request,
         "web/resort_properties.html",
@@ -1350,6 +1227,7 @@ def resort_properties(request, service_slug=None):
     )
 
 
+@replica_read
 def shop_cities(request, service_slug=None):
     """List cities with shop properties"""
     cities = City.objects.all().order_by("name")
@@ -1380,21 +1258,14 @@ def shop_cities(request, service_slug=None):
     )
 
 
+@replica_read
 def shop_properties(request, service_slug=None):
     """List shop properties with filters"""
-    city_id = request.GET.get("city")
-
-    qs = Property.objects.filter(
-        is_approved=True, is_available=True, property_type="shop"
+    city, qs = _city_listing(
+        request,
+        Property.objects.filter(is_approved=True, is_available=True, property_type="shop"),
     )
 
-    city = None
-    if city_id:
-        city = get_object_or_404(City, pk=city_id)
-        qs = qs.filter(city=city)
-
-    qs = qs.order_by("-created_at")
-
     return render(
         request,
         "web/shop_properties.html",
@@ -1406,6 +1277,7 @@ def shop_properties(request, service_slug=None):
     )
 
 
+@replica_read
 def longterm_cities(request, service_slug=None):
     """List cities with long-term accommodation properties"""
     cities = City.objects.all().order_by("name")
@@ -1441,35 +1313,18 @@ def longterm_cities(request, service_slug=None):
     )
 
 
+@replica_read
 def longterm_properties(request, service_slug=None):
     """List long-term properties with filters"""
-    city_id = request.GET.get("city")
     min_price = request.GET.get("min_price")
     max_price = request.GET.get("max_price")
 
-    qs = Property.objects.filter(
-        is_approved=True, is_available=True, property_type="long_term"
+    city, qs = _city_listing(
+        request,
+        Property.objects.filter(is_approved=True, is_available=True, property_type="long_term"),
+        price_field="price_per_month",
     )
 
-    city = None
-    if city_id:
-        city = get_object_or_404(City, pk=city_id)
-        qs = qs.filter(city=city)
-
-    if min_price:
-        try:
-            qs = qs.filter(price_per_month__gte=float(min_price))
-        except ValueError:
-            pass
-
-    if max_price:
-        try:
-            qs = qs.filter(price_per_month__lte=float(max_price))
-        except ValueError:
-            pass
-
-    qs = qs.order_by("-created_at")
-
     return render(
         request,
         "web/longterm_properties.html",
@@ -1483,6 +1338,7 @@ def longterm_properties(request, service_slug=None):
     )
 
 
+@replica_read
 def shortterm_cities(request, service_slug=None):
     """List cities with short-term accommodation properties"""
     from django.db.models import Count, Q
@@ -1538,42 +1394,19 @@ def shortterm_cities(request, service_slug=None):
     )
 
 
+@replica_read
 def shortterm_properties(request, service_slug=None):
     """List short-term properties with filters"""
-    city_id = request.GET.get("city")
     min_price = request.GET.get("min_price")
     max_price = request.GET.get("max_price")
     guests = request.GET.get("guests")
 
-    qs = Property.objects.filter(
-        is_approved=True, is_available=True, property_type="short_term"
+    city, qs = _city_listing(
+        request,
+        Property.objects.filter(is_approved=True, is_available=True, property_type="short_term"),
+        price_field="nightly_price",
     )
 
-    city = None
-    if city_id:
-        city = get_object_or_404(City, pk=city_id)
-        qs = qs.filter(city=city)
-
-    if min_price:
-        try:
-            qs = qs.filter(nightly_price__gte=float(min_price))
-        except ValueError:
-            pass
-
-    if max_price:
-        try:
-            qs = qs.filter(nightly_price__lte=float(max_price))
-        except ValueError:
-            pass
-
-    if guests:
-        try:
-            qs = qs.filter(max_occupancy__gte=int(guests))
-        except ValueError:
-            pass
-
-    qs = qs.order_by("-created_at")
-
     return render(
         request,
         "web/shortterm_properties.html",
@@ -1588,6 +1421,7 @@ def shortterm_properties(request, service_slug=None):
     )
 
 
+@replica_read
 def shortterm_lodges(request, service_slug=None):
     """Show curated list of short-term lodge websites, filterable by location."""
     search_query = request.GET.get("q", "").strip()
@@ -1679,6 +1513,7 @@ def toggle_property_like(request, property_id):
         return JsonResponse({"error": "Property not found"}, status=404)
 
 
+@replica_read
 def map_view(request):
     properties = Property.objects.filter(is_approved=True, is_available=True).exclude(latitude__isnull=True).exclude(longitude__isnull=True)
     return render(request, 'web/map.html', {'properties': properties})
@@ -1,8 +1,8 @@
 import os
 from typing import Any, Dict, List, Optional
 
-from django.db.models import Q
-
+from properties import suggest
+from properties.filters import PropertyFilterSpec
 from properties.models import University, Property
 from .models import WhatsappConversation
 
@@ -30,10 +30,14 @@ def _recent_messages(conversation: WhatsappConversation, limit: int = 12) -> Lis
 
 
 def _tool_list_universities(query: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-    qs = University.objects.all().order_by("name")
-    if query:
-        qs = qs.filter(name__icontains=query.strip())
-    qs = qs[: max(1, min(int(limit), 25))]
+    limit = max(1, min(int(limit), 25))
+    if query and query.strip():
+        # Typo-tolerant match ("univ of zim", "chinoyi") from the suggestion index.
+        ids = [s["id"] for s in suggest.suggest(query, kinds=["university"], limit=limit)]
+        by_id = University.objects.in_bulk(ids)
+        qs = [by_id[pk] for pk in ids if pk in by_id]
+    else:
+        qs = University.objects.all().order_by("name")[:limit]
     return [{"id": u.id, "name": u.name, "admin_fee_per_head": str(u.admin_fee_per_head)} for u in qs]
 
 
@@ -48,18 +52,10 @@ def _tool_list_properties(
     qs = Property.objects.filter(is_approved=True, is_available=True)
     if university_id:
         qs = qs.filter(university_id=university_id)
-    if query:
-        qs = qs.filter(Q(title__icontains=query) | Q(description__icontains=query) | Q(location__icontains=query))
-    if gender in {"all", "boys", "girls", "mixed"}:
-        qs = qs.filter(gender=gender)
-    if sharing in {"single", "two", "other"}:
-        qs = qs.filter(sharing=sharing)
-    if max_price is not None:
-        try:
-            max_price_val = float(max_price)
-            qs = qs.filter(Q(price_per_month__lte=max_price_val) | Q(nightly_price__lte=max_price_val))
-        except Exception:
-            pass
+    params = {"q": query, "gender": gender, "sharing": sharing, "max_price": max_price}
+    # The assistant doesn't know the listing type, so a max price matches either price.
+    spec = PropertyFilterSpec(price_field=("price_per_month", "nightly_price"))
+    qs = spec.compile(params, qs, optimized=False).queryset
 
     qs = qs.order_by("-created_at")[: max(1, min(int(limit), 15))]
 
@@ -1681,7 +1681,8 @@ class PropertyDetailScreen(Screen):
         container = self.ids.amenities_container
         container.clear_widgets()
 
-        amenities = self._normalize_amenities(result.get('amenities'))
+        # Prefer the server-parsed list; older API versions only send the raw string.
+        amenities = self._normalize_amenities(result.get('amenity_list') or result.get('amenities'))
         if not amenities:
             container.add_widget(Label(
                 text='No amenities listed.',
@@ -2815,21 +2816,73 @@ class ChangePasswordScreen(Screen):
 
 
 class NotificationsScreen(Screen):
+    _stream_active = False
+    _stream_cursor = None
+
     def on_pre_enter(self):
         """Load notifications when screen is entered"""
         self.load_notifications()
         self.mark_all_read()
+        self.start_stream()
+
+    def on_leave(self):
+        self._stream_active = False
+
+    def _auth_headers(self):
+        headers = {}
+        if hasattr(self.manager, 'token') and self.manager.token:
+            headers['Authorization'] = f'Bearer {self.manager.token}'
+        return headers
+
+    def start_stream(self):
+        """Long-poll notifications/stream/ while this screen is visible."""
+        if self._stream_active:
+            return
+        self._stream_active = True
+        self._stream_cursor = None
+        self._poll_stream()
+
+    def _poll_stream(self, *_):
+        if not self._stream_active:
+            return
+        url = API_BASE + 'notifications/stream/'
+        if self._stream_cursor is not None:
+            url += f'?since={self._stream_cursor}'
+        UrlRequest(
+            url,
+            req_headers=self._auth_headers(),
+            timeout=40,
+            on_success=self.on_stream_result,
+            on_error=self.on_stream_error,
+            on_failure=self.on_stream_error,
+        )
+
+    def on_stream_result(self, req, result):
+        if not self._stream_active:
+            return
+        has_new = self._stream_cursor is not None and bool(result.get('results'))
+        self._stream_cursor = result.get('last_id', self._stream_cursor)
+        if has_new:
+            self.load_notifications()
+            self.mark_all_read()
+        # 0 when the server long-polls; otherwise its poll interval.
+        Clock.schedule_once(self._poll_stream, result.get('retry_after', 0))
+
+    def on_stream_error(self, req, error):
+        # Back off instead of hammering the server while offline.
+        if self._stream_active:
+            Clock.schedule_once(self._poll_stream, 30)
     
     def mark_all_read(self):
-        """Mark all notifications as read"""
-        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        """Mark all notifications as read (single bulk request)"""
+        headers = {'Content-Type': 'application/json'}
         if hasattr(self.manager, 'token') and self.manager.token:
             headers['Authorization'] = f'Bearer {self.manager.token}'
         
         UrlRequest(
-            API_BASE + 'notifications/',
+            API_BASE + 'notifications/mark-read/',
             method='POST',
-            req_body='action=mark_all_read',
+            req_body='{}',
             req_headers=headers,
             on_success=self.on_marked_read,
             on_error=self.on_mark_error,
@@ -2857,6 +2910,10 @@ class NotificationsScreen(Screen):
         container = self.ids.notifications_container
         container.clear_widgets()
         
+        # Notifications are cursor-paginated: {"next", "previous", "results"}
+        if isinstance(result, dict):
+            result = result.get('results') or []
+
         if not result or len(result) == 0:
             container.add_widget(Label(
                 text='No notifications yet',